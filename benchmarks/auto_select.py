@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+'''
+Compare printing new operations selecting GitHub types without
+sub-fields, creating the auto-selection every time (as done before
+it was cached) and reusing the cached one.
+
+Usage::
+
+   $ python3 benchmarks/auto_select.py [-n 200] [-d 2]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+from sgqlc.operation import Operation
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'examples', 'github'))
+
+from github_schema import github_schema as schema  # noqa: E402
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('-n', '--operations', type=int, default=200,
+                help='Number of operations. Default=%(default)s')
+ap.add_argument('-d', '--depth', type=int, default=2,
+                help='Auto-selection depth. Default=%(default)s')
+args = ap.parse_args()
+
+
+def print_operations(clear):
+    for _ in range(args.operations):
+        if clear:
+            schema.__auto_selections__.clear()
+        op = Operation(schema.Query)
+        op.repository(owner='owner', name='name')
+        op.viewer()
+        op.__to_graphql__(indent_string='', auto_select_depth=args.depth)
+
+
+def measure(clear):
+    start = time.perf_counter()
+    print_operations(clear)
+    return time.perf_counter() - start
+
+
+before = measure(True)
+after = measure(False)
+print('%d operations, depth %d:' % (args.operations, args.depth))
+print('  uncached %6.3f s, cached %6.3f s, %5.1fx' % (
+    before, after, before / after))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+'''
+Compare memory and time of regular and compact (``__compact__ = True``)
+ContainerType instances interpreting a query result with many nodes.
+
+The raw JSON is released after interpreting it, so the reported memory
+is what the application keeps.
+
+Usage::
+
+   $ python3 benchmarks/compact_types.py [-n 100000]
+'''
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from sgqlc.operation import Operation
+from sgqlc.types import Field, ID, Schema, Type, list_of, non_null
+from sgqlc.types.datetime import DateTime
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('-n', '--nodes', type=int, default=100000,
+                help='Number of issues. Default=%(default)s')
+args = ap.parse_args()
+
+
+def create_schema(compact):
+    schema = Schema()
+
+    class Actor(Type):
+        __schema__ = schema
+        __compact__ = compact
+        login = non_null(str)
+
+    class Issue(Type):
+        __schema__ = schema
+        __compact__ = compact
+        id = non_null(ID)  # noqa: A003
+        number = non_null(int)
+        title = non_null(str)
+        state = non_null(str)
+        created_at = non_null(DateTime)
+        author = Actor
+        body = str
+        closed = bool
+        comments_count = int
+
+    class Query(Type):
+        __schema__ = schema
+        issues = Field(list_of(Issue), args={'first': int})
+
+    return Query
+
+
+def create_json_data(n):
+    return {'data': {'issues': [{
+        'id': 'MDU6SXNzdWUx%08d' % (i,),
+        'number': i,
+        'title': 'Issue title number %d' % (i,),
+        'state': 'OPEN' if i % 3 else 'CLOSED',
+        'createdAt': '2019-06-%02dT12:00:00Z' % (1 + i % 28,),
+        'author': {'login': 'user%d' % (i % 100,)},
+    } for i in range(n)]}}
+
+
+def measure(compact):
+    op = Operation(create_schema(compact))
+    issues = op.issues(first=args.nodes)
+    issues.__fields__('id', 'number', 'title', 'state', 'created_at')
+    issues.author.login()
+
+    json_data = create_json_data(args.nodes)
+    start = time.perf_counter()
+    result = op + json_data
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = op + json_data
+    del json_data
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(result.issues) == args.nodes
+    return size, elapsed
+
+
+print('%d issues, 6 fields and nested author:' % (args.nodes,))
+for compact in (False, True):
+    size, elapsed = measure(compact)
+    print('  %-8s %8.1f MB %6.0f bytes/issue %8.2f s' % (
+        'compact' if compact else 'regular', size / 2**20,
+        size / args.nodes, elapsed))
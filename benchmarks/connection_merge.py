@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+'''
+Measure merging Relay connection pages with ``+=`` and
+``Connection.extend_many()``.
+
+Usage::
+
+   $ python3 benchmarks/connection_merge.py [-p 500] [-n 100]
+'''
+
+import argparse
+import time
+
+from sgqlc.types import ID, Schema, Type, list_of, non_null
+from sgqlc.types.relay import Connection
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('-p', '--pages', type=int, default=500,
+                help='Number of pages. Default=%(default)s')
+ap.add_argument('-n', '--nodes', type=int, default=100,
+                help='Nodes per page. Default=%(default)s')
+args = ap.parse_args()
+
+schema = Schema()
+
+
+class Issue(Type):
+    __schema__ = schema
+    id = non_null(ID)  # noqa: A003
+    number = non_null(int)
+    title = str
+
+
+class IssueConnection(Connection):
+    __schema__ = schema
+    nodes = list_of(Issue)
+
+
+def create_pages():
+    pages = []
+    for p in range(args.pages):
+        start = p * args.nodes
+        pages.append(IssueConnection({
+            'pageInfo': {
+                'endCursor': 'cursor-%d' % (start + args.nodes,),
+                'hasNextPage': p + 1 < args.pages,
+                'hasPreviousPage': p > 0,
+            },
+            'nodes': [{
+                'id': 'id-%d' % (i,),
+                'number': i,
+                'title': 'Issue %d' % (i,),
+            } for i in range(start, start + args.nodes)],
+        }))
+    return pages
+
+
+def merge_iadd(pages):
+    conn = pages[0]
+    for page in pages[1:]:
+        conn += page
+    return conn
+
+
+def merge_extend_many(pages):
+    conn = pages[0]
+    conn.extend_many(pages[1:])
+    return conn
+
+
+print('%d pages of %d nodes:' % (args.pages, args.nodes))
+for merge in (merge_iadd, merge_extend_many):
+    pages = create_pages()
+    start = time.perf_counter()
+    conn = merge(pages)
+    elapsed = time.perf_counter() - start
+    assert len(conn.nodes) == args.pages * args.nodes
+    assert len(conn.__json_data__['nodes']) == len(conn.nodes)
+    print('  %-20s %8.3f s' % (merge.__name__, elapsed))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+'''
+Compare parsing ISO 8601 timestamps with the regular expression and
+with the ``fromisoformat()`` fast path, with and without repeated
+values.
+
+The regular expression is measured by disabling the fast path and
+calling ``_parse()`` directly, bypassing the cache.
+
+Usage::
+
+   $ python3 benchmarks/datetime_parse.py [-n 100000]
+'''
+
+import argparse
+import time
+
+from sgqlc.types.datetime import Date, DateTime, Time
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('-n', '--values', type=int, default=100000,
+                help='Number of values. Default=%(default)s')
+args = ap.parse_args()
+
+
+def create_values(n, distinct):
+    return {
+        DateTime: ['2019-06-%02dT%02d:%02d:%02dZ' % (
+            1 + i % 28, i // 3600 % 24, i // 60 % 60, i % 60)
+            for i in (j % distinct for j in range(n))],
+        Date: ['20%02d-%02d-%02d' % (i // 336 % 100, 1 + i // 28 % 12,
+                                     1 + i % 28)
+               for i in (j % distinct for j in range(n))],
+        Time: ['%02d:%02d:%02d-03:00' % (
+            i // 3600 % 24, i // 60 % 60, i % 60)
+            for i in (j % distinct for j in range(n))],
+    }
+
+
+def regex(t, values):
+    fromisoformat = t._fromisoformat
+    t._fromisoformat = None
+    try:
+        for v in values:
+            t._parse(v)
+    finally:
+        t._fromisoformat = fromisoformat
+
+
+def converter(t, values):
+    t._cache.clear()
+    for v in values:
+        t.converter(v)
+
+
+def measure(fn, t, values):
+    start = time.perf_counter()
+    fn(t, values)
+    return time.perf_counter() - start
+
+
+print('%d values:' % (args.values,))
+for distinct in (args.values, 100):
+    for t, values in create_values(args.values, distinct).items():
+        before = measure(regex, t, values)
+        after = measure(converter, t, values)
+        print('  %-8s %6d distinct: regex %6.3f s, converter %6.3f s, '
+              '%5.1fx' % (t.__name__, distinct, before, after,
+                          before / after))
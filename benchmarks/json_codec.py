@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+'''
+Compare JSON codecs decoding and encoding a GitHub schema response.
+
+The document is the introspection query response used to generate
+``examples/github/github_schema.py``. The ``str`` decode mimics the
+endpoint before codecs, which decoded the body to text before parsing.
+
+Usage::
+
+   $ python3 benchmarks/json_codec.py [-n 20] [file.json]
+'''
+
+import argparse
+import json
+import os.path
+import timeit
+
+from sgqlc.codec import get_codec, codecs
+
+default_file = os.path.join(os.path.dirname(__file__), '..', 'examples',
+                            'github', 'github_schema.json')
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('file', nargs='?', default=default_file,
+                help='JSON document to use. Default=GitHub schema')
+ap.add_argument('-n', '--number', type=int, default=20,
+                help='Loops per measurement. Default=%(default)s')
+args = ap.parse_args()
+
+with open(args.file, 'rb') as f:
+    body = f.read()
+obj = json.loads(body)
+
+print('%s: %d bytes, best of 5 x %d loops' % (
+    os.path.basename(args.file), len(body), args.number))
+
+
+def bench(name, fn):
+    t = min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+    print('  %-28s %8.2f ms' % (name, t * 1000))
+    return t
+
+
+for name in sorted(codecs):
+    try:
+        codec = get_codec(name)
+    except ImportError:
+        print('%s: not installed' % (name,))
+        continue
+
+    print('%s:' % (name,))
+    bench('loads(body.decode())', lambda: codec.loads(body.decode('utf-8')))
+    bench('loads(body)', lambda: codec.loads(body))
+    bench('dumpb(obj)', lambda: codec.dumpb(obj))
+    bench('dumpb(obj, sort_keys=True)',
+          lambda: codec.dumpb(obj, sort_keys=True, separators=(',', ':')))
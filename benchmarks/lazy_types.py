@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+'''
+Compare time of regular and lazy (``__lazy__ = True``) ContainerType
+instances interpreting a query result with many nodes, then reading
+only a few fields or all of them.
+
+Usage::
+
+   $ python3 benchmarks/lazy_types.py [-n 100000]
+'''
+
+import argparse
+import time
+
+from sgqlc.operation import Operation
+from sgqlc.types import Field, ID, Schema, Type, list_of, non_null
+from sgqlc.types.datetime import DateTime
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('-n', '--nodes', type=int, default=100000,
+                help='Number of issues. Default=%(default)s')
+args = ap.parse_args()
+
+
+def create_schema(lazy):
+    schema = Schema()
+
+    class Actor(Type):
+        __schema__ = schema
+        __lazy__ = lazy
+        login = non_null(str)
+
+    class Issue(Type):
+        __schema__ = schema
+        __lazy__ = lazy
+        id = non_null(ID)  # noqa: A003
+        number = non_null(int)
+        title = non_null(str)
+        state = non_null(str)
+        created_at = non_null(DateTime)
+        author = Actor
+
+    class Query(Type):
+        __schema__ = schema
+        __lazy__ = lazy
+        issues = Field(list_of(Issue), args={'first': int})
+
+    return Query
+
+
+def create_json_data(n):
+    return {'data': {'issues': [{
+        'id': 'MDU6SXNzdWUx%08d' % (i,),
+        'number': i,
+        'title': 'Issue title number %d' % (i,),
+        'state': 'OPEN' if i % 3 else 'CLOSED',
+        'createdAt': '2019-06-%02dT12:00:00Z' % (1 + i % 28,),
+        'author': {'login': 'user%d' % (i % 100,)},
+    } for i in range(n)]}}
+
+
+def read_few(result):
+    for issue in result.issues:
+        issue.number, issue.state
+
+
+def read_all(result):
+    for issue in result.issues:
+        for name in issue:
+            issue[name]
+        issue.author.login
+
+
+def measure(lazy, read):
+    op = Operation(create_schema(lazy))
+    issues = op.issues(first=args.nodes)
+    issues.__fields__('id', 'number', 'title', 'state', 'created_at')
+    issues.author.login()
+
+    json_data = create_json_data(args.nodes)
+    start = time.perf_counter()
+    result = op + json_data
+    created = time.perf_counter()
+    read(result)
+    end = time.perf_counter()
+    return created - start, end - created
+
+
+print('%d issues, 5 fields and nested author:' % (args.nodes,))
+for read in (read_few, read_all):
+    for lazy in (False, True):
+        create, access = measure(lazy, read)
+        print('  %-8s %-9s create %6.2f s, read %6.2f s, total %6.2f s' % (
+            'lazy' if lazy else 'regular', read.__name__,
+            create, access, create + access))
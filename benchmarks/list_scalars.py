@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+'''
+Compare converting ``list_of()`` scalars element by element, as done
+before ``__convert_list__()``, and in bulk.
+
+Usage::
+
+   $ python3 benchmarks/list_scalars.py [-n 1000000]
+'''
+
+import argparse
+import time
+
+from sgqlc.types import Boolean, Enum, Float, ID, Int, String, list_of
+from sgqlc.types.datetime import DateTime
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('-n', '--values', type=int, default=1000000,
+                help='Number of list elements. Default=%(default)s')
+args = ap.parse_args()
+
+
+class State(Enum):
+    __choices__ = ('OPEN', 'CLOSED', 'MERGED')
+
+
+n = args.values
+values = {
+    Int: list(range(n)),
+    Float: [i / 2 for i in range(n)],
+    String: ['string %d' % (i,) for i in range(n)],
+    Boolean: [bool(i % 2) for i in range(n)],
+    ID: ['MDU6SXNzdWUx%08d' % (i,) for i in range(n)],
+    State: [State.__choices__[i % 3] for i in range(n)],
+    DateTime: ['2019-06-%02dT%02d:00:00Z' % (1 + i % 28, i % 24)
+               for i in range(n)],
+}
+
+
+def measure(fn, t, lst):
+    if hasattr(t, '_cache'):
+        t._cache.clear()
+    start = time.perf_counter()
+    fn(t, lst)
+    return time.perf_counter() - start
+
+
+def per_element(t, lst):
+    return [t(v) for v in lst]
+
+
+def bulk(t, lst):
+    return list_of(t)(lst)
+
+
+print('%d elements:' % (n,))
+for t, lst in values.items():
+    before = measure(per_element, t, lst)
+    after = measure(bulk, t, lst)
+    print('  %-8s per element %6.3f s, bulk %6.3f s, %5.1fx' % (
+        t.__name__, before, after, before / after))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+'''
+Compare import time of a schema generated by ``sgqlc-codegen`` with
+regular fields and with ``--field-tables``, creating the fields of each
+container on first use.
+
+Usage::
+
+   $ python3 benchmarks/schema_import.py [-r 5] [schema.json]
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.dirname(here)
+
+ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+ap.add_argument('schema', nargs='?',
+                default=os.path.join(root, 'examples', 'github',
+                                     'github_schema.json'),
+                help='Introspection JSON file. Default=%(default)s')
+ap.add_argument('-r', '--repeat', type=int, default=5,
+                help='Number of imports to time. Default=%(default)s')
+args = ap.parse_args()
+
+codegen = os.path.join(root, 'bin', 'sgqlc-codegen')
+env = dict(os.environ, PYTHONPATH=root)
+
+timer = '''
+import sys, time
+sys.path.insert(0, sys.argv[1])
+import sgqlc.types.relay
+start = time.perf_counter()
+import schema
+print(time.perf_counter() - start)
+'''
+
+
+def generate(directory, options):
+    subprocess.check_call(
+        [sys.executable, codegen] + options
+        + [args.schema, os.path.join(directory, 'schema.py')],
+        env=env)
+
+
+def measure(directory):
+    best = float('inf')
+    for _ in range(args.repeat):
+        out = subprocess.check_output(
+            [sys.executable, '-B', '-c', timer, directory], env=env)
+        best = min(best, float(out))
+    return best
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    results = []
+    for name, options in (('fields', []),
+                          ('field tables', ['--field-tables'])):
+        directory = os.path.join(tmp, name.replace(' ', '_'))
+        os.mkdir(directory)
+        generate(directory, options)
+        results.append((name, measure(directory)))
+
+print('%s, best of %d imports:' % (args.schema, args.repeat))
+base = results[0][1]
+for name, elapsed in results:
+    print('  %-12s %6.3f s, %5.1fx' % (name, elapsed, base / elapsed))
@@ -26,7 +26,13 @@ import sys
 from collections import OrderedDict
 
 from sgqlc.operation import Operation  # noqa: I900
+from sgqlc.types.relay import (  # noqa: I900
+    paginate_connections, PaginationError,
+)
 from sgqlc.endpoint.http import HTTPEndpoint  # noqa: I900
+from sgqlc.endpoint.cache import (  # noqa: I900
+    CachedEndpoint, ResponseCache, SQLiteResponseCache, TieredCache,
+)
 from github_schema import github_schema as schema  # noqa: I900
 
 logger = logging.getLogger(__name__)
@@ -186,50 +192,19 @@ def download(endpoint, reponame, labels=(), issue_states=(), pr_states=()):
     owner, name = reponame.split('/', 1)
     op = create_operation(owner, name, labels, issue_states, pr_states)
 
-    logger.info('Downloading base information from %s', endpoint)
+    logger.info('Downloading from %s', endpoint)
     logger.debug('Operation:\n%s', op)
 
-    d = endpoint(op)
-    errors = d.get('errors')
-    if errors:
-        return report_download_errors(errors)
-
-    repodata = (op + d).repository
-    while (repodata.issues.page_info.has_next_page
-           or repodata.pull_requests.page_info.has_next_page):
-        op = Operation()
-        repo = op.repository(owner=owner, name=name)
-
-        if repodata.issues.page_info.has_next_page:
-            select_issues(
-                repo, labels, issue_states,
-                after=repodata.issues.page_info.end_cursor)
-
-        if repodata.pull_requests.page_info.has_next_page:
-            select_pull_requests(
-                repo, labels, pr_states,
-                after=repodata.pull_requests.page_info.end_cursor)
-
-        logger.info(
-            'Downloading extra connection nodes: issues=%s, prs=%s',
-            repodata.issues.page_info, repodata.pull_requests.page_info)
-        logger.debug('Operation:\n%s', op)
-
-        cont = endpoint(op)
-        errors = cont.get('errors')
-        if errors:
-            return report_download_errors(errors)
-
-        contdata = (op + cont).repository
-        if repodata.issues.page_info.has_next_page:
-            repodata.issues += contdata.issues
-
-        if repodata.pull_requests.page_info.has_next_page:
-            repodata.pull_requests += contdata.pull_requests
+    # issues and pull_requests are paginated concurrently
+    try:
+        data = paginate_connections(endpoint, op)
+    except PaginationError as exc:
+        return report_download_errors(exc.errors)
 
+    repodata = data.repository
     logger.info('Finished downloading repository: %s', reponame)
     logger.debug('%s', repodata)
-    return d
+    return {'data': data.__json_data__}
 
 
 class ComplexObjectFilter:
@@ -864,6 +839,15 @@ if __name__ == '__main__':
                           'Pull Requests'),
                     choices=schema.PullRequestState.__choices__ + ('',),
                     default=[])
+    ap.add_argument('--cache',
+                    help=('Keep downloaded pages in this file, so an '
+                          'interrupted download resumes from it.'))
+    ap.add_argument('--cache-ttl', type=float, default=3600,
+                    help=('Seconds to use the cached pages. '
+                          'Default=%(default)s'))
+    ap.add_argument('--replay', action='store_true',
+                    help=('Use the cached pages even if expired, '
+                          'only download the missing ones.'))
     ap.add_argument('repo',
                     help='Repository name, such as "team/repo".')
 
@@ -926,7 +910,11 @@ if __name__ == '__main__':
                          'https://github.com/settings/tokens')
     endpoint = HTTPEndpoint(graphql_endpoint, {
         'Authorization': 'bearer ' + token,
-    })
+    }, pool=True)  # download() pagination reuses the connection
+    if args.cache:
+        cache = TieredCache(ResponseCache(), SQLiteResponseCache(args.cache))
+        endpoint = CachedEndpoint(endpoint, cache, args.cache_ttl,
+                                  replay=args.replay)
 
     if not args.command:
         raise SystemExit('missing subcommand. See --help.')
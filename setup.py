@@ -35,6 +35,9 @@ setup(
     install_requires=['graphql-core'],
     extras_require={
         'sphinx': ['sphinx'],
+        'orjson': ['orjson'],
+        'zstd': ['zstandard'],
+        'brotli': ['brotli'],
     },
     zip_safe=True,
     keywords='graphql client http endpoint',
@@ -8,7 +8,8 @@ This package provide the following modules:
    interpret queries. Submodule :mod:`sgqlc.types.datetime` will
    provide bindings for :mod:`datetime` and ISO 8601, while
    :mod:`sgqlc.types.relay` will expose ``Node``, ``PageInfo`` and
-   ``Connection``.
+   ``Connection``. Submodule :mod:`sgqlc.types.view` provides
+   read-only views of results, without creating objects.
 
  - :mod:`sgqlc.operation`: use declared types to generate and
    interpret queries.
@@ -18,6 +19,9 @@ This package provide the following modules:
    :class:`sgqlc.endpoint.http.HTTPEndpoint` using
    :func:`urllib.request.urlopen()`.
 
+ - :mod:`sgqlc.codec`: pluggable JSON encoder and decoder used by the
+   other modules, such as ``orjson``.
+
 :license: ISC
 '''
 
@@ -0,0 +1,222 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+JSON Codecs
+===========
+
+All JSON encoding and decoding done by :mod:`sgqlc.types` and
+:mod:`sgqlc.endpoint` goes through a codec, so faster libraries may
+be plugged in. The default is the standard :mod:`json` module, while
+`orjson <https://github.com/ijl/orjson>`_ is used if asked by name,
+including with the ``SGQLC_JSON_CODEC=orjson`` environment variable.
+It's not the default as it decodes differently some documents, such
+as integers beyond 64 bits, which :mod:`json` keeps exact:
+
+>>> JSONCodec().loads('[1180591620717411303424]')
+[1180591620717411303424]
+
+Codecs provide ``loads()``, accepting :class:`str` or :class:`bytes`,
+``dumps()`` returning :class:`str` and ``dumpb()`` returning UTF-8
+:class:`bytes`, avoiding the intermediate text when writing to the
+network. Keyword arguments are the ones of :func:`json.dumps`:
+
+>>> codec = JSONCodec()
+>>> codec
+JSONCodec()
+>>> codec.loads(b'{"a": [1, 2.5, "x"]}')
+{'a': [1, 2.5, 'x']}
+>>> codec.dumps({'b': 1, 'a': None}, sort_keys=True)
+'{"a": null, "b": 1}'
+>>> codec.dumpb({'b': 1, 'a': None}, separators=(',', ':'))
+b'{"b":1,"a":null}'
+
+The same document is produced by any codec, however whitespace and
+escaping of non-ASCII characters may differ:
+
+>>> try:
+...     codec = OrjsonCodec()
+... except ImportError:  # pragma: no cover
+...     codec = JSONCodec()
+>>> codec.loads('{"a": [1, 2.5, "x"]}')
+{'a': [1, 2.5, 'x']}
+>>> codec.loads(codec.dumpb({'b': 1, 'a': None}, sort_keys=True))
+{'a': None, 'b': 1}
+
+Keywords without an equivalent in the faster library fall back to the
+standard :mod:`json` module, as do objects it can't encode:
+
+>>> codec.dumps({'a': [1]}, indent=4)
+'{\\n    "a": [\\n        1\\n    ]\\n}'
+>>> codec.dumps({'a': [1]}, indent=2)
+'{\\n  "a": [\\n    1\\n  ]\\n}'
+>>> codec.dumps({'a': 'ç'}, ensure_ascii=True)
+'{"a": "\\\\u00e7"}'
+>>> codec.dumps({'a': 1, 'b': 2}, separators=(', ', ': '))
+'{"a": 1, "b": 2}'
+>>> codec.dumps({1: 2**70})
+'{"1": 1180591620717411303424}'
+
+Decoding errors are always reported as :exc:`json.JSONDecodeError`:
+
+>>> import json
+>>> try:
+...     codec.loads(b'{"a":')
+... except json.JSONDecodeError as exc:
+...     print('error at', exc.pos)
+error at 5
+
+The default codec is used unless one is given to the endpoint, see
+:class:`sgqlc.endpoint.http.HTTPEndpoint`. It can be replaced by name
+or with an object implementing the same methods:
+
+>>> previous = get_codec()
+>>> get_codec()
+JSONCodec()
+>>> set_default_codec(codec)
+>>> get_codec() is codec
+True
+>>> get_codec(codec) is codec
+True
+>>> set_default_codec(previous)
+>>> get_codec('xml')
+Traceback (most recent call last):
+  ...
+ValueError: unknown JSON codec: 'xml'
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = (
+    'JSONCodec', 'OrjsonCodec', 'get_codec', 'set_default_codec',
+)
+
+import json
+import os
+
+
+class JSONCodec:
+    '''JSON codec using the standard :mod:`json` module.'''
+
+    name = 'json'
+
+    def __repr__(self):
+        return '%s()' % (self.__class__.__name__,)
+
+    def loads(self, data):
+        '''Decode the JSON document.
+
+        :param data: the JSON document.
+        :type data: :class:`str` or :class:`bytes`
+
+        :raise json.JSONDecodeError: if it's not a valid JSON.
+        '''
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')  # GraphQL over HTTP is UTF-8
+        return json.loads(data)
+
+    def dumps(self, obj, **kwargs):
+        '''Encode ``obj`` as JSON text, see :func:`json.dumps`.
+
+        :rtype: str
+        '''
+        return json.dumps(obj, **kwargs)
+
+    def dumpb(self, obj, **kwargs):
+        '''Encode ``obj`` as UTF-8 JSON, see :func:`json.dumps`.
+
+        :rtype: bytes
+        '''
+        return json.dumps(obj, **kwargs).encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    '''JSON codec using `orjson <https://github.com/ijl/orjson>`_.
+
+    Output is always compact and not ASCII-escaped. If ``dumps()`` or
+    ``dumpb()`` are called with keywords other than ``sort_keys``,
+    compact ``separators``, ``indent=2`` or ``ensure_ascii=False``,
+    the standard :mod:`json` module is used. So it is to decode
+    documents ``orjson`` rejects, such as integers beyond 64 bits
+    (older versions decode those as :class:`float`).
+
+    :raise ImportError: if ``orjson`` is not installed.
+    '''
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, data):
+        try:
+            return self.orjson.loads(data)
+        except self.orjson.JSONDecodeError:  # big ints or invalid JSON
+            return super(OrjsonCodec, self).loads(data)
+
+    def __get_option(self, sort_keys=False, separators=None, indent=None,
+                     ensure_ascii=False, **kwargs):
+        if kwargs or ensure_ascii:
+            return None
+        if separators is not None and tuple(separators) != (',', ':'):
+            return None
+
+        option = 0
+        if sort_keys:
+            option |= self.orjson.OPT_SORT_KEYS
+        if indent == 2:
+            option |= self.orjson.OPT_INDENT_2
+        elif indent is not None:
+            return None
+        return option
+
+    def dumpb(self, obj, **kwargs):
+        option = self.__get_option(**kwargs)
+        if option is not None:
+            try:
+                return self.orjson.dumps(obj, option=option)
+            except TypeError:  # orjson.JSONEncodeError: big ints, keys...
+                pass
+        return super(OrjsonCodec, self).dumpb(obj, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj, **kwargs).decode('utf-8')
+
+
+codecs = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+}
+
+try:
+    default_codec = codecs[os.environ.get('SGQLC_JSON_CODEC') or 'json']()
+except (KeyError, ImportError):  # pragma: no cover
+    default_codec = JSONCodec()
+
+
+def get_codec(codec=None):
+    '''Get the codec instance.
+
+    :param codec: ``None`` for the default codec, a name such as
+      ``json`` or ``orjson``, or a codec object that is returned as is.
+
+    :raise ValueError: if the name is not known.
+    :raise ImportError: if the codec library is not installed.
+    '''
+    if codec is None:
+        return default_codec
+    if isinstance(codec, str):
+        cls = codecs.get(codec)
+        if cls is None:
+            raise ValueError('unknown JSON codec: %r' % (codec,))
+        return cls()
+    return codec
+
+
+def set_default_codec(codec):
+    '''Set the codec used when none is given, see :func:`get_codec`.'''
+    global default_codec
+    default_codec = get_codec(codec)
@@ -15,6 +15,25 @@ This package provide the following modules:
    :class:`sgqlc.endpoint.http.HTTPEndpoint` using
    :func:`urllib.request.urlopen()`.
 
+ - :mod:`sgqlc.endpoint.async_http`: concrete
+   :class:`sgqlc.endpoint.async_http.AsyncHTTPEndpoint` using
+   :mod:`asyncio` streams.
+
+ - :mod:`sgqlc.endpoint.json_stream`: incremental JSON parser, used
+   to parse huge responses without reading the whole body first.
+
+ - :mod:`sgqlc.endpoint.compression`: decoders of HTTP
+   ``Content-Encoding``, used to decompress responses while they
+   are read.
+
+ - :mod:`sgqlc.endpoint.cache`:
+   :class:`sgqlc.endpoint.cache.CachedEndpoint` keeping query results
+   of another endpoint, honoring HTTP ``Cache-Control`` and ``ETag``.
+
+ - :mod:`sgqlc.endpoint.ratelimit`:
+   :class:`sgqlc.endpoint.ratelimit.RateLimitedEndpoint` pacing calls
+   to another endpoint given the server's rate limit budget.
+
 :license: ISC
 '''
 
@@ -0,0 +1,415 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Asynchronous HTTP Endpoint
+==========================
+
+This endpoint implements GraphQL client using :mod:`asyncio` streams,
+without third party dependencies. Calling the endpoint returns a
+coroutine, thus many queries can be in flight at the same time
+without one thread per request:
+
+.. code-block:: python
+
+   endpoint = AsyncHTTPEndpoint(url, headers)
+
+   async def fetch_all(queries):
+       return await asyncio.gather(*(endpoint(q) for q in queries))
+
+Connections are kept open (HTTP/1.1 keep-alive) in an
+:class:`AsyncHTTPConnectionPool`, bounded per host.
+
+Errors are handled exactly as :class:`sgqlc.endpoint.http.HTTPEndpoint`.
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = ('AsyncHTTPEndpoint', 'AsyncHTTPConnectionPool')
+
+import asyncio
+import collections
+import http.client
+import io
+import logging
+import ssl
+import time
+import urllib.error
+import urllib.parse
+
+from . import compression
+from .http import HTTPEndpoint, _is_idempotent
+
+
+class AsyncHTTPConnectionPool:
+    '''Persistent :mod:`asyncio` HTTP connections.
+
+    Keeps up to ``maxsize`` connections per host, requests beyond
+    that wait for a connection to be given back. Connections that are
+    idle for more than ``idle_timeout`` seconds are closed.
+
+    If the server closed a reused connection, the request is retried
+    once with a new connection, unless it was sent and isn't
+    idempotent, such as mutations: the server may have processed it
+    before closing, then the error is raised.
+
+    The pool should be used from a single event loop.
+    '''
+
+    def __init__(self, maxsize=10, idle_timeout=60, ssl_context=None):
+        '''
+        :param maxsize: maximum number of connections per host.
+        :type maxsize: int
+
+        :param idle_timeout: seconds an unused connection is kept open.
+        :type idle_timeout: float
+
+        :param ssl_context: used to create HTTPS connections, if ``None``
+          the default context is used.
+        :type ssl_context: :class:`ssl.SSLContext`
+        '''
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context
+        self.__semaphores = {}  # key -> asyncio.Semaphore
+        self.__idle = {}  # key -> [(reader, writer, last_used), ...]
+
+    def __str__(self):
+        return '%s(maxsize=%d, idle_timeout=%r)' % (
+            self.__class__.__name__, self.maxsize, self.idle_timeout)
+
+    async def request(self, req):
+        '''Execute the request, returning status, reason, headers and body.
+
+        :param req: the request to send.
+        :type req: :class:`urllib.request.Request`
+
+        :return: tuple ``(status, reason, headers, body)``, with headers
+          as :class:`http.client.HTTPMessage` and body as bytes.
+        :rtype: tuple
+        '''
+        split = urllib.parse.urlsplit(req.full_url)
+        key = (split.scheme, split.hostname, split.port)
+        data = self.__serialize_request(req, split.netloc)
+
+        semaphore = self.__semaphores.get(key)
+        if semaphore is None:
+            semaphore = self.__semaphores[key] = asyncio.Semaphore(
+                self.maxsize)
+
+        async with semaphore:
+            conn = self.__get_idle(key)
+            if conn is not None:
+                try:
+                    await self.__write(conn, data)
+                except ConnectionError:
+                    conn = None  # server dropped an idle one, reconnect
+
+            if conn is not None:
+                try:
+                    return await self.__read(key, conn)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not _is_idempotent(req):
+                        raise  # the server may have processed it
+
+            conn = await self._open_connection(key)
+            await self.__write(conn, data)
+            return await self.__read(key, conn)
+
+    @staticmethod
+    def __serialize_request(req, netloc):
+        headers = dict(req.header_items())
+        headers.setdefault('Host', netloc)
+        body = req.data or b''
+        if body:
+            headers['Content-length'] = len(body)
+
+        lines = ['%s %s HTTP/1.1' % (req.get_method(), req.selector)]
+        lines.extend('%s: %s' % (k, v) for k, v in headers.items())
+        lines.extend(('', ''))
+        return '\r\n'.join(lines).encode('latin-1') + body
+
+    async def _open_connection(self, key):
+        scheme, host, port = key
+        if scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+            return await asyncio.open_connection(
+                host, port or 443, ssl=context)
+        return await asyncio.open_connection(host, port or 80)
+
+    def __get_idle(self, key):
+        idle = self.__idle.get(key)
+        deadline = time.monotonic() - self.idle_timeout
+        while idle:
+            reader, writer, last_used = idle.pop()
+            if last_used > deadline and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    @staticmethod
+    async def __write(conn, data):
+        reader, writer = conn
+        try:
+            writer.write(data)
+            await writer.drain()
+        except BaseException:
+            writer.close()
+            raise
+
+    async def __read(self, key, conn):
+        reader, writer = conn
+        try:
+            status, reason, headers, body, reusable = \
+                await self.__read_response(reader)
+        except BaseException:
+            writer.close()
+            raise
+
+        if reusable:
+            self.__idle.setdefault(key, []).append(
+                (reader, writer, time.monotonic()))
+        else:
+            writer.close()
+        return status, reason, headers, body
+
+    async def __read_response(self, reader):
+        status_line = await reader.readuntil(b'\r\n')
+        parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        version, status = parts[0], int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+
+        lines = []
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            lines.append(line)
+            if line == b'\r\n':
+                break
+        headers = http.client.parse_headers(io.BytesIO(b''.join(lines)))
+
+        reusable = version == 'HTTP/1.1' and \
+            headers.get('Connection', '').lower() != 'close'
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = await self.__read_chunked(reader)
+        elif headers.get('Content-Length') is not None:
+            body = await reader.readexactly(int(headers['Content-Length']))
+        else:
+            body = await reader.read()
+            reusable = False
+
+        return status, reason, headers, body, reusable
+
+    @staticmethod
+    async def __read_chunked(reader):
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            size = int(size_line.split(b';', 1)[0], 16)
+            if size == 0:
+                await reader.readuntil(b'\r\n')  # no trailers supported
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def close(self):
+        'Close all idle connections.'
+        for idle in self.__idle.values():
+            for reader, writer, last_used in idle:
+                writer.close()
+        self.__idle.clear()
+
+
+class AsyncHTTPEndpoint(HTTPEndpoint):
+    '''GraphQL access over HTTP using :mod:`asyncio`.
+
+    Same as :class:`sgqlc.endpoint.http.HTTPEndpoint`, however the
+    object is called with ``await``, with parameters: ``query``,
+    ``variables``, ``operation_name``, ``extra_headers`` and
+    ``timeout``.
+
+    HTTP, JSON and GraphQL errors are converted to GraphQL-compliant
+    ``{"data": null, "errors": [...]}`` as done by the synchronous
+    endpoint. Connection errors and timeouts are raised, as
+    :exc:`OSError` and :exc:`asyncio.TimeoutError`.
+
+    Requests are sent by the :class:`AsyncHTTPConnectionPool` kept as
+    ``pool``. The synchronous ways of the base class, such as
+    ``urlopen``, raise :exc:`TypeError`.
+    '''
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, url, base_headers=None, timeout=None, method='POST',
+                 pool=None, persisted_queries=False, codec=None,
+                 accept_encoding=True, compress_requests=None):
+        '''
+        :param url: the default GraphQL endpoint url.
+        :type url: str
+
+        :param base_headers: the base HTTP headers to include in every request.
+        :type base_headers: dict
+
+        :param timeout: timeout in seconds for each request. Optional
+          (``None`` waits forever).
+        :type timeout: float
+
+        :param method: HTTP method to use, ``POST`` or ``GET``.
+        :type method: str
+
+        :param pool: connection pool to use, which may be shared
+          amongst endpoints. If ``None``, one with default parameters is
+          created.
+        :type pool: :class:`AsyncHTTPConnectionPool`
+
+        :param persisted_queries: use automatic persisted queries, see
+          :class:`sgqlc.endpoint.http.HTTPEndpoint`.
+        :type persisted_queries: bool
+
+        :param codec: JSON codec name or object, if ``None`` the
+          default is used, see :func:`sgqlc.codec.get_codec`.
+        :type codec: str or :class:`sgqlc.codec.JSONCodec`
+
+        :param accept_encoding: request compressed responses, see
+          :class:`sgqlc.endpoint.http.HTTPEndpoint`.
+        :type accept_encoding: bool or str
+
+        :param compress_requests: minimum size of compressed ``POST``
+          bodies, see :class:`sgqlc.endpoint.http.HTTPEndpoint`.
+        :type compress_requests: int
+        '''
+        super(AsyncHTTPEndpoint, self).__init__(
+            url, base_headers, timeout, urlopen=self._sync_unsupported,
+            method=method, persisted_queries=persisted_queries,
+            codec=codec, accept_encoding=accept_encoding,
+            compress_requests=compress_requests)
+        self.pool = pool or AsyncHTTPConnectionPool()
+
+    def _sync_unsupported(self, *args, **kwargs):
+        raise TypeError('%s must be called with await' % (
+            self.__class__.__name__,))
+
+    _execute = _sync_unsupported
+
+    async def __call__(self, query, variables=None, operation_name=None,
+                       extra_headers=None, timeout=None, response=None):
+        '''Calls the GraphQL endpoint.
+
+        :param query: the GraphQL query or mutation to execute. Note
+          that this is converted using ``bytes()``, thus one may pass
+          an object implementing ``__bytes__()`` method to return the
+          query, eventually in more compact form (no indentation, etc).
+        :type query: :class:`str` or :class:`bytes`.
+
+        :param variables: variables (dict) to use with
+          ``query``. This is only useful if the query or
+          mutation contains ``$variableName``.
+        :type variables: dict
+
+        :param operation_name: if more than one operation is listed in
+          ``query``, then it should specify the one to be executed.
+        :type operation_name: str
+
+        :param extra_headers: dict with extra HTTP headers to use.
+        :type extra_headers: dict
+
+        :param timeout: overrides the default timeout.
+        :type timeout: float
+
+        :param response: if given, it's filled with the HTTP ``status``
+          and ``headers`` of the response.
+        :type response: dict
+
+        :return: dict with optional fields ``data`` containing the GraphQL
+          returned data as nested dict and ``errors`` with an array of
+          errors. Note that both ``data`` and ``errors`` may be returned!
+          ``None`` if the server replied ``304 Not Modified``.
+        :rtype: dict
+        '''
+        query_hash = None
+        if self.persisted_queries:
+            query_hash = self._get_query_hash(query)
+            data = await self._send(query, variables, operation_name,
+                                    extra_headers, timeout, query_hash, False,
+                                    response)
+            if data is None or not self._is_persisted_query_error(data):
+                return data
+
+        return await self._send(query, variables, operation_name,
+                                extra_headers, timeout, query_hash, True,
+                                response)
+
+    async def _send(self, query, variables, operation_name, extra_headers,
+                    timeout, query_hash=None, send_query=True, response=None):
+        query, req = self._prepare_http_request(
+            query, variables, operation_name, extra_headers,
+            query_hash, send_query)
+
+        status, reason, headers, body = await asyncio.wait_for(
+            self.pool.request(req), timeout or self.timeout)
+
+        self._store_response(response, status, headers)
+        if status == 304:
+            return None
+        if status >= 400:
+            exc = urllib.error.HTTPError(req.full_url, status, reason,
+                                         headers, io.BytesIO(body))
+            return self._log_http_error(query, req, exc)
+
+        body = compression.decompress(body, headers)
+        return self._decode_http_response(query, body, not send_query)
+
+    async def execute_batch(self, operations, extra_headers=None,
+                            timeout=None):
+        '''Calls the GraphQL endpoint with many operations at once.
+
+        Same as :func:`sgqlc.endpoint.http.HTTPEndpoint.execute_batch`,
+        but called with ``await``.
+        '''
+        queries, req = self._prepare_http_batch_request(
+            operations, extra_headers)
+
+        status, reason, headers, body = await asyncio.wait_for(
+            self.pool.request(req), timeout or self.timeout)
+
+        if status >= 400:
+            exc = urllib.error.HTTPError(req.full_url, status, reason,
+                                         headers, io.BytesIO(body))
+            data = self._log_http_error('\n'.join(queries), req, exc)
+            return self._replicate_error(data, len(queries))
+
+        body = compression.decompress(body, headers)
+        return self._decode_http_batch_response(queries, body)
+
+    async def execute_many(self, operations, max_concurrency=4, **kwargs):
+        '''Calls the GraphQL endpoint for each operation, concurrently.
+
+        Same as :func:`sgqlc.endpoint.base.BaseEndpoint.execute_many`,
+        however operations are executed as :mod:`asyncio` tasks
+        instead of threads, thus it's an asynchronous generator:
+
+        .. code-block:: python
+
+           async for data in endpoint.execute_many(ops, max_concurrency=8):
+               process(data)
+
+        Results are yielded in the same order as ``operations`` and at
+        most ``max_concurrency`` operations are in flight.
+        '''
+        pending = collections.deque()
+        try:
+            for op in operations:
+                if len(pending) >= max_concurrency:
+                    yield await pending.popleft()
+                pending.append(asyncio.ensure_future(
+                    self(*self._get_call_args(op), **kwargs)))
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for f in pending:
+                f.cancel()
@@ -14,6 +14,8 @@ __docformat__ = 'reStructuredText en'
 
 __all__ = ('BaseEndpoint',)
 
+import collections
+import concurrent.futures
 import logging
 
 
@@ -81,6 +83,67 @@ class BaseEndpoint:
         '''
         raise NotImplementedError()  # pragma: no cover
 
+    def execute_many(self, operations, max_concurrency=4, **kwargs):
+        '''Calls the GraphQL endpoint for each operation, concurrently.
+
+        Operations are executed by at most ``max_concurrency`` threads
+        and results are yielded in the same order as ``operations``,
+        as soon as they are available. Only up to ``max_concurrency``
+        operations are in flight at any time, so ``operations`` may be
+        a (lazy) iterator of any length and the results are not
+        accumulated in memory: a new operation is only taken once the
+        oldest result was consumed.
+
+        Each element of ``operations`` is either a query (anything
+        accepted by :func:`__call__`, such as
+        :class:`sgqlc.operation.Operation`) or a tuple
+        ``(query, variables)`` or ``(query, variables, operation_name)``.
+
+        Extra keyword arguments are given to every :func:`__call__`,
+        such as ``extra_headers`` or ``timeout``.
+
+        .. note::
+
+          Endpoints that keep connections, such as
+          :class:`sgqlc.endpoint.http.HTTPEndpoint` created with
+          ``pool=True``, will reuse them amongst the threads.
+
+        :param operations: queries to execute.
+        :type operations: iterable
+
+        :param max_concurrency: maximum number of parallel calls.
+        :type max_concurrency: int
+
+        :return: iterator of results, as returned by :func:`__call__`.
+        :rtype: generator
+        '''
+        operations = iter(operations)
+        pending = collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(max_concurrency) as pool:
+            try:
+                for op in operations:
+                    if len(pending) >= max_concurrency:
+                        yield pending.popleft().result()
+                    pending.append(pool.submit(
+                        self.__call__, *self._get_call_args(op), **kwargs))
+
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for f in pending:
+                    f.cancel()
+
+    @staticmethod
+    def _get_call_args(op):
+        '''Convert :func:`execute_many` element to positional arguments.
+
+        :return: tuple ``(query, variables, operation_name)``.
+        :rtype: tuple
+        '''
+        if isinstance(op, tuple):
+            return op + (None,) * (3 - len(op))
+        return (op, None, None)
+
     def _log_json_error(self, body, exc):
         '''Log a :exc:`json.JSONDecodeError`, converting to
         GraphQL's ``{"data": null, "errors": [{"message": str(exc)...}]}``
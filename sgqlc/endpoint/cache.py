@@ -0,0 +1,743 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Response Cache
+==============
+
+:class:`CachedEndpoint` wraps any synchronous
+:class:`sgqlc.endpoint.base.BaseEndpoint`, keeping successful query
+results so identical calls don't reach the server until they expire:
+
+.. code-block:: python
+
+   endpoint = CachedEndpoint(HTTPEndpoint(url, headers), ttl=30)
+   data = endpoint(op)  # sent to the server
+   data = endpoint(op)  # from the cache, during the next 30 seconds
+
+Results are keyed by the :func:`fingerprint` of the query, variables,
+operation name and endpoint (its URL and headers, such as
+``Authorization``) and stored in a :class:`ResponseCache`, an in-memory
+LRU limited by number of entries and bytes. They are kept as encoded
+JSON, thus every call gets its own copy that may be changed, such as
+by ``operation + data``.
+
+If the wrapped endpoint is a :class:`sgqlc.endpoint.http.HTTPEndpoint`,
+the response headers are honored:
+
+ - ``Cache-Control: no-store`` results are not kept;
+ - ``Cache-Control: max-age=N`` overrides ``ttl`` (minus ``Age``);
+ - ``Cache-Control: no-cache`` results must be validated every time;
+ - expired results with an ``ETag`` are validated sending
+   ``If-None-Match``, then ``304 Not Modified`` renews them without
+   transferring the body again.
+
+Concurrent calls for the same key wait for the one that is being
+fetched instead of sending it again. Results with errors and documents
+with mutations or subscriptions are never cached.
+
+Results may be kept on disk with :class:`SQLiteResponseCache`, shared
+by processes and surviving restarts, usually behind a faster in-memory
+tier using :class:`TieredCache`:
+
+.. code-block:: python
+
+   cache = TieredCache(ResponseCache(), SQLiteResponseCache('cache.db'))
+   endpoint = CachedEndpoint(HTTPEndpoint(url, headers), cache, ttl=3600)
+
+A crawl interrupted by a crash then resumes without fetching the same
+pages again. With ``CachedEndpoint(endpoint, cache, replay=True)``
+stored results are used regardless of their expiration, which allows
+CI or benchmarks to replay recorded responses deterministically, only
+missing ones are fetched (and stored).
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = (
+    'CachedEndpoint', 'ResponseCache', 'SQLiteResponseCache', 'TieredCache',
+    'CacheEntry', 'fingerprint',
+)
+
+import collections
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+
+from .base import BaseEndpoint
+from .http import HTTPEndpoint
+from ..codec import get_codec
+
+
+def _query_to_bytes(query):
+    if isinstance(query, bytes):
+        return query
+    elif isinstance(query, str):
+        return query.encode('utf-8')
+    # allows sgqlc.operation.Operation, which caches its bytes
+    return bytes(query)
+
+
+def fingerprint(query, variables=None, operation_name=None, codec=None,
+                namespace=None):
+    '''Stable key of a GraphQL call, as SHA-256 hex digest.
+
+    The variables are encoded with sorted keys, thus their order
+    doesn't matter:
+
+    >>> a = fingerprint('query Q($a: Int, $b: Int) { f(a: $a, b: $b) }',
+    ...                 {'a': 1, 'b': 2}, 'Q')
+    >>> b = fingerprint('query Q($a: Int, $b: Int) { f(a: $a, b: $b) }',
+    ...                 {'b': 2, 'a': 1}, 'Q')
+    >>> a == b
+    True
+    >>> a == fingerprint('query Q($a: Int, $b: Int) { f(a: $a, b: $b) }',
+    ...                  {'a': 1, 'b': 3}, 'Q')
+    False
+    >>> len(a)
+    64
+
+    The same call to different endpoints, or with other credentials,
+    must use a different ``namespace``:
+
+    >>> a == fingerprint('query Q($a: Int, $b: Int) { f(a: $a, b: $b) }',
+    ...                  {'a': 1, 'b': 2}, 'Q', namespace='http://other')
+    False
+
+    :param query: the query, as given to the endpoint. If it provides
+      ``__sha256__``, such as :class:`sgqlc.operation.Operation`,
+      that is used instead of hashing the query again.
+
+    :param codec: JSON codec name or object to encode the variables,
+      see :func:`sgqlc.codec.get_codec`.
+
+    :param namespace: JSON value identifying the endpoint, it's only
+      hashed, thus it may contain credentials.
+
+    :rtype: str
+    '''
+    query_hash = getattr(query, '__sha256__', None)
+    if query_hash is None:
+        query_hash = hashlib.sha256(_query_to_bytes(query)).hexdigest()
+    h = hashlib.sha256(query_hash.encode('ascii'))
+    key = [variables, operation_name]
+    if namespace is not None:
+        key.append(namespace)
+    h.update(get_codec(codec).dumpb(
+        key, sort_keys=True, separators=(',', ':')))
+    return h.hexdigest()
+
+
+def _endpoint_namespace(endpoint):
+    '''Identity of an endpoint for :func:`fingerprint`.
+
+    Endpoints with ``url`` and ``base_headers``, such as
+    :class:`sgqlc.endpoint.http.HTTPEndpoint`, are identified by both:
+
+    >>> _endpoint_namespace(HTTPEndpoint('http://server/graphql',
+    ...                                  {'Authorization': 'bearer x'}))
+    ['http://server/graphql', [['Authorization', 'bearer x']]]
+    >>> print(_endpoint_namespace(BaseEndpoint()))
+    None
+    '''
+    url = getattr(endpoint, 'url', None)
+    if url is None:
+        return None
+    return [url, _headers_items(getattr(endpoint, 'base_headers', None))]
+
+
+def _headers_items(headers):
+    return sorted([str(k), str(v)] for k, v in (headers or {}).items())
+
+
+def parse_cache_control(value):
+    '''Parse ``Cache-Control`` header into a dict.
+
+    >>> parse_cache_control('private, max-age=60, no-cache="Set-Cookie"')
+    {'private': None, 'max-age': '60', 'no-cache': 'Set-Cookie'}
+    >>> parse_cache_control(None)
+    {}
+    '''
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.partition('=')
+        name = name.strip().lower()
+        if name:
+            directives[name] = arg.strip().strip('"') if arg else None
+    return directives
+
+
+class CacheEntry:
+    '''Cached result: encoded JSON ``body``, ``expires`` and ``etag``.
+
+    ``expires`` is a :func:`time.time` timestamp, after that the entry
+    may only be used if it's validated with the server using ``etag``.
+    '''
+
+    __slots__ = ('body', 'expires', 'etag')
+
+    def __init__(self, body, expires, etag=None):
+        self.body = body
+        self.expires = expires
+        self.etag = etag
+
+    def __repr__(self):
+        return '%s(%d bytes, expires=%r, etag=%r)' % (
+            self.__class__.__name__, len(self.body), self.expires,
+            self.etag)
+
+    def is_fresh(self, now=None):
+        return (time.time() if now is None else now) < self.expires
+
+
+class ResponseCache:
+    '''In-memory LRU of :class:`CacheEntry`, thread-safe.
+
+    Least recently used entries are evicted once there are more than
+    ``maxsize`` entries or their bodies sum more than ``max_bytes``:
+
+    >>> cache = ResponseCache(maxsize=2, max_bytes=10)
+    >>> cache.set('a', CacheEntry(b'1234', 0))
+    >>> cache.set('b', CacheEntry(b'1234', 0))
+    >>> cache.get('a')  # now 'b' is the least recently used
+    CacheEntry(4 bytes, expires=0, etag=None)
+    >>> cache.set('c', CacheEntry(b'1234', 0))
+    >>> len(cache), cache.size
+    (2, 8)
+    >>> print(cache.get('b'))
+    None
+    >>> cache.set('d', CacheEntry(b'123456', 0))
+    >>> sorted(cache.keys()), cache.size
+    (['c', 'd'], 10)
+    >>> cache.set('e', CacheEntry(b'12345678901', 0))  # too big, ignored
+    >>> sorted(cache.keys())
+    ['c', 'd']
+    >>> cache.delete('c')
+    >>> cache.delete('c')
+    >>> cache.clear()
+    >>> len(cache), cache.size
+    (0, 0)
+
+    Other caches, such as persistent ones, only need to provide
+    ``get()``, ``set()`` and ``delete()`` to be used by
+    :class:`CachedEndpoint`.
+    '''
+
+    def __init__(self, maxsize=1024, max_bytes=64 * 1024 * 1024):
+        '''
+        :param maxsize: maximum number of entries.
+        :type maxsize: int
+
+        :param max_bytes: maximum sum of the entries body length.
+        :type max_bytes: int
+        '''
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __str__(self):
+        return '%s(maxsize=%d, max_bytes=%d)' % (
+            self.__class__.__name__, self.maxsize, self.max_bytes)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def keys(self):
+        with self.__lock:
+            return list(self.__entries)
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):  # noqa: A003
+        size = len(entry.body)
+        if size > self.max_bytes:
+            self.delete(key)
+            return
+
+        with self.__lock:
+            self.__pop(key)
+            self.__entries[key] = entry
+            self.size += size
+            while len(self.__entries) > self.maxsize or \
+                    self.size > self.max_bytes:
+                self.__pop(next(iter(self.__entries)))
+
+    def delete(self, key):
+        with self.__lock:
+            self.__pop(key)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.size = 0
+
+    def __pop(self, key):
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+
+class _ConnectionHolder:
+    '''Thread local connection, closed once the thread exits.'''
+
+    __slots__ = ('conn', 'pid', 'close', '__weakref__')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.close = weakref.finalize(self, conn.close)
+
+
+class SQLiteResponseCache:
+    '''Persistent cache of :class:`CacheEntry` using :mod:`sqlite3`.
+
+    The bodies are compressed with :mod:`zlib`. Least recently used
+    entries are evicted once there are more than ``maxsize`` entries or
+    their compressed bodies sum more than ``max_bytes``. Reads don't
+    write to the database, their access time is written in batches by
+    the next :func:`set`, once ``access_batch`` entries were read or by
+    :func:`flush`:
+
+    >>> import tempfile
+    >>> tmpdir = tempfile.TemporaryDirectory()
+    >>> path = os.path.join(tmpdir.name, 'cache.db')
+    >>> cache = SQLiteResponseCache(path, maxsize=2)
+    >>> cache.set('a', CacheEntry(b'{"data": {}}', 10, '"v1"'))
+    >>> cache.set('b', CacheEntry(b'{"data": null}', 20))
+    >>> cache.get('a')  # now 'b' is the least recently used
+    CacheEntry(12 bytes, expires=10.0, etag='"v1"')
+    >>> cache.set('c', CacheEntry(b'{}', 30))
+    >>> sorted(cache.keys())
+    ['a', 'c']
+
+    The file may be used by many threads and processes at once, each
+    gets its own connection, closed once the thread exits:
+
+    >>> other = SQLiteResponseCache(path)
+    >>> other.get('c')
+    CacheEntry(2 bytes, expires=30.0, etag=None)
+    >>> other.delete('c')
+    >>> print(cache.get('c'))
+    None
+    >>> cache.clear()
+    >>> len(other), other.size
+    (0, 0)
+    >>> cache.close()
+    >>> other.close()
+    >>> tmpdir.cleanup()
+    '''
+
+    def __init__(self, path, maxsize=100000, max_bytes=1024 * 1024 * 1024,
+                 compress_level=6, timeout=30, access_batch=1000):
+        '''
+        :param path: the database file, created if needed.
+        :type path: str
+
+        :param maxsize: maximum number of entries.
+        :type maxsize: int
+
+        :param max_bytes: maximum sum of the compressed bodies length.
+        :type max_bytes: int
+
+        :param compress_level: :func:`zlib.compress` level.
+        :type compress_level: int
+
+        :param timeout: seconds to wait for other processes writing
+          to the database.
+        :type timeout: float
+
+        :param access_batch: number of entries read whose access time
+          is kept in memory before it's written.
+        :type access_batch: int
+        '''
+        self.path = path
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.timeout = timeout
+        self.access_batch = access_batch
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__holders = weakref.WeakSet()  # to close() all threads'
+        self.__accessed = {}  # key -> time.time() not yet written
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                         'key TEXT PRIMARY KEY, body BLOB NOT NULL, '
+                         'size INTEGER NOT NULL, expires REAL NOT NULL, '
+                         'etag TEXT, accessed REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed '
+                         'ON responses (accessed)')
+
+    def __str__(self):
+        return '%s(%r, maxsize=%d, max_bytes=%d)' % (
+            self.__class__.__name__, self.path, self.maxsize,
+            self.max_bytes)
+
+    def _connection(self):
+        '''Connection of the current thread and process.'''
+        local = self.__local
+        holder = getattr(local, 'holder', None)
+        if holder is not None and holder.pid == os.getpid():
+            return holder.conn
+
+        if holder is not None:  # forked: the parent still uses it
+            holder.close.detach()
+        holder = local.holder = _ConnectionHolder(sqlite3.connect(
+            self.path, timeout=self.timeout, isolation_level=None,
+            check_same_thread=False))
+        self.__holders.add(holder)
+        return holder.conn
+
+    def __len__(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @property
+    def size(self):
+        'Sum of the compressed bodies length.'
+        return self._connection().execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def keys(self):
+        return [row[0] for row in self._connection().execute(
+            'SELECT key FROM responses')]
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT body, expires, etag FROM responses WHERE key = ?',
+            (key,)).fetchone()
+        if row is None:
+            return None
+        with self.__lock:
+            self.__accessed[key] = time.time()
+            full = len(self.__accessed) >= self.access_batch
+        if full:
+            self.flush()
+        body, expires, etag = row
+        return CacheEntry(zlib.decompress(body), expires, etag)
+
+    def set(self, key, entry):  # noqa: A003
+        body = zlib.compress(entry.body, self.compress_level)
+        size = len(body)
+        if size > self.max_bytes:
+            self.delete(key)
+            return
+
+        def insert(conn):
+            conn.execute('INSERT OR REPLACE INTO responses '
+                         '(key, body, size, expires, etag, accessed) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         (key, body, size, entry.expires, entry.etag,
+                          time.time()))
+            self.__evict(conn)
+
+        self.__write(insert)
+
+    def flush(self):
+        'Write the access time of the entries read.'
+        self.__write()
+
+    def __write(self, func=None):
+        # the access times are written first, so eviction uses them
+        with self.__lock:
+            accessed, self.__accessed = self.__accessed, {}
+
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if accessed:
+                conn.executemany(
+                    'UPDATE responses SET accessed = ? WHERE key = ?',
+                    [(t, key) for key, t in accessed.items()])
+            if func is not None:
+                func(conn)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def __evict(self, conn):
+        count, total = conn.execute(
+            'SELECT COUNT(*), SUM(size) FROM responses').fetchone()
+        if count <= self.maxsize and total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in conn.execute(
+                'SELECT key, size FROM responses ORDER BY accessed'):
+            if count <= self.maxsize and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+    def delete(self, key):
+        self._connection().execute('DELETE FROM responses WHERE key = ?',
+                                   (key,))
+
+    def clear(self):
+        self._connection().execute('DELETE FROM responses')
+
+    def close(self):
+        'Write the pending access times, close all threads connections.'
+        self.flush()
+        for holder in list(self.__holders):
+            holder.close()
+        self.__local = threading.local()
+
+
+class TieredCache:
+    '''Look up entries in many caches, fastest first.
+
+    Entries found in a slower cache are copied to the faster ones,
+    new entries are stored in all of them:
+
+    >>> memory, disk = ResponseCache(), ResponseCache()
+    >>> cache = TieredCache(memory, disk)
+    >>> disk.set('a', CacheEntry(b'{}', 10))
+    >>> cache.get('a')
+    CacheEntry(2 bytes, expires=10, etag=None)
+    >>> memory.keys()
+    ['a']
+    >>> cache.set('b', CacheEntry(b'[]', 10))
+    >>> memory.keys(), disk.keys()
+    (['a', 'b'], ['a', 'b'])
+    >>> cache.delete('a')
+    >>> memory.keys(), disk.keys()
+    (['b'], ['b'])
+    >>> print(cache.get('a'))
+    None
+    >>> cache.clear()
+    >>> len(memory), len(disk)
+    (0, 0)
+    '''
+
+    def __init__(self, *caches):
+        self.caches = caches
+
+    def __str__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join(str(c) for c in self.caches))
+
+    def get(self, key):
+        for i, cache in enumerate(self.caches):
+            entry = cache.get(key)
+            if entry is not None:
+                for faster in self.caches[:i]:
+                    faster.set(key, entry)
+                return entry
+        return None
+
+    def set(self, key, entry):  # noqa: A003
+        for cache in self.caches:
+            cache.set(key, entry)
+
+    def delete(self, key):
+        for cache in self.caches:
+            cache.delete(key)
+
+    def clear(self):
+        for cache in self.caches:
+            cache.clear()
+
+
+class _Fetch:
+    __slots__ = ('done', 'body', 'exception')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.body = None
+        self.exception = None
+
+
+class CachedEndpoint(BaseEndpoint):
+    '''Cache query results of another endpoint.
+
+    The object is callable with the same parameters as the wrapped
+    ``endpoint``, extra keyword arguments such as ``extra_headers`` and
+    ``timeout`` are given to it. Only ``extra_headers`` are part of the
+    cache key, as they may change the results, such as with a different
+    ``Authorization``.
+
+    The counters ``hits``, ``misses`` and ``revalidations`` (``304
+    Not Modified``) are kept as members.
+    '''
+
+    logger = logging.getLogger(__name__)
+
+    _re_not_cacheable = re.compile(rb'^\s*(mutation|subscription)\b', re.M)
+
+    def __init__(self, endpoint, cache=None, ttl=60, codec=None,
+                 replay=False, namespace=None):
+        '''
+        :param endpoint: the endpoint to send the queries not cached.
+        :type endpoint: :class:`sgqlc.endpoint.base.BaseEndpoint`
+
+        :param cache: where to keep the results, if ``None`` a
+          :class:`ResponseCache` with default parameters is created.
+          It may be shared amongst endpoints.
+        :type cache: :class:`ResponseCache`
+
+        :param ttl: seconds results are used without asking the server,
+          unless it gives ``Cache-Control``.
+        :type ttl: float
+
+        :param codec: JSON codec name or object to store the results,
+          if ``None`` the endpoint's or the default is used, see
+          :func:`sgqlc.codec.get_codec`.
+        :type codec: str or :class:`sgqlc.codec.JSONCodec`
+
+        :param replay: use cached results even if they expired and
+          store all successful results, ignoring ``Cache-Control``.
+        :type replay: bool
+
+        :param namespace: identifies the ``endpoint`` in the cache keys,
+          see :func:`fingerprint`. If ``None``, its ``url`` and
+          ``base_headers`` are used, if any. Endpoints sharing a
+          ``cache`` with the same namespace share their results.
+        :type namespace: str
+        '''
+        if codec is None:
+            codec = getattr(endpoint, 'codec', None)
+        if namespace is None:
+            namespace = _endpoint_namespace(endpoint)
+        self.endpoint = endpoint
+        self.cache = ResponseCache() if cache is None else cache
+        self.ttl = ttl
+        self.codec = get_codec(codec)
+        self.replay = replay
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.__http = isinstance(endpoint, HTTPEndpoint)
+        self.__lock = threading.Lock()
+        self.__pending = {}  # key -> _Fetch
+
+    def __str__(self):
+        return '%s(endpoint=%s, cache=%s, ttl=%r)' % (
+            self.__class__.__name__, self.endpoint, self.cache, self.ttl)
+
+    def __call__(self, query, variables=None, operation_name=None,
+                 **kwargs):
+        '''Calls the GraphQL endpoint, unless the result is cached.
+
+        See :func:`sgqlc.endpoint.base.BaseEndpoint.__call__`.
+        '''
+        if self._re_not_cacheable.search(_query_to_bytes(query)):
+            return self.endpoint(query, variables, operation_name, **kwargs)
+
+        namespace = self.namespace
+        extra_headers = kwargs.get('extra_headers')
+        if extra_headers:
+            namespace = [namespace, _headers_items(extra_headers)]
+        key = fingerprint(query, variables, operation_name, self.codec,
+                          namespace)
+        entry = self.cache.get(key)
+        if entry is not None and (self.replay or entry.is_fresh()):
+            self.__count('hits')
+            return self.codec.loads(entry.body)
+
+        with self.__lock:
+            fetch = self.__pending.get(key)
+            leader = fetch is None
+            if leader:
+                fetch = self.__pending[key] = _Fetch()
+
+        if not leader:
+            fetch.done.wait()
+            if fetch.exception is not None:
+                raise fetch.exception
+            if fetch.body is not None:
+                self.__count('hits')
+                return self.codec.loads(fetch.body)
+            return self.endpoint(query, variables, operation_name, **kwargs)
+
+        try:
+            data, fetch.body = self.__fetch(
+                key, entry, query, variables, operation_name, kwargs)
+        except BaseException as exc:
+            fetch.exception = exc
+            raise
+        finally:
+            with self.__lock:
+                del self.__pending[key]
+            fetch.done.set()
+        return data
+
+    def __count(self, name):
+        with self.__lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def __fetch(self, key, entry, query, variables, operation_name, kwargs):
+        response = None
+        if self.__http:
+            response = kwargs.get('response')
+            if response is None:
+                response = kwargs['response'] = {}
+            if entry is not None and entry.etag:
+                headers = dict(kwargs.get('extra_headers') or {})
+                headers['If-None-Match'] = entry.etag
+                kwargs['extra_headers'] = headers
+
+        data = self.endpoint(query, variables, operation_name, **kwargs)
+        headers = response and response.get('headers')
+        if data is None and entry is not None:  # 304 Not Modified
+            self.__count('revalidations')
+            self.logger.debug('%s: not modified, etag %s', key, entry.etag)
+            ttl = self._get_ttl(headers)
+            entry = CacheEntry(entry.body, time.time() + (ttl or 0),
+                               entry.etag)
+            self.cache.set(key, entry)
+            return self.codec.loads(entry.body), entry.body
+
+        self.__count('misses')
+        ttl = self._get_ttl(headers)
+        etag = headers.get('ETag') if headers else None
+        if not data or data.get('errors') or ttl is None or \
+           (ttl <= 0 and not etag and not self.replay):
+            if entry is not None:
+                self.cache.delete(key)
+            return data, None
+
+        body = self.codec.dumpb(data)
+        self.cache.set(key, CacheEntry(body, time.time() + ttl, etag))
+        return data, body
+
+    def _get_ttl(self, headers):
+        '''Seconds to keep the result given the response headers.
+
+        :return: ``None`` if it must not be stored.
+        '''
+        if not headers or self.replay:
+            return self.ttl
+
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        max_age = directives.get('max-age')
+        if max_age is None:
+            return self.ttl
+        try:
+            return int(max_age) - int(headers.get('Age') or 0)
+        except ValueError:
+            return self.ttl
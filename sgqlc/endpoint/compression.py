@@ -0,0 +1,253 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+HTTP Content Encoding
+=====================
+
+Decoders of HTTP ``Content-Encoding`` used by
+:class:`sgqlc.endpoint.http.HTTPEndpoint`, which advertises the
+available ones as ``Accept-Encoding``, preferring the best compression:
+``zstd`` if `zstandard <https://pypi.org/project/zstandard/>`_ is
+installed, ``br`` if `brotli <https://pypi.org/project/Brotli/>`_ is
+installed, then ``gzip`` and ``deflate`` from :mod:`zlib`:
+
+>>> 'gzip, deflate' in get_accept_encoding()
+True
+
+Responses are decompressed while they are read, thus huge ones may
+still be parsed incrementally:
+
+>>> import io
+>>> body = b'{"data": {"name": "sgqlc"}}'
+>>> compressed = compress(body)
+>>> f = DecodingReader(io.BytesIO(compressed), ['gzip'])
+>>> f.read(10), f.read(10), f.read()
+(b'{"data": {', b'"name": "s', b'gqlc"}}')
+>>> f.read(10)
+b''
+
+Both ``zlib`` wrapped and raw ``deflate`` streams are accepted, since
+servers send either:
+
+>>> import zlib
+>>> decompress(zlib.compress(body), 'deflate') == body
+True
+>>> raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+>>> decompress(raw.compress(body) + raw.flush(), 'deflate') == body
+True
+
+Multiple encodings are undone in reverse order, ``identity`` and
+missing headers leave the body as is:
+
+>>> decompress(compress(zlib.compress(body)), 'deflate, gzip') == body
+True
+>>> decompress(body, 'identity') == body
+True
+>>> decompress(body, None) == body
+True
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = (
+    'DecodingReader', 'compress', 'decompress', 'get_accept_encoding',
+    'get_content_encodings',
+)
+
+import zlib
+from collections import OrderedDict
+
+
+class GzipDecoder:
+    'Decoder of ``gzip`` content encoding.'
+
+    name = 'gzip'
+
+    def __init__(self):
+        self.obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        return self.obj.decompress(data)
+
+    def flush(self):
+        return self.obj.flush()
+
+
+class DeflateDecoder(GzipDecoder):
+    'Decoder of ``deflate`` content encoding, either zlib wrapped or raw.'
+
+    name = 'deflate'
+
+    def __init__(self):
+        self.obj = None
+
+    def decompress(self, data):
+        if self.obj is None:
+            if not data:
+                return b''
+            wbits = -zlib.MAX_WBITS
+            if len(data) > 1 and data[0] & 0x0f == 8 and \
+               (data[0] << 8 | data[1]) % 31 == 0:
+                wbits = zlib.MAX_WBITS  # valid zlib header
+            self.obj = zlib.decompressobj(wbits)
+        return self.obj.decompress(data)
+
+    def flush(self):
+        return self.obj.flush() if self.obj is not None else b''
+
+
+class ZstdDecoder:
+    '''Decoder of ``zstd`` content encoding.
+
+    :raise ImportError: if ``zstandard`` is not installed.
+    '''
+
+    name = 'zstd'
+
+    def __init__(self):
+        import zstandard
+        self.obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        return self.obj.decompress(data) if data else b''
+
+    def flush(self):  # pragma: no cover
+        return b''
+
+
+class BrotliDecoder:
+    '''Decoder of ``br`` content encoding.
+
+    :raise ImportError: if ``brotli`` (or ``brotlicffi``) is not installed.
+    '''
+
+    name = 'br'
+
+    def __init__(self):
+        try:
+            import brotli
+        except ImportError:
+            import brotlicffi as brotli
+        obj = brotli.Decompressor()
+        self.process = getattr(obj, 'process', None) or obj.decompress
+
+    def decompress(self, data):  # pragma: no cover
+        return self.process(data) if data else b''
+
+    def flush(self):  # pragma: no cover
+        return b''
+
+
+decoders = OrderedDict()  # preferred first
+
+for _cls in (ZstdDecoder, BrotliDecoder, GzipDecoder, DeflateDecoder):
+    try:
+        _cls()
+        decoders[_cls.name] = _cls
+    except ImportError:
+        pass
+
+del _cls
+
+
+def get_accept_encoding():
+    '''Value of ``Accept-Encoding`` with the available decoders.
+
+    :rtype: str
+    '''
+    return ', '.join(decoders)
+
+
+def get_content_encodings(headers):
+    '''Get the ``Content-Encoding`` list, if it can be decoded.
+
+    :param headers: the response headers or ``Content-Encoding`` value.
+    :type headers: :class:`http.client.HTTPMessage` or str
+
+    :return: list of encodings, in the order they were applied. Empty
+      if there is no encoding or if any is not known, then the body
+      can't be decoded and is used as is.
+    :rtype: list
+    '''
+    if headers is not None and not isinstance(headers, str):
+        headers = headers.get('Content-Encoding')
+    if not headers:
+        return []
+
+    encodings = []
+    for name in headers.split(','):
+        name = name.strip().lower()
+        if name and name != 'identity':
+            if name not in decoders:
+                return []
+            encodings.append(name)
+    return encodings
+
+
+class DecodingReader:
+    '''Decode a file-like object while it's read.
+
+    :param f: the object with compressed contents, such as the HTTP
+      response.
+
+    :param encodings: as returned by :func:`get_content_encodings`.
+    :type encodings: list
+    '''
+
+    def __init__(self, f, encodings):
+        self.f = f
+        self.decoders = [decoders[name]() for name in reversed(encodings)]
+        self.buffer = b''
+        self.eof = False
+
+    def read(self, amt=None):
+        if amt is None or amt < 0:
+            data = self.buffer + self.decode(self.f.read(), True)
+            self.buffer = b''
+            self.eof = True
+            return data
+
+        while len(self.buffer) < amt and not self.eof:
+            chunk = self.f.read(amt)
+            self.eof = not chunk
+            self.buffer += self.decode(chunk, self.eof)
+
+        data = self.buffer[:amt]
+        self.buffer = self.buffer[amt:]
+        return data
+
+    def decode(self, data, final=False):
+        'Decode the next compressed ``data``, ``final`` if it was the last.'
+        for decoder in self.decoders:
+            data = decoder.decompress(data)
+            if final:
+                data += decoder.flush()
+        return data
+
+
+def decompress(body, headers):
+    '''Decode the whole ``body`` given the response ``headers``.
+
+    :param headers: the response headers or ``Content-Encoding`` value.
+    :type headers: :class:`http.client.HTTPMessage` or str
+
+    :rtype: bytes
+    '''
+    encodings = get_content_encodings(headers)
+    if not encodings:
+        return body
+    return DecodingReader(None, encodings).decode(body, True)
+
+
+def compress(body, level=6):
+    '''Compress the request ``body`` using ``gzip``.
+
+    The output doesn't depend on the time, unlike :func:`gzip.compress`.
+
+    :rtype: bytes
+    '''
+    obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return obj.compress(body) + obj.flush()
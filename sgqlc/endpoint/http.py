@@ -6,7 +6,36 @@ Synchronous HTTP Endpoint
 =========================
 
 This endpoint implements GraphQL client using
-:func:`urllib.request.urlopen()` or compatible function.
+:func:`urllib.request.urlopen()` or compatible function, such as
+:class:`HTTPConnectionPool`, which keeps persistent connections to
+avoid a new TCP (and TLS) handshake per query.
+
+Servers that accept a JSON array of operations in a single ``POST``
+can be used with :func:`HTTPEndpoint.execute_batch`, or
+``HTTPEndpoint(url, batch_size=N)`` to transparently coalesce calls
+done concurrently, such as by :func:`HTTPEndpoint.execute_many`, see
+:class:`QueryBatcher`.
+
+Automatic persisted queries (APQ) are enabled with
+``HTTPEndpoint(url, persisted_queries=True)``: only the query SHA-256
+hash is sent and the full query is sent only if the server doesn't
+know it yet. Combined with ``method='GET'`` the responses may be
+cached by CDNs.
+
+Huge responses may be parsed incrementally with
+``HTTPEndpoint(url, streaming=True)`` or by giving ``callbacks`` to
+handle sub-trees as soon as they are parsed, see
+:mod:`sgqlc.endpoint.json_stream`.
+
+Requests are encoded and responses decoded straight from bytes by the
+JSON codec given as ``HTTPEndpoint(url, codec='orjson')`` or the
+default one, see :mod:`sgqlc.codec`.
+
+Compressed responses are requested with ``Accept-Encoding`` and
+decompressed while they are read, see :mod:`sgqlc.endpoint.compression`.
+Large requests, such as mutations with huge variables, may be sent
+compressed with ``HTTPEndpoint(url, compress_requests=1024)``, if the
+server accepts ``Content-Encoding: gzip``.
 
 This module provides command line utility:
 
@@ -19,15 +48,23 @@ This module provides command line utility:
 
 __docformat__ = 'reStructuredText en'
 
-__all__ = ('HTTPEndpoint',)
+__all__ = ('HTTPEndpoint', 'HTTPConnectionPool')
 
+import hashlib
+import http.client
+import io
 import json
 import logging
+import re
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
 
+from . import compression, json_stream
 from .base import BaseEndpoint
+from ..codec import get_codec
 
 
 def add_query_to_url(url, extra_query):
@@ -59,6 +96,317 @@ def add_query_to_url(url, extra_query):
     return merged_split.geturl()
 
 
+def _is_idempotent(req):
+    '''Whether the request may be sent again if its response was lost.
+
+    :class:`HTTPEndpoint` sets ``req.idempotent``, ``False`` for
+    mutations. Otherwise only ``GET`` and ``HEAD`` are idempotent.
+    '''
+    idempotent = getattr(req, 'idempotent', None)
+    if idempotent is None:
+        return req.get_method() in ('GET', 'HEAD')
+    return idempotent
+
+
+class HTTPConnectionPool:
+    '''Persistent HTTP connections, usable as ``urlopen``.
+
+    Keeps up to ``maxsize`` :class:`http.client.HTTPConnection` (or
+    :class:`http.client.HTTPSConnection`) per host, reusing them
+    (HTTP keep-alive) for sequential requests. Checkout is thread-safe
+    and blocks once all the host connections are in use. Connections
+    that are idle for more than ``idle_timeout`` seconds are closed.
+
+    The object is callable with the same interface as
+    :func:`urllib.request.urlopen`, given a
+    :class:`urllib.request.Request` and ``timeout``, thus can be
+    given to :class:`HTTPEndpoint` as ``pool`` (or ``urlopen``). Like
+    ``urlopen()``, HTTP errors (status >= 400) are raised as
+    :exc:`urllib.error.HTTPError`. Unlike it, redirects are not
+    followed.
+
+    The connection is given back to the pool once the response is
+    fully read and closed, which is done using ``with``::
+
+       pool = HTTPConnectionPool()
+       with pool(urllib.request.Request(url)) as f:
+           body = f.read()
+
+    If the server closed a reused connection, the request is retried
+    once with a new connection, unless it was sent and isn't
+    idempotent, such as mutations: the server may have processed it
+    before closing, then the error is raised.
+    '''
+
+    def __init__(self, maxsize=10, idle_timeout=60, ssl_context=None):
+        '''
+        :param maxsize: maximum number of connections per host.
+        :type maxsize: int
+
+        :param idle_timeout: seconds an unused connection is kept open.
+        :type idle_timeout: float
+
+        :param ssl_context: used to create HTTPS connections, if ``None``
+          the default context is used.
+        :type ssl_context: :class:`ssl.SSLContext`
+        '''
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context
+        self.__cond = threading.Condition()
+        self.__idle = {}  # key -> [(connection, last_used), ...]
+        self.__in_use = {}  # key -> count
+
+    def __str__(self):
+        return '%s(maxsize=%d, idle_timeout=%r)' % (
+            self.__class__.__name__, self.maxsize, self.idle_timeout)
+
+    def __call__(self, req, timeout=None):
+        split = urllib.parse.urlsplit(req.full_url)
+        key = (split.scheme, split.hostname, split.port)
+        method = req.get_method()
+        headers = dict(req.header_items())
+
+        conn, reused = self._checkout(key)
+        try:
+            self.__set_timeout(conn, timeout)
+            sent = False
+            try:
+                conn.request(method, req.selector, req.data, headers)
+                sent = True
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError):
+                if not reused or (sent and not _is_idempotent(req)):
+                    raise
+                conn.close()  # server dropped an idle one, reconnect
+                conn.request(method, req.selector, req.data, headers)
+                response = conn.getresponse()
+        except BaseException:
+            self._checkin(key, conn, False)
+            raise
+
+        f = PooledResponse(self, key, conn, response, req.full_url)
+        if response.status >= 400:
+            with f:
+                body = f.read()
+            raise urllib.error.HTTPError(req.full_url, response.status,
+                                         response.reason, response.headers,
+                                         io.BytesIO(body))
+        return f
+
+    @staticmethod
+    def __set_timeout(conn, timeout):
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+
+    def _create_connection(self, key):
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port,
+                                               context=self.ssl_context)
+        return http.client.HTTPConnection(host, port)
+
+    def _checkout(self, key):
+        '''Get an idle or new connection for ``key``, waiting if needed.
+
+        :return: tuple with the connection and whether it was reused.
+        '''
+        with self.__cond:
+            while True:
+                self.__evict_idle()
+                idle = self.__idle.get(key)
+                if idle:
+                    conn, _ = idle.pop()
+                    self.__in_use[key] += 1
+                    return conn, True
+
+                in_use = self.__in_use.get(key, 0)
+                if in_use < self.maxsize:
+                    self.__in_use[key] = in_use + 1
+                    return self._create_connection(key), False
+
+                self.__cond.wait()
+
+    def _checkin(self, key, conn, reusable):
+        '''Give back a connection taken with ``_checkout()``.'''
+        with self.__cond:
+            self.__in_use[key] -= 1
+            if reusable and conn.sock is not None:
+                self.__idle.setdefault(key, []).append(
+                    (conn, time.monotonic()))
+            else:
+                conn.close()
+            self.__cond.notify()
+
+    def __evict_idle(self):
+        deadline = time.monotonic() - self.idle_timeout
+        for idle in self.__idle.values():
+            while idle and idle[0][1] <= deadline:
+                conn, _ = idle.pop(0)
+                conn.close()
+
+    def close(self):
+        'Close all idle connections.'
+        with self.__cond:
+            for idle in self.__idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self.__idle.clear()
+
+
+class PooledResponse:
+    '''Response from :class:`HTTPConnectionPool`.
+
+    Wraps :class:`http.client.HTTPResponse`, giving the connection
+    back to the pool once it's closed. The connection is only reused
+    if the response was fully read.
+    '''
+
+    def __init__(self, pool, key, conn, response, url):
+        self.pool = pool
+        self.key = key
+        self.conn = conn
+        self.response = response
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def read(self, amt=None):
+        return self.response.read(amt)
+
+    def getheader(self, name, default=None):
+        return self.response.getheader(name, default)
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.status
+
+    def close(self):
+        if self.conn is None:
+            return
+        response = self.response
+        reusable = response.isclosed() and not response.will_close
+        response.close()
+        self.pool._checkin(self.key, self.conn, reusable)
+        self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _BatchEntry:
+    __slots__ = ('operation', 'leader', 'done', 'result', 'exception')
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.leader = False
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class QueryBatcher:
+    '''Coalesce concurrent :class:`HTTPEndpoint` calls into batches.
+
+    The first call waits up to ``window`` seconds for calls from other
+    threads to join, then sends up to ``size`` of them in a single
+    request using :func:`HTTPEndpoint.execute_batch`. Each caller gets
+    its own result back. If no other call joined, the query is sent
+    alone as a regular request.
+
+    Calls that exceed ``size`` are sent by the next batch, led by the
+    first of them. This is created by :class:`HTTPEndpoint` if given
+    ``batch_size``.
+    '''
+
+    def __init__(self, endpoint, size, window):
+        '''
+        :param endpoint: the endpoint to send the queries.
+        :type endpoint: :class:`HTTPEndpoint`
+
+        :param size: maximum number of operations per batch.
+        :type size: int
+
+        :param window: seconds to wait for other calls to join.
+        :type window: float
+        '''
+        self.endpoint = endpoint
+        self.size = size
+        self.window = window
+        self.__cond = threading.Condition()
+        self.__queue = []
+
+    def __str__(self):
+        return '%s(size=%d, window=%r)' % (
+            self.__class__.__name__, self.size, self.window)
+
+    def __call__(self, query, variables=None, operation_name=None,
+                 timeout=None):
+        entry = _BatchEntry((query, variables, operation_name))
+        with self.__cond:
+            self.__queue.append(entry)
+            if len(self.__queue) == 1:
+                entry.leader = True
+            elif len(self.__queue) == self.size:
+                self.__cond.notify_all()
+
+        if not entry.leader:
+            entry.done.wait()
+            if not entry.leader:
+                if entry.exception is not None:
+                    raise entry.exception
+                return entry.result
+
+        self.__send(self.__take_batch(), timeout)
+        return entry.result
+
+    def __send(self, batch, timeout):
+        try:
+            if len(batch) == 1:
+                results = [self.endpoint._execute(
+                    *batch[0].operation, None, timeout)]
+            else:
+                results = self.endpoint.execute_batch(
+                    [e.operation for e in batch], timeout=timeout)
+        except BaseException as exc:
+            for e in batch:
+                e.exception = exc
+                e.done.set()
+            raise
+
+        for e, result in zip(batch, results):
+            e.result = result
+            e.done.set()
+
+    def __take_batch(self):
+        deadline = time.monotonic() + self.window
+        with self.__cond:
+            while len(self.__queue) < self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.__cond.wait(remaining)
+
+            batch = self.__queue[:self.size]
+            del self.__queue[:self.size]
+            if self.__queue:
+                following = self.__queue[0]
+                following.leader = True
+                following.done.set()
+            return batch
+
+
 class HTTPEndpoint(BaseEndpoint):
     '''GraphQL access over HTTP.
 
@@ -97,8 +445,13 @@ class HTTPEndpoint(BaseEndpoint):
 
     logger = logging.getLogger(__name__)
 
+    _re_mutation = re.compile(r'^\s*mutation\b', re.M)
+
     def __init__(self, url, base_headers=None, timeout=None, urlopen=None,
-                 method='POST'):
+                 method='POST', pool=None, batch_size=None,
+                 batch_window=0.01, persisted_queries=False,
+                 streaming=False, codec=None, accept_encoding=True,
+                 compress_requests=None):
         '''
         :param url: the default GraphQL endpoint url.
         :type url: str
@@ -113,12 +466,75 @@ class HTTPEndpoint(BaseEndpoint):
 
         :param urlopen: function that implements the same interface as
           :func:`urllib.request.urlopen`, which is used by default.
+
+        :param pool: keep persistent connections to the server instead
+          of a new connection per request. Either ``True`` to create
+          an :class:`HTTPConnectionPool` with default parameters or a
+          pool instance, which may be shared amongst endpoints. If
+          given, it's used instead of ``urlopen``.
+        :type pool: bool or :class:`HTTPConnectionPool`
+
+        :param batch_size: if greater than 1, calls done concurrently
+          (from multiple threads) without ``extra_headers`` are
+          coalesced into a single ``POST`` of up to ``batch_size``
+          operations, see :class:`QueryBatcher`. The server must accept
+          a JSON array of operations.
+        :type batch_size: int
+
+        :param batch_window: seconds to wait for other calls to join a
+          batch, only used with ``batch_size``.
+        :type batch_window: float
+
+        :param persisted_queries: use automatic persisted queries:
+          send the query hash as
+          ``extensions.persistedQuery.sha256Hash`` instead of the
+          query, which is only sent if the server replies with
+          ``PersistedQueryNotFound``. If the server replies with
+          ``PersistedQueryNotSupported``, it's disabled. Batches are
+          sent with full queries.
+        :type persisted_queries: bool
+
+        :param streaming: parse responses while they are read, in
+          chunks, instead of reading the whole body then parsing it,
+          see :func:`sgqlc.endpoint.json_stream.load`.
+        :type streaming: bool
+
+        :param codec: JSON codec name or object, if ``None`` the
+          default is used, see :func:`sgqlc.codec.get_codec`. Streaming
+          always uses :mod:`json`.
+        :type codec: str or :class:`sgqlc.codec.JSONCodec`
+
+        :param accept_encoding: ``True`` to request compressed responses
+          using all the available decoders, see
+          :func:`sgqlc.endpoint.compression.get_accept_encoding`, or the
+          ``Accept-Encoding`` value to send. ``False`` disables it.
+          Responses are always decompressed, if possible.
+        :type accept_encoding: bool or str
+
+        :param compress_requests: minimum size, in bytes, of ``POST``
+          bodies to send with ``Content-Encoding: gzip``. The server
+          must support it. ``None`` disables it.
+        :type compress_requests: int
         '''
+        if pool is True:
+            pool = HTTPConnectionPool()
+
         self.url = url
         self.base_headers = base_headers or {}
         self.timeout = timeout
-        self.urlopen = urlopen or urllib.request.urlopen
+        self.pool = pool or None
+        self.urlopen = pool or urlopen or urllib.request.urlopen
         self.method = method
+        self.persisted_queries = persisted_queries
+        self.streaming = streaming
+        self.codec = None if codec is None else get_codec(codec)
+        if accept_encoding is True:
+            accept_encoding = compression.get_accept_encoding()
+        self.accept_encoding = accept_encoding or None
+        self.compress_requests = compress_requests
+        self.batcher = None
+        if batch_size and batch_size > 1 and method.upper() == 'POST':
+            self.batcher = QueryBatcher(self, batch_size, batch_window)
 
     def __str__(self):
         return '%s(url=%s, base_headers=%r, timeout=%r, method=%s)' % (
@@ -126,7 +542,8 @@ class HTTPEndpoint(BaseEndpoint):
             self.method)
 
     def __call__(self, query, variables=None, operation_name=None,
-                 extra_headers=None, timeout=None):
+                 extra_headers=None, timeout=None, callbacks=None,
+                 response=None):
         '''Calls the GraphQL endpoint.
 
         :param query: the GraphQL query or mutation to execute. Note
@@ -150,18 +567,138 @@ class HTTPEndpoint(BaseEndpoint):
         :param timeout: overrides the default timeout.
         :type timeout: float
 
+        :param callbacks: maps paths in the response, such as
+          ``"data.repository.issues.nodes"``, to functions called with
+          each sub-tree as soon as it's parsed, instead of storing them
+          in the returned data. Implies incremental parsing, see
+          :func:`sgqlc.endpoint.json_stream.load`.
+        :type callbacks: dict
+
+        :param response: if given, it's filled with the HTTP ``status``
+          and ``headers`` of the response, such as ``ETag`` or rate
+          limits. It's left empty if the call was batched.
+        :type response: dict
+
         :return: dict with optional fields ``data`` containing the GraphQL
           returned data as nested dict and ``errors`` with an array of
           errors. Note that both ``data`` and ``errors`` may be returned!
+          ``None`` if the server replied ``304 Not Modified`` to
+          conditional ``extra_headers``, such as ``If-None-Match``.
         :rtype: dict
         '''
+        if self.batcher is not None and not extra_headers and \
+           not callbacks:
+            return self.batcher(query, variables, operation_name, timeout)
+        return self._execute(query, variables, operation_name, extra_headers,
+                             timeout, callbacks, response)
+
+    def _execute(self, query, variables, operation_name, extra_headers,
+                 timeout, callbacks=None, response=None):
+        query_hash = None
+        if self.persisted_queries:
+            query_hash = self._get_query_hash(query)
+            data = self._send(query, variables, operation_name,
+                              extra_headers, timeout, callbacks,
+                              query_hash, False, response)
+            if data is None or not self._is_persisted_query_error(data):
+                return data
+
+        return self._send(query, variables, operation_name, extra_headers,
+                          timeout, callbacks, query_hash, True, response)
+
+    def _send(self, query, variables, operation_name, extra_headers,
+              timeout, callbacks=None, query_hash=None, send_query=True,
+              response=None):
+        query, req = self._prepare_http_request(
+            query, variables, operation_name, extra_headers,
+            query_hash, send_query)
+
+        try:
+            with self.urlopen(req, timeout=timeout or self.timeout) as f:
+                status = getattr(f, 'status', 200)
+                self._store_response(response, status,
+                                     getattr(f, 'headers', None))
+                if status == 304:
+                    return None
+                f = self._get_decoding_reader(f)
+                if self.streaming or callbacks:
+                    return self._decode_http_stream(query, f, callbacks,
+                                                    not send_query)
+                body = f.read()
+                return self._decode_http_response(query, body,
+                                                  not send_query)
+        except urllib.error.HTTPError as exc:
+            self._store_response(response, exc.code, exc.headers)
+            if exc.code == 304:  # urlopen() raises for not modified
+                return None
+            return self._log_http_error(query, req, exc)
+
+    @staticmethod
+    def _get_decoding_reader(f):
+        'Decompress the response while it is read, if needed.'
+        encodings = compression.get_content_encodings(
+            getattr(f, 'headers', None))
+        if encodings:
+            return compression.DecodingReader(f, encodings)
+        return f
+
+    @staticmethod
+    def _store_response(response, status, headers):
+        '''Keep the HTTP status and headers in the ``response`` dict.'''
+        if response is not None:
+            response['status'] = status
+            response['headers'] = headers
+
+    def execute_batch(self, operations, extra_headers=None, timeout=None):
+        '''Calls the GraphQL endpoint with many operations at once.
+
+        All operations are sent in a single ``POST`` as a JSON array,
+        which must be supported by the server, and the response array
+        is split back in one result per operation.
+
+        Each element of ``operations`` is either a query or a tuple
+        ``(query, variables)`` or ``(query, variables, operation_name)``,
+        as in :func:`sgqlc.endpoint.base.BaseEndpoint.execute_many`.
+
+        If the whole request fails, such as HTTP errors or servers that
+        do not support batches, then the same error is returned for
+        every operation.
+
+        :param operations: queries to execute.
+        :type operations: list
+
+        :param extra_headers: dict with extra HTTP headers to use.
+        :type extra_headers: dict
+
+        :param timeout: overrides the default timeout.
+        :type timeout: float
+
+        :return: list of results, in the same order as ``operations``,
+          each as returned by :func:`__call__`.
+        :rtype: list
+        '''
+        queries, req = self._prepare_http_batch_request(
+            operations, extra_headers)
+
+        try:
+            with self.urlopen(req, timeout=timeout or self.timeout) as f:
+                body = self._get_decoding_reader(f).read()
+                return self._decode_http_batch_response(queries, body)
+        except urllib.error.HTTPError as exc:
+            data = self._log_http_error('\n'.join(queries), req, exc)
+            return self._replicate_error(data, len(queries))
+
+    @staticmethod
+    def _query_to_str(query):
         if isinstance(query, bytes):
-            query = query.decode('utf-8')
+            return query.decode('utf-8')
         elif not isinstance(query, str):
             # allows sgqlc.operation.Operation to be passed
             # and generate compact representation of the queries
-            query = bytes(query).decode('utf-8')
+            return bytes(query).decode('utf-8')
+        return query
 
+    def _get_http_headers(self, extra_headers):
         headers = self.base_headers.copy()
         if extra_headers:
             headers.update(extra_headers)
@@ -169,35 +706,209 @@ class HTTPEndpoint(BaseEndpoint):
         headers.update({
             'Accept': 'application/json; charset=utf-8',
         })
+        if self.accept_encoding:
+            headers.setdefault('Accept-Encoding', self.accept_encoding)
+        return headers
+
+    def _get_query_hash(self, query):
+        '''SHA-256 hex digest of the query, for persisted queries.
+
+        :class:`sgqlc.operation.Operation` caches its own hash.
+        '''
+        query_hash = getattr(query, '__sha256__', None)
+        if query_hash is None:
+            query = self._query_to_str(query).encode('utf-8')
+            query_hash = hashlib.sha256(query).hexdigest()
+        return query_hash
+
+    def _is_persisted_query_error(self, data):
+        '''Check if the server doesn't know or support persisted queries.
+
+        If not supported, ``persisted_queries`` is disabled.
+        '''
+        for error in data.get('errors') or ():
+            code = (error.get('extensions') or {}).get('code')
+            message = error.get('message')
+            if message == 'PersistedQueryNotSupported' or \
+               code == 'PERSISTED_QUERY_NOT_SUPPORTED':
+                self.logger.warning('%s: persisted queries not supported',
+                                    self.url)
+                self.persisted_queries = False
+                return True
+            if message == 'PersistedQueryNotFound' or \
+               code == 'PERSISTED_QUERY_NOT_FOUND':
+                return True
+        return False
+
+    def _prepare_http_request(self, query, variables, operation_name,
+                              extra_headers, query_hash=None,
+                              send_query=True):
+        '''Normalize the query to string and create the HTTP request.
+
+        Shared by subclasses that do not use ``urlopen()``, such as
+        :class:`sgqlc.endpoint.async_http.AsyncHTTPEndpoint`.
+
+        If ``query_hash`` is given, it's sent as persisted query
+        extension, then ``send_query`` may be ``False`` to omit
+        the query.
+
+        The request is marked ``idempotent`` unless it's a mutation,
+        then connection pools know if it may be sent again.
+
+        :return: tuple with the query string and the
+          :class:`urllib.request.Request`.
+        '''
+        query = self._query_to_str(query)
+        headers = self._get_http_headers(extra_headers)
 
         if self.method.upper() == 'POST':
             get_http_request = self.get_http_post_request
         else:
             get_http_request = self.get_http_get_request
 
-        req = get_http_request(query, variables, operation_name, headers)
+        if query_hash is None:
+            req = get_http_request(query, variables, operation_name, headers)
+            self.logger.debug('Query:\n%s', query)
+        else:
+            extensions = {'persistedQuery': {
+                'version': 1,
+                'sha256Hash': query_hash,
+            }}
+            req = get_http_request(query if send_query else None,
+                                   variables, operation_name, headers,
+                                   extensions)
+            self.logger.debug('Persisted query %s (%s):\n%s', query_hash,
+                              'sent' if send_query else 'hash only', query)
+        req.idempotent = not self._re_mutation.search(query)
+        return query, req
+
+    def _prepare_http_batch_request(self, operations, extra_headers):
+        '''Same as :func:`_prepare_http_request` for :func:`execute_batch`.
+
+        :return: tuple with the list of query strings and the
+          :class:`urllib.request.Request`.
+        '''
+        operations = [self._get_call_args(op) for op in operations]
+        operations = [(self._query_to_str(query), variables, operation_name)
+                      for query, variables, operation_name in operations]
+        headers = self._get_http_headers(extra_headers)
+        req = self.get_http_batch_post_request(operations, headers)
+
+        queries = [op[0] for op in operations]
+        req.idempotent = not any(self._re_mutation.search(q) for q in queries)
+        self.logger.debug('Batch of %d queries:\n%s',
+                          len(queries), '\n'.join(queries))
+        return queries, req
+
+    def _decode_http_response(self, query, body, hash_only=False):
+        '''Decode the successful HTTP response body, logging errors.
+
+        :param query: the GraphQL query that triggered the result.
+        :type query: str
 
-        self.logger.debug('Query:\n%s', query)
+        :param body: the HTTP response body.
+        :type body: :class:`bytes` or :class:`str`
 
+        :param hash_only: if only the persisted query hash was sent,
+          then persisted query errors are not logged, the query will
+          be sent again.
+        :type hash_only: bool
+
+        :return: the decoded JSON object or GraphQL-compliant dict with
+          keys ``data`` and ``errors`` if it was not valid JSON.
+        :rtype: dict
+        '''
         try:
-            with self.urlopen(req, timeout=timeout or self.timeout) as f:
-                body = f.read().decode('utf-8')
-                try:
-                    data = json.loads(body)
-                    if data and data.get('errors'):
-                        return self._log_graphql_error(query, data)
-                    return data
-                except json.JSONDecodeError as exc:
-                    return self._log_json_error(body, exc)
-        except urllib.error.HTTPError as exc:
-            return self._log_http_error(query, req, exc)
+            data = get_codec(self.codec).loads(body)
+        except json.JSONDecodeError as exc:
+            return self._log_json_error(self._body_to_str(body), exc)
+
+        return self._check_graphql_response(query, data, hash_only)
+
+    def _decode_http_stream(self, query, f, callbacks, hash_only=False):
+        '''Same as :func:`_decode_http_response`, parsing incrementally.
+
+        On JSON errors, only the text around the error is available as
+        ``body``.
+
+        :param f: the HTTP response to read from.
+
+        :param callbacks: sub-tree callbacks, see
+          :func:`sgqlc.endpoint.json_stream.load`.
+        :type callbacks: dict
+        '''
+        try:
+            data = json_stream.load(f, callbacks)
+        except json.JSONDecodeError as exc:
+            return self._log_json_error(exc.doc, exc)
+
+        return self._check_graphql_response(query, data, hash_only)
+
+    def _check_graphql_response(self, query, data, hash_only):
+        if data and data.get('errors'):
+            if hash_only and self._is_persisted_query_error(data):
+                self.logger.debug('persisted query not found, send query')
+                return data
+            return self._log_graphql_error(query, data)
+        return data
+
+    @staticmethod
+    def _body_to_str(body):
+        if isinstance(body, bytes):
+            return body.decode('utf-8', 'replace')
+        return body
+
+    @staticmethod
+    def _replicate_error(data, count):
+        '''Copy an error of the whole batch to each operation result.'''
+        return [dict(data, errors=[dict(e) for e in data['errors']])
+                for _ in range(count)]
+
+    def _decode_http_batch_response(self, queries, body):
+        '''Same as :func:`_decode_http_response` for :func:`execute_batch`.
+
+        :return: list with one result per query.
+        :rtype: list
+        '''
+        try:
+            data = get_codec(self.codec).loads(body)
+        except json.JSONDecodeError as exc:
+            data = self._log_json_error(self._body_to_str(body), exc)
+            return self._replicate_error(data, len(queries))
 
-    def get_http_post_request(self, query, variables, operation_name, headers):
-        post_data = json.dumps({
+        if not isinstance(data, list) or len(data) != len(queries):
+            # servers without batch support return a single error
+            if isinstance(data, dict) and data.get('errors'):
+                data = self._log_graphql_error('\n'.join(queries), data)
+            else:
+                msg = 'expected a list of %d results' % (len(queries),)
+                self.logger.error('invalid batch response: %s', msg)
+                data = {'data': None, 'errors': [{
+                    'message': msg,
+                    'body': self._body_to_str(body),
+                }]}
+            return self._replicate_error(data, len(queries))
+
+        results = []
+        for query, item in zip(queries, data):
+            if isinstance(item, dict) and item.get('errors'):
+                item = self._log_graphql_error(query, item)
+            results.append(item)
+        return results
+
+    def get_http_post_request(self, query, variables, operation_name, headers,
+                              extensions=None):
+        payload = {
             'query': query,
             'variables': variables,
             'operationName': operation_name,
-        }).encode('utf-8')
+        }
+        if extensions:
+            payload['extensions'] = extensions
+            if query is None:
+                del payload['query']
+        post_data = self._compress_post_data(
+            get_codec(self.codec).dumpb(payload), headers)
         headers.update({
             'Content-Type': 'application/json; charset=utf-8',
             'Content-Length': len(post_data),
@@ -205,13 +916,46 @@ class HTTPEndpoint(BaseEndpoint):
         return urllib.request.Request(
             url=self.url, data=post_data, headers=headers, method='POST')
 
-    def get_http_get_request(self, query, variables, operation_name, headers):
-        params = {'query': query}
+    def get_http_batch_post_request(self, operations, headers):
+        post_data = get_codec(self.codec).dumpb([{
+            'query': query,
+            'variables': variables,
+            'operationName': operation_name,
+        } for query, variables, operation_name in operations])
+        post_data = self._compress_post_data(post_data, headers)
+        headers.update({
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': len(post_data),
+        })
+        return urllib.request.Request(
+            url=self.url, data=post_data, headers=headers, method='POST')
+
+    def _compress_post_data(self, post_data, headers):
+        '''Compress ``POST`` bodies of at least ``compress_requests`` bytes.
+
+        :return: the body to send, updating ``headers`` if compressed.
+        :rtype: bytes
+        '''
+        threshold = self.compress_requests
+        if threshold is not None and len(post_data) >= threshold:
+            post_data = compression.compress(post_data)
+            headers['Content-Encoding'] = 'gzip'
+        return post_data
+
+    def get_http_get_request(self, query, variables, operation_name, headers,
+                             extensions=None):
+        params = {}
+        if query is not None:
+            params['query'] = query
         if operation_name:
             params['operationName'] = operation_name
 
+        codec = get_codec(self.codec)
         if variables:
-            params['variables'] = json.dumps(variables)
+            params['variables'] = codec.dumps(variables)
+
+        if extensions:
+            params['extensions'] = codec.dumps(extensions)
 
         url = add_query_to_url(self.url, params)
         return urllib.request.Request(url=url, headers=headers, method='GET')
@@ -236,7 +980,8 @@ class HTTPEndpoint(BaseEndpoint):
         for h in sorted(exc.headers):
             self.logger.info('Response header: %s: %s', h, exc.headers[h])
 
-        body = exc.read().decode('utf-8')
+        body = compression.decompress(exc.read(), exc.headers)
+        body = body.decode('utf-8')
         content_type = exc.headers.get('Content-Type', '')
         self.logger.info('Response [%s]:\n%s', content_type, body)
         if not content_type.startswith('application/json'):
@@ -251,7 +996,7 @@ class HTTPEndpoint(BaseEndpoint):
             # GraphQL servers return 400 and {'errors': [...]}
             # if only errors was returned, no {'data': ...}
             try:
-                data = json.loads(body)
+                data = get_codec(self.codec).loads(body)
             except json.JSONDecodeError as exc:
                 return self._log_json_error(body, exc)
 
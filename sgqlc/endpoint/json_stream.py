@@ -0,0 +1,258 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Incremental JSON Parsing
+========================
+
+Parse JSON documents from binary file-like objects, such as HTTP
+responses, reading them in chunks. Unlike ``json.loads(f.read())`` the
+whole text is never kept in memory, only the resulting objects and
+the current chunk.
+
+Values that are completely inside the current chunk are decoded at
+once by :meth:`json.JSONDecoder.raw_decode`, only the objects and
+arrays crossing chunk boundaries are walked element by element.
+
+Large sub-trees may be given to callbacks as soon as they are
+complete, instead of being stored in the result. Paths are dot
+separated object keys, arrays do not add path components. If the
+value at the path is an array, the callback is called for each
+element and the result gets an empty array, otherwise it's called
+with the value and the result gets ``None``:
+
+>>> import io
+>>> doc = b"""{"data": {"repository": {"issues": {"nodes": [
+...    {"number": 1, "title": "first"},
+...    {"number": 2, "title": "second"}
+... ]}}}}"""
+>>> nodes = []
+>>> load(io.BytesIO(doc), {'data.repository.issues.nodes': nodes.append},
+...      chunk_size=16)
+{'data': {'repository': {'issues': {'nodes': []}}}}
+>>> nodes
+[{'number': 1, 'title': 'first'}, {'number': 2, 'title': 'second'}]
+
+Without callbacks it's the same as :func:`json.load`:
+
+>>> load(io.BytesIO(b' [1, 2.5, "a\\\\"b", true, false, null, {}] '),
+...      chunk_size=3)
+[1, 2.5, 'a"b', True, False, None, {}]
+>>> load(io.BytesIO('{"ação": "é"}'.encode('utf-8')), chunk_size=1)
+{'ação': 'é'}
+>>> load(io.BytesIO(b'{"a": {"b": 1}, "c": 2}'), {'a.b': print})
+1
+{'a': {'b': None}, 'c': 2}
+>>> load(io.BytesIO(b'{"a": [{"b": [1, 2]}, {"b": 3}, {}, []]}'),
+...      {'a.b': print})
+1
+2
+3
+{'a': [{'b': []}, {'b': None}, {}, []]}
+
+Invalid documents raise :exc:`json.JSONDecodeError`:
+
+>>> load(io.BytesIO(b'{"a": [1 2]}'), chunk_size=4)  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+json.decoder.JSONDecodeError: Expecting ',' delimiter: ...
+>>> load(io.BytesIO(b'{"a": 1} x'))  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+json.decoder.JSONDecodeError: Extra data: ...
+>>> load(io.BytesIO(b'{"a": tru'), chunk_size=4)  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+json.decoder.JSONDecodeError: Expecting value: ...
+>>> load(io.BytesIO(b'{"a" 1}'), {'a': print})  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+json.decoder.JSONDecodeError: Expecting ':' delimiter: ...
+>>> load(io.BytesIO(b'{1: 2}'), {'a': print})  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+json.decoder.JSONDecodeError: Expecting property name enclosed in ...
+>>> load(io.BytesIO(b'{"a": [1, '), {'a': print})  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+json.decoder.JSONDecodeError: Expecting value: ...
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = ('load',)
+
+import codecs
+import json
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class JSONStreamParser:
+    '''Incremental JSON parser, see :func:`load`.'''
+
+    whitespace = re.compile(r'[ \t\n\r]*')
+    number_chars = frozenset('0123456789.eE+-')
+
+    def __init__(self, fp, callbacks=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 encoding='utf-8'):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.text_decoder = codecs.getincrementaldecoder(encoding)()
+        self.decoder = json.JSONDecoder()
+        self.callbacks = {}
+        self.prefixes = set()
+        for path, callback in (callbacks or {}).items():
+            path = tuple(path.split('.')) if path else ()
+            self.callbacks[path] = callback
+            for i in range(len(path)):
+                self.prefixes.add(path[:i])
+
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def parse(self):
+        value = self.parse_value(())
+        if self.peek() is not None:
+            self.error('Extra data')
+        return value
+
+    def error(self, msg):
+        raise json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def fill(self):
+        'Read more text, at least as much as it is pending'
+        if self.eof:
+            return False
+
+        size = max(self.chunk_size, len(self.buf) - self.pos)
+        data = self.fp.read(size)
+        text = self.text_decoder.decode(data, not data)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        if not data:
+            self.eof = True
+        return True
+
+    def peek(self):
+        'Skip whitespace, return the next char or ``None`` at the end'
+        while True:
+            self.pos = self.whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, chars, msg):
+        c = self.peek()
+        if c is None or c not in chars:
+            self.error(msg)
+        self.pos += 1
+        return c
+
+    def parse_value(self, path):
+        c = self.peek()
+        callback = self.callbacks.get(path)
+        if callback is not None and c == '[':
+            self.parse_array(path, callback)
+            return []
+
+        if path in self.prefixes and c in ('{', '['):
+            value = self.parse_container(c, path)
+        else:
+            value = self.decode(c, path)
+
+        if callback is not None:
+            callback(value)
+            return None
+        return value
+
+    def parse_element(self, path):
+        if path in self.prefixes:
+            c = self.peek()
+            if c in ('{', '['):
+                return self.parse_container(c, path)
+        return self.decode(self.peek(), path)
+
+    def decode(self, c, path):
+        'Decode using the fast C decoder, unless the value is incomplete'
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # numbers may continue in the next chunk
+                if c in ('{', '[', '"') or self.eof or (
+                        end < len(self.buf)
+                        and self.buf[end] not in self.number_chars):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            if c in ('{', '['):
+                return self.parse_container(c, path)
+            self.fill()
+
+    def parse_container(self, c, path):
+        if c == '{':
+            return self.parse_object(path)
+        return self.parse_array(path)
+
+    def parse_object(self, path):
+        self.pos += 1  # {
+        obj = {}
+        if self.peek() == '}':
+            self.pos += 1
+            return obj
+
+        while True:
+            if self.peek() != '"':
+                self.error('Expecting property name enclosed in double quotes')
+            key = self.decode('"', path)
+            self.expect(':', "Expecting ':' delimiter")
+            obj[key] = self.parse_value(path + (key,))
+            if self.expect(',}', "Expecting ',' delimiter") == '}':
+                return obj
+
+    def parse_array(self, path, callback=None):
+        self.pos += 1  # [
+        lst = []
+        if self.peek() == ']':
+            self.pos += 1
+            return lst
+
+        while True:
+            value = self.parse_element(path)
+            if callback is not None:
+                callback(value)
+            else:
+                lst.append(value)
+            if self.expect(',]', "Expecting ',' delimiter") == ']':
+                return lst
+
+
+def load(fp, callbacks=None, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8'):
+    '''Parse JSON from the binary file-like ``fp``, reading in chunks.
+
+    :param fp: object with ``read(size)`` method returning bytes.
+
+    :param callbacks: maps dot separated paths to functions called with
+      the value at that path (or each element, if an array) instead of
+      storing them in the result.
+    :type callbacks: dict
+
+    :param chunk_size: bytes to read at once.
+    :type chunk_size: int
+
+    :param encoding: text encoding of the document.
+    :type encoding: str
+
+    :return: the parsed JSON document.
+
+    :raise json.JSONDecodeError: if the document is not valid JSON.
+    '''
+    return JSONStreamParser(fp, callbacks, chunk_size, encoding).parse()
@@ -0,0 +1,557 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Rate Limit Scheduler
+====================
+
+:class:`RateLimitedEndpoint` wraps any synchronous
+:class:`sgqlc.endpoint.base.BaseEndpoint`, pacing the calls so the
+server's rate limit budget lasts until it's reset, instead of spending
+it all in a burst and then getting errors:
+
+.. code-block:: python
+
+   endpoint = RateLimitedEndpoint(HTTPEndpoint(url, headers),
+                                  rate=10, max_concurrency=8)
+   for data in endpoint.execute_many(queries, max_concurrency=8):
+       ...
+   print(endpoint.budget)
+
+Requests are started at most at ``rate`` per second by a
+:class:`TokenBucket`, allowing bursts of up to ``burst`` requests.
+The budget reported by the server, such as GitHub's, is used to slow
+down further, so the remaining points are evenly spread until the reset:
+
+ - ``X-RateLimit-Limit``, ``X-RateLimit-Remaining``,
+   ``X-RateLimit-Used``, ``X-RateLimit-Reset`` and
+   ``X-RateLimit-Resource`` response headers, if the wrapped endpoint
+   is a :class:`sgqlc.endpoint.http.HTTPEndpoint`;
+ - the ``rateLimit { cost limit remaining resetAt }`` field, if it's
+   selected by the query. Its ``cost`` is used as the cost of the next
+   calls.
+
+Responses with ``429 Too Many Requests``, ``403 Forbidden`` with
+``Retry-After`` or without remaining budget (secondary limits) and
+GraphQL errors of type ``RATE_LIMITED`` pause all calls until the
+time given by ``Retry-After``, the budget reset or an exponential
+backoff, then they are retried up to ``max_retries`` times.
+
+The parsed headers are available with :func:`parse_rate_limit_headers`:
+
+>>> from email.message import Message
+>>> headers = Message()
+>>> headers['X-RateLimit-Limit'] = '5000'
+>>> headers['X-RateLimit-Remaining'] = '4990'
+>>> headers['X-RateLimit-Reset'] = '1700000000'
+>>> headers['X-RateLimit-Resource'] = 'graphql'
+>>> for k, v in sorted(parse_rate_limit_headers(headers).items()):
+...     print(k, repr(v))
+limit 5000
+remaining 4990
+reset 1700000000.0
+resource 'graphql'
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = (
+    'RateLimitedEndpoint', 'RateLimitBudget', 'TokenBucket',
+    'parse_rate_limit_headers', 'parse_retry_after',
+)
+
+import calendar
+import email.utils
+import logging
+import threading
+import time
+
+from .base import BaseEndpoint
+from .http import HTTPEndpoint
+
+
+def parse_retry_after(value, now=None):
+    '''Seconds to wait given the ``Retry-After`` header value.
+
+    >>> parse_retry_after('120')
+    120.0
+    >>> parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT',
+    ...                   now=1445412480)
+    30.0
+    >>> parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT',
+    ...                   now=1445412480)
+    0.0
+    >>> parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT')
+    0.0
+    >>> parse_retry_after('invalid') is None
+    True
+    >>> parse_retry_after(None) is None
+    True
+
+    :param value: either seconds or an HTTP date.
+    :type value: str
+
+    :return: seconds, or ``None`` if not given or invalid.
+    :rtype: float
+    '''
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:  # pragma: no cover (python < 3.10)
+        return None
+    if now is None:
+        now = time.time()
+    return max(when.timestamp() - now, 0.0)
+
+
+def parse_rate_limit_headers(headers):
+    '''Parse the ``X-RateLimit-*`` response headers.
+
+    >>> parse_rate_limit_headers({'X-RateLimit-Remaining': '10',
+    ...                           'X-RateLimit-Used': 'x'})
+    {'remaining': 10}
+    >>> parse_rate_limit_headers(None)
+    {}
+
+    :param headers: the response headers.
+    :type headers: :class:`http.client.HTTPMessage` or dict
+
+    :return: dict with the keys that were given and valid, amongst
+      ``limit``, ``remaining``, ``used`` (int), ``reset`` (epoch
+      seconds, float) and ``resource`` (str).
+    :rtype: dict
+    '''
+    result = {}
+    if not headers:
+        return result
+    for key in ('limit', 'remaining', 'used', 'reset', 'resource'):
+        value = headers.get('X-RateLimit-' + key.capitalize())
+        if value is None:
+            continue
+        if key == 'resource':
+            result[key] = value
+            continue
+        try:
+            result[key] = float(value) if key == 'reset' else int(value)
+        except ValueError:
+            pass
+    return result
+
+
+def _parse_datetime(value):
+    '''Parse GraphQL ``DateTime`` such as ``rateLimit.resetAt``.
+
+    >>> _parse_datetime('2023-11-14T22:13:20Z')
+    1700000000.0
+    >>> _parse_datetime('2023-11-14T22:13:20.500Z')
+    1700000000.5
+    >>> _parse_datetime('invalid') is None
+    True
+    '''
+    try:
+        value, _, fraction = value.rstrip('Z').partition('.')
+        seconds = calendar.timegm(time.strptime(value, '%Y-%m-%dT%H:%M:%S'))
+        return seconds + (float('0.' + fraction) if fraction else 0.0)
+    except (AttributeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    '''Limit the ``rate`` of events, allowing bursts.
+
+    The bucket holds up to ``burst`` tokens and is refilled with
+    ``rate`` tokens per second. Tokens are reserved in call order, even
+    if not available yet, so concurrent threads are served in turns
+    instead of all waking up at once:
+
+    >>> bucket = TokenBucket(rate=10, burst=2)
+    >>> bucket.reserve(), bucket.reserve()
+    (0.0, 0.0)
+    >>> round(bucket.reserve(), 1), round(bucket.reserve(), 1)
+    (0.1, 0.2)
+
+    :func:`acquire` sleeps until the tokens are available, while a zero
+    ``rate`` never makes them available:
+
+    >>> round(TokenBucket(rate=100).acquire(2), 2)
+    0.01
+    >>> bucket.rate = 0
+    >>> bucket
+    TokenBucket(rate=0, burst=2)
+    >>> bucket.reserve()
+    inf
+
+    Without ``rate`` there is no limit:
+
+    >>> TokenBucket().reserve(1000)
+    0.0
+    '''
+
+    def __init__(self, rate=None, burst=1):
+        '''
+        :param rate: tokens per second, ``None`` is unlimited.
+        :type rate: float
+
+        :param burst: maximum tokens that can be used at once.
+        :type burst: int
+        '''
+        self.__rate = rate
+        self.burst = burst
+        self.__tokens = float(burst)
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return '%s(rate=%r, burst=%r)' % (
+            self.__class__.__name__, self.__rate, self.burst)
+
+    @property
+    def rate(self):
+        'Tokens per second, ``None`` is unlimited.'
+        return self.__rate
+
+    @rate.setter
+    def rate(self, rate):
+        with self.__lock:
+            self.__refill(time.monotonic())
+            self.__rate = rate
+
+    def __refill(self, now):
+        if self.__rate is not None:
+            self.__tokens = min(
+                self.__tokens + (now - self.__updated) * self.__rate,
+                float(self.burst))
+        self.__updated = now
+
+    def reserve(self, tokens=1):
+        '''Take ``tokens`` from the bucket.
+
+        :return: seconds to wait until they are available.
+        :rtype: float
+        '''
+        with self.__lock:
+            if self.__rate is None:
+                return 0.0
+            self.__refill(time.monotonic())
+            self.__tokens -= tokens
+            if self.__tokens >= 0:
+                return 0.0
+            if self.__rate <= 0:
+                return float('inf')
+            return -self.__tokens / self.__rate
+
+    def acquire(self, tokens=1):
+        '''Take ``tokens`` from the bucket, waiting until available.
+
+        :return: seconds waited.
+        :rtype: float
+        '''
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class RateLimitBudget:
+    '''Snapshot of the rate limit state of :class:`RateLimitedEndpoint`.
+
+    Members are ``None`` if not known, that is, the server didn't
+    report them yet:
+
+     - ``limit``: points per window;
+     - ``remaining``: points left until ``reset``;
+     - ``used``: points used in this window;
+     - ``reset``: epoch seconds when the budget is renewed;
+     - ``resource``: which of the server's limits this is about;
+     - ``cost``: points of the last call, ``rateLimit.cost``;
+     - ``rate``: calls per second currently being started;
+     - ``paused_until``: epoch seconds until calls are paused, due to
+       ``Retry-After`` or exhausted budget;
+     - ``in_flight``: calls currently waiting or running.
+    '''
+
+    __slots__ = (
+        'limit', 'remaining', 'used', 'reset', 'resource', 'cost',
+        'rate', 'paused_until', 'in_flight',
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name))
+            for name in self.__slots__))
+
+    def copy(self):
+        return RateLimitBudget(**{
+            name: getattr(self, name) for name in self.__slots__})
+
+
+class RateLimitedEndpoint(BaseEndpoint):
+    '''Pace calls to another endpoint given the server's rate limits.
+
+    The object is callable with the same parameters as the wrapped
+    ``endpoint``, extra keyword arguments such as ``extra_headers`` and
+    ``timeout`` are given to it. It may be used by many threads, such
+    as by :func:`sgqlc.endpoint.base.BaseEndpoint.execute_many`.
+
+    The current state is given by :attr:`budget`. The counters
+    ``retries`` and ``waited`` (seconds) are kept as members.
+
+    .. note::
+
+      Servers may also have secondary limits, such as GitHub's
+      concurrent requests and mutations per second. Use
+      ``max_concurrency`` and a separate endpoint with ``rate=1`` for
+      mutations to respect those.
+    '''
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, endpoint, rate=None, burst=1, max_concurrency=None,
+                 reserve=0, max_retries=3, backoff=60):
+        '''
+        :param endpoint: the endpoint to send the queries.
+        :type endpoint: :class:`sgqlc.endpoint.base.BaseEndpoint`
+
+        :param rate: maximum calls started per second, ``None`` only
+          follows the budget reported by the server.
+        :type rate: float
+
+        :param burst: calls that may be started at once.
+        :type burst: int
+
+        :param max_concurrency: maximum calls running at once,
+          ``None`` is unlimited.
+        :type max_concurrency: int
+
+        :param reserve: points of the budget that are not used, left
+          to other clients sharing the same limit.
+        :type reserve: int
+
+        :param max_retries: times a call is retried if rate limited,
+          then the error is returned.
+        :type max_retries: int
+
+        :param backoff: seconds to wait after the first rate limited
+          response without ``Retry-After`` or reset time, doubling
+          after each retry.
+        :type backoff: float
+        '''
+        self.endpoint = endpoint
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retries = 0
+        self.waited = 0.0
+        self.bucket = TokenBucket(rate, burst)
+        self.__budget = RateLimitBudget(rate=rate, in_flight=0)
+        self.__http = isinstance(endpoint, HTTPEndpoint)
+        self.__lock = threading.Lock()
+        self.__semaphore = None
+        if max_concurrency:
+            self.__semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def __str__(self):
+        return '%s(endpoint=%s, rate=%r, max_concurrency=%r)' % (
+            self.__class__.__name__, self.endpoint, self.rate,
+            self.max_concurrency)
+
+    @property
+    def budget(self):
+        '''Current rate limit state, see :class:`RateLimitBudget`.
+
+        :rtype: :class:`RateLimitBudget`
+        '''
+        with self.__lock:
+            return self.__budget.copy()
+
+    def __call__(self, query, variables=None, operation_name=None,
+                 **kwargs):
+        '''Calls the GraphQL endpoint once the budget allows it.
+
+        See :func:`sgqlc.endpoint.base.BaseEndpoint.__call__`.
+        '''
+        with self.__lock:
+            self.__budget.in_flight += 1
+        try:
+            attempt = 0
+            while True:
+                data, delay = self.__call(
+                    query, variables, operation_name, kwargs, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    return data
+                attempt += 1
+                with self.__lock:
+                    self.retries += 1
+                self.logger.warning('rate limited, retry %d in %.1fs',
+                                    attempt, delay)
+        finally:
+            with self.__lock:
+                self.__budget.in_flight -= 1
+
+    def __call(self, query, variables, operation_name, kwargs, attempt):
+        '''Wait and call the endpoint.
+
+        :return: the result and ``None`` or seconds to wait, if rate
+          limited.
+        :rtype: tuple
+        '''
+        response = None
+        if self.__http:
+            response = kwargs.get('response')
+            if response is None:
+                response = {}
+            kwargs = dict(kwargs, response=response)
+
+        self.__wait_paused()
+        self.__sleep(self.bucket.reserve())
+        self.__wait_paused()
+        if self.__semaphore is not None:
+            self.__semaphore.acquire()
+        try:
+            data = self.endpoint(query, variables, operation_name, **kwargs)
+        finally:
+            if self.__semaphore is not None:
+                self.__semaphore.release()
+
+        status = headers = None
+        if response:
+            status = response.get('status')
+            headers = response.get('headers')
+        return data, self._update(data, status, headers, attempt)
+
+    def __sleep(self, delay):
+        if delay > 0:
+            with self.__lock:
+                self.waited += delay
+            time.sleep(delay)
+
+    def __wait_paused(self):
+        while True:
+            with self.__lock:
+                paused_until = self.__budget.paused_until
+            delay = (paused_until or 0) - time.time()
+            if delay <= 0:
+                return
+            self.__sleep(delay)
+
+    def _update(self, data, status, headers, attempt):
+        '''Update the budget given the response.
+
+        :param data: the result of the call.
+        :type data: dict
+
+        :param status: the HTTP status, if known.
+        :type status: int
+
+        :param headers: the HTTP response headers, if known.
+        :type headers: :class:`http.client.HTTPMessage`
+
+        :param attempt: how many times the call was retried.
+        :type attempt: int
+
+        :return: seconds to wait before retrying if the call was rate
+          limited, otherwise ``None``.
+        :rtype: float
+        '''
+        info = parse_rate_limit_headers(headers)
+        info.update(self._get_rate_limit_field(data))
+        now = time.time()
+
+        with self.__lock:
+            budget = self.__budget
+            for key, value in info.items():
+                setattr(budget, key, value)
+
+            delay = None
+            if self._is_rate_limited(data, status, headers, info):
+                delay = parse_retry_after(
+                    headers.get('Retry-After') if headers else None, now)
+                if delay is None and budget.remaining == 0 and \
+                   budget.reset is not None and budget.reset > now:
+                    delay = budget.reset - now
+                if delay is None:
+                    delay = self.backoff * 2 ** attempt
+                budget.paused_until = max(budget.paused_until or 0,
+                                          now + delay)
+            elif budget.remaining is not None and \
+                    budget.reset is not None and \
+                    budget.remaining <= self.reserve and budget.reset > now:
+                self.logger.warning('rate limit budget exhausted, '
+                                    'paused until %s', budget.reset)
+                budget.paused_until = max(budget.paused_until or 0,
+                                          budget.reset)
+
+            budget.rate = self._get_rate(budget, now)
+            self.bucket.rate = budget.rate
+        return delay
+
+    def _get_rate(self, budget, now):
+        '''Calls per second to spread the remaining budget until reset.
+
+        :return: the minimum of ``rate`` and the budget's rate, or
+          ``None`` if none is known.
+        :rtype: float
+        '''
+        if budget.remaining is None or budget.reset is None or \
+           budget.reset <= now:
+            return self.rate
+        calls = (budget.remaining - self.reserve) / (budget.cost or 1)
+        if calls <= 0:
+            return self.rate  # paused until reset, then it's refilled
+        rate = calls / (budget.reset - now)
+        if self.rate is not None:
+            rate = min(rate, self.rate)
+        return rate
+
+    @staticmethod
+    def _get_rate_limit_field(data):
+        '''Budget given by the ``rateLimit`` field, if selected.
+
+        :rtype: dict
+        '''
+        try:
+            field = data['data']['rateLimit']
+        except (KeyError, TypeError):
+            return {}
+        if not isinstance(field, dict):
+            return {}
+
+        info = {}
+        for key in ('cost', 'limit', 'remaining', 'used'):
+            value = field.get(key)
+            if isinstance(value, int):
+                info[key] = value
+        reset = _parse_datetime(field.get('resetAt'))
+        if reset is not None:
+            info['reset'] = reset
+        return info
+
+    @staticmethod
+    def _is_rate_limited(data, status, headers, info):
+        '''Whether the call failed due to rate limits and may be retried.
+
+        :rtype: bool
+        '''
+        if status == 429:
+            return True
+        if status == 403 and (info.get('remaining') == 0 or (
+                headers is not None and 'Retry-After' in headers)):
+            return True
+        errors = data.get('errors') if isinstance(data, dict) else None
+        return bool(errors) and any(
+            isinstance(e, dict) and e.get('type') == 'RATE_LIMITED'
+            for e in errors)
@@ -59,6 +59,9 @@ objects:
    print(obj.parent.child.field)
    print(obj.parent.sibling.x.y)
 
+If the results are only read, ``op.__view__(data)`` is cheaper, it
+resolves the same accesses directly on the JSON data, see
+:mod:`sgqlc.types.view`.
 
 Examples
 --------
@@ -522,7 +525,9 @@ query {
   }
 }
 
-
+The automatic selection is created once per type and depth, then
+reused by other operations. It's also used to interpret the results,
+with the default depth.
 
 
 
@@ -629,6 +634,20 @@ Updating also reflects on the correct backing store:
 >>> json_data['data']['r_name2']['name']
 'repo2 name'
 
+How to interpret each selection, including the aliases, is computed
+once and kept in the selection lists, so the same operation is cheap
+to apply to many results. Changing the selections resets it:
+
+>>> op['repository'].__selection__('r_name1').__fields__('name')
+>>> json_data['data']['r_name1']['name'] = 'repo1 name'
+>>> obj = op + json_data
+>>> obj.r_name1.name
+'repo1 name'
+>>> for issue in obj.r_name1.issues:
+...     print(issue)
+Issue(code=1, headline=found a bug)
+Issue(code=2, headline=a feature request)
+
 Mutations
 ~~~~~~~~~
 
@@ -926,17 +945,97 @@ To get the arguments of the default (non-aliased) one can use the shortcut:
 >>> op['repository'].__args__
 {'id': 'repo1'}
 
+Independent operations on the same root type can be merged into a
+single one using :func:`merge_operations`, executed in a single
+request. Root selections are aliased and variables used by previous
+operations are renamed:
+
+>>> from sgqlc.types import Variable
+>>> op1 = Operation(Query, repo_id=non_null(ID))
+>>> op1.repository(id=Variable('repo_id')).name()
+name
+>>> op2 = Operation(Query, repo_id=non_null(ID), title=str)
+>>> repository = op2.repository(id=Variable('repo_id'))
+>>> repository.issues(title_contains=Variable('title')).number()
+number
+>>> repository.owner.__as__(User).name()
+name
+>>> merged = merge_operations(op1, op2)
+>>> merged
+query Query($repoId: ID!, $op2RepoId: ID!, $title: String) {
+  op1_repository: repository(id: $repoId) {
+    name
+  }
+  op2_repository: repository(id: $op2RepoId) {
+    issues(titleContains: $title) {
+      number
+    }
+    owner {
+      __typename
+      ... on User {
+        name
+      }
+    }
+  }
+}
+>>> merged.__operations__ == (op1, op2)
+True
+>>> merged.merge_variables({'repoId': 'repo1'},
+...                        {'repoId': 'repo2', 'title': 'bug'})
+{'repoId': 'repo1', 'op2RepoId': 'repo2', 'title': 'bug'}
+
+The results are split back, each usable with its original operation:
+
+>>> data = {'data': {
+...     'op1_repository': {'name': 'sgqlc'},
+...     'op2_repository': {'issues': [{'number': 1}], 'owner': {
+...         '__typename': 'User', 'name': 'Gustavo'}},
+... }, 'errors': [
+...     {'message': 'some error', 'path': ['op2_repository']},
+...     {'message': 'global error'},
+... ]}
+>>> data1, data2 = merged.split(data)
+>>> data1['data']
+{'repository': {'name': 'sgqlc'}}
+>>> data1['errors']
+[{'message': 'global error'}]
+>>> for error in data2['errors']:
+...     print(error)
+{'message': 'some error', 'path': ['repository']}
+{'message': 'global error'}
+>>> op1 + data1
+Query(repository=Repository(name='sgqlc'))
+>>> repo = (op2 + data2).repository
+>>> repo.issues
+[Issue(number=1)]
+>>> repo.owner.name
+'Gustavo'
+
+Only operations of the same type can be merged:
+
+>>> merge_operations(op1, Operation(Mutation))
+Traceback (most recent call last):
+  ...
+ValueError: cannot merge Mutation with Query operations
+>>> merge_operations()
+Traceback (most recent call last):
+  ...
+ValueError: no operations to merge
+
 :license: ISC
 '''
 
 __docformat__ = 'reStructuredText en'
 
-__all__ = ('Operation',)
+__all__ = ('Operation', 'MergedOperation', 'merge_operations')
 
+import hashlib
+import weakref
 from collections import OrderedDict
 
 from ..types import BaseTypeWithTypename, Union, ContainerType, ArgDict, \
-    global_schema
+    Arg, Variable, global_schema
+from ..types.view import view_value
 
 
 DEFAULT_AUTO_SELECT_DEPTH = 2
@@ -1063,6 +1162,34 @@ class Selection:
                 q += sel
         return q
 
+    def __auto_select__(self, depth=DEFAULT_AUTO_SELECT_DEPTH):
+        '''Selection list of all fields, used if none was selected.
+
+        The auto-selection only depends on the field type and
+        ``depth``, it's created once and kept in the type's schema,
+        which forgets it when types are added or removed. It's used
+        to print the query and to interpret the results, thus it
+        must not be modified.
+
+        >>> op = Operation(global_schema.Query)
+        >>> repository = op.repository(id='repo1')
+        >>> repository.__auto_select__(1)
+        {
+          id
+          name
+        }
+        >>> r2 = op.repository(id='repo2', __alias__='r2')
+        >>> r2.__auto_select__(1) is repository.__auto_select__(1)
+        True
+        '''
+        t = self.__field__.type
+        cache = t.__schema__.__auto_selections__
+        key = (t, depth)
+        q = cache.get(key)
+        if q is None:
+            q = cache[key] = self.__get_all_fields_selection_list(depth, [])
+        return q
+
     def __get_all_fields_selection_list(self, depth, trail):
         t = self.__field__.type
         trail.append(t)
@@ -1169,12 +1296,108 @@ class Selection:
         if self.__selection_list is not None:
             selections = self.__selection_list
             if not selections:
-                selections = self.__get_all_fields_selection_list(
-                    auto_select_depth, [])
+                selections = self.__auto_select__(auto_select_depth)
             query = ' ' + selections.__to_graphql__(
                 indent, indent_string, auto_select_depth)
         return prefix + alias + self.__field__.graphql_name + args + query
 
+    def __clone__(self, alias, variables, args=None, selections=None,
+                  share=True):
+        '''Copy the selection using a new alias, renaming variables.
+
+        :param alias: the alias of the new selection.
+        :type alias: str
+
+        :param variables: maps the GraphQL name of variables to the
+          :class:`sgqlc.types.Variable` to use instead. If empty, the
+          child selections are shared with the new selection, unless
+          ``share`` is false.
+        :type variables: dict
+
+        :param args: if given, the arguments to use instead of the
+          original ones, such as a different ``after`` cursor.
+        :type args: dict
+
+        :param selections: if given, the only child selections of the
+          new selection, used to select a path to a nested field.
+        :type selections: list of :class:`Selection`
+
+        :param share: if false, the child selections are always copied,
+          so the original ones don't keep a reference to the new
+          selection, which should be used for short lived operations.
+        :type share: bool
+
+        :return: the new selection.
+        :rtype: :class:`Selection`
+
+        >>> op = Operation(global_schema.Query)
+        >>> issues = op.repository(id='repo1').issues(title_contains='x')
+        >>> issues.number()
+        number
+        >>> repository = op['repository'].__selection__()
+        >>> issues = repository['issues'].__selection__()
+        >>> issues = issues.__clone__(None, {}, args={'title_contains': 'y'})
+        >>> print(repository.__clone__('repo', {}, selections=[issues]))
+        repo: repository(id: "repo1") {
+          issues(titleContains: "y") {
+            number
+          }
+        }
+
+        Unless ``share`` is false, changes to the child selections of
+        the copy apply to the original selection:
+
+        >>> copied = issues.__clone__(None, {}, share=False)
+        >>> copied.title()
+        title
+        >>> shared = issues.__clone__(None, {})
+        >>> shared.body()
+        body
+        >>> print(repository)
+        repository(id: "repo1") {
+          issues(titleContains: "x") {
+            number
+            body
+          }
+        }
+        '''
+        if args is None:
+            args = self.__args__
+        if variables:
+            args = _rename_variables(args, variables)
+
+        s = Selection(alias, self.__field__, args)
+        if self.__selection_list is not None:
+            if selections is not None:
+                for child in selections:
+                    s.__selection_list += child
+            elif variables or not share:
+                s.__selection_list = self.__selection_list.__clone__(
+                    variables, share)
+            else:
+                s.__selection_list = self.__selection_list
+        return s
+
+    def __collect_variables__(self, used):
+        '''Add the GraphQL names of the variables used by this selection,
+        including its child selections, to the ``used`` set.
+
+        >>> from sgqlc.types import Variable
+        >>> op = Operation(global_schema.Query, title=str)
+        >>> repository = op.repository(id='repo1')
+        >>> repository.issues(title_contains=Variable('title')).number()
+        number
+        >>> repository.owner.__as__(global_schema.User).name()
+        name
+        >>> used = set()
+        >>> op['repository'].__selection__().__collect_variables__(used)
+        >>> used
+        {'title'}
+        '''
+        _collect_variables(self.__args__, used)
+        if self.__selection_list is not None:
+            self.__selection_list.__collect_variables__(used)
+
     def __dir__(self):
         original_dir = super(Selection, self).__dir__()
         t = self.__field__.type
@@ -1183,6 +1406,20 @@ class Selection:
         fields = [f.name for f in t]
         return sorted(original_dir + fields)
 
+    def __add_parent__(self, parent):
+        'Register ``parent`` to be invalidated if the child list changes'
+        if self.__selection_list is not None:
+            self.__selection_list.__add_parent__(parent)
+
+    @property
+    def __decoder__(self):
+        'Proxy to the selection list decoder, see ``SelectionList``'
+        return self.__selection_list.__decoder__
+
+    @__decoder__.setter
+    def __decoder__(self, decoder):
+        self.__selection_list.__decoder__ = decoder
+
     def __getattr__(self, name):
         if name.startswith('_'):
             sl = self.__selection_list
@@ -1429,7 +1666,10 @@ class SelectionList:
 
     '''
 
-    __slots__ = ('__type', '__selectors', '__selections', '__casts')
+    __slots__ = (
+        '__type', '__selectors', '__selections', '__casts', '__decoder__',
+        '__cache', '__parents', '__weakref__',
+    )
 
     def __init__(self, typ):
         assert issubclass(typ, BaseTypeWithTypename), \
@@ -1438,6 +1678,13 @@ class SelectionList:
         self.__selectors = {}
         self.__selections = []
         self.__casts = OrderedDict()
+        # reset on changes to self or any child, as the decoder uses the
+        # auto-selection of children without sub-fields:
+        # - compiled by ContainerType when interpreting results
+        self.__decoder__ = None
+        # - rendered GraphQL
+        self.__cache = {}
+        self.__parents = weakref.WeakSet()  # not kept alive by children
 
     def __str__(self):
         return self.__to_graphql__()
@@ -1450,6 +1697,12 @@ class SelectionList:
 
     def __to_graphql__(self, indent=0, indent_string='  ',
                        auto_select_depth=DEFAULT_AUTO_SELECT_DEPTH):
+        key = (indent, indent_string, auto_select_depth)
+        try:
+            return self.__cache[key]
+        except KeyError:
+            pass
+
         prefix = indent_string * indent
         next_indent = indent + 1
 
@@ -1466,7 +1719,8 @@ class SelectionList:
             ))
 
         s.append(prefix + '}')
-        return '\n'.join(s)
+        s = self.__cache[key] = '\n'.join(s)
+        return s
 
     def __iter__(self):
         return iter(self.__selections)
@@ -1489,8 +1743,28 @@ class SelectionList:
     def __iadd__(self, selection):
         assert isinstance(selection, Selection)
         self.__selections.append(selection)
+        selection.__add_parent__(self)
+        self.__invalidate__()
         return self
 
+    def __add_parent__(self, parent):
+        '''Register ``parent`` to be invalidated when this list changes.
+
+        The parent is an object with ``__invalidate__()`` method, such as
+        the :class:`SelectionList` containing the selection that owns
+        this list, or the :class:`Operation`. It's weakly referenced, so
+        selections shared by many short lived operations don't keep
+        them alive.
+        '''
+        self.__parents.add(parent)
+
+    def __invalidate__(self):
+        'Forget the rendered GraphQL and decoder, of this list and parents.'
+        self.__decoder__ = None
+        self.__cache.clear()
+        for parent in self.__parents:
+            parent.__invalidate__()
+
     @property
     def __type__(self):
         return self.__type
@@ -1499,6 +1773,23 @@ class SelectionList:
     def __casts__(self):
         return self.__casts
 
+    def __clone__(self, variables, share=True):
+        'Copy the selection list, see :func:`Selection.__clone__`'
+        sl = self.__class__(self.__type)
+        for s in self.__selections:
+            sl += s.__clone__(s.__alias__, variables, share=share)
+        for k, v in self.__casts.items():
+            cast = sl.__casts[k] = v.__clone__(variables, share)
+            cast.__add_parent__(sl)
+        return sl
+
+    def __collect_variables__(self, used):
+        'Collect the variables, see :func:`Selection.__collect_variables__`'
+        for s in self.__selections:
+            s.__collect_variables__(used)
+        for v in self.__casts.values():
+            v.__collect_variables__(used)
+
     def __as__(self, typ):
         '''Create a child selection list on the given type.
 
@@ -1516,6 +1807,7 @@ class SelectionList:
             pass
 
         sl = InlineFragmentSelectionList(typ)
+        sl.__add_parent__(self)
         self.__casts[typ.__name__] = sl
         self['__typename__']()
         return sl
@@ -1643,6 +1935,57 @@ class Operation:
       ...
     KeyError: 'Query has no field does_not_exist'
 
+    The rendered GraphQL is cached, thus executing the same operation
+    many times, such as while paginating, is cheap. Any new selection,
+    at any level, invalidates the cache:
+
+    >>> op = Operation()
+    >>> repository = op.repository(id='repo1')
+    >>> repository.name()
+    name
+    >>> bytes(op) is bytes(op)
+    True
+    >>> str(op) is str(op)
+    True
+    >>> repository.issues.number()
+    number
+    >>> print(bytes(op).decode('utf-8'))
+    query {
+    repository(id: "repo1") {
+    name
+    issues {
+    number
+    }
+    }
+    }
+    >>> repository.owner.__as__(global_schema.User).login()
+    login
+    >>> op
+    query {
+      repository(id: "repo1") {
+        name
+        issues {
+          number
+        }
+        owner {
+          __typename
+          ... on User {
+            login
+          }
+        }
+      }
+    }
+    >>> repository.owner.__as__(global_schema.User).name()
+    name
+    >>> print(str(op).split('... on User ')[1])
+    {
+            login
+            name
+          }
+        }
+      }
+    }
+
     '''
     def __init__(self, typ=None, name=None, **args):
         if typ is None:
@@ -1661,9 +2004,19 @@ class Operation:
         self.__args = ArgDict(variable_args)
         self.__args._set_container(typ.__schema__, self)
         self.__selection_list = SelectionList(typ)
+        self.__selection_list.__add_parent__(self)
+        self.__cache = {}
+        self.__bytes = None
+        self.__hash = None
 
     def __to_graphql__(self, indent=0, indent_string='  ',
                        auto_select_depth=DEFAULT_AUTO_SELECT_DEPTH):
+        key = (indent, indent_string, auto_select_depth)
+        try:
+            return self.__cache[key]
+        except KeyError:
+            pass
+
         prefix = indent_string * indent
         kind = self.__kind
         name = ''
@@ -1673,7 +2026,14 @@ class Operation:
         args = self.__args.__to_graphql__(indent, indent_string)
         selections = self.__selection_list.__to_graphql__(
             indent, indent_string, auto_select_depth)
-        return prefix + kind + name + args + ' ' + selections
+        s = self.__cache[key] = prefix + kind + name + args + ' ' + selections
+        return s
+
+    def __invalidate__(self):
+        'Forget the rendered GraphQL, called when selections change.'
+        self.__cache.clear()
+        self.__bytes = None
+        self.__hash = None
 
     def __iter__(self):
         return iter(self.__selection_list)
@@ -1697,7 +2057,230 @@ class Operation:
         return str(self)
 
     def __bytes__(self):
-        return bytes(self.__to_graphql__(indent_string=''), 'utf-8')
+        if self.__bytes is None:
+            self.__bytes = bytes(self.__to_graphql__(indent_string=''),
+                                 'utf-8')
+        return self.__bytes
+
+    @property
+    def __sha256__(self):
+        '''SHA-256 hex digest of ``bytes(self)``, cached.
+
+        Used as the automatic persisted query hash by
+        :class:`sgqlc.endpoint.http.HTTPEndpoint`.
+        '''
+        if self.__hash is None:
+            self.__hash = hashlib.sha256(bytes(self)).hexdigest()
+        return self.__hash
+
+    def __iadd__(self, selection):
+        self.__selection_list += selection
+        return self
+
+    @property
+    def __type__(self):
+        'The root type, such as ``schema.Query``'
+        return self.__type
+
+    @property
+    def __variables__(self):
+        'The :class:`sgqlc.types.ArgDict` with the operation variables'
+        return self.__args
 
     def __add__(self, other):
         return self.__type(other.get('data'), self.__selection_list)
+
+    def __view__(self, other):
+        '''Read-only view of the results, without creating instances.
+
+        Like ``self + other``, but fields are resolved on access from
+        the JSON data, see :mod:`sgqlc.types.view`. Returns ``None``
+        if there is no ``data``.
+
+        >>> op = Operation(global_schema.Query)
+        >>> op.repository(id='repo1').issues.number()
+        number
+        >>> view = op.__view__({'data': {'repository': {
+        ...     'issues': [{'number': 1}, {'number': 2}]}}})
+        >>> [issue.number for issue in view.repository.issues]
+        [1, 2]
+        >>> op.__view__({'errors': [{'message': 'failed'}]}) is None
+        True
+        '''
+        return view_value(self.__type, other.get('data'),
+                          self.__selection_list)
+
+
+def _rename_variables(value, variables):
+    '''Rename variables in selection arguments, including nested values.
+
+    >>> from sgqlc.types import Variable
+    >>> _rename_variables(
+    ...     {'a': Variable('a'), 'b': [Variable('b'), {'a': Variable('a')}],
+    ...      'c': 1},
+    ...     {'a': Variable('x')})
+    {'a': $x, 'b': [$b, {'a': $x}], 'c': 1}
+    '''
+    if isinstance(value, Variable):
+        return variables.get(value.graphql_name, value)
+    elif isinstance(value, dict):
+        return value.__class__(
+            (k, _rename_variables(v, variables)) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        return value.__class__(_rename_variables(v, variables) for v in value)
+    return value
+
+
+def _collect_variables(value, used):
+    '''Add the GraphQL names of variables in ``value`` to ``used``.
+
+    >>> from sgqlc.types import Variable
+    >>> used = set()
+    >>> _collect_variables(
+    ...     {'a': Variable('a'), 'b': [Variable('b'), {'a': Variable('a')}]},
+    ...     used)
+    >>> sorted(used)
+    ['a', 'b']
+    '''
+    if isinstance(value, Variable):
+        used.add(value.graphql_name)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _collect_variables(v, used)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _collect_variables(v, used)
+
+
+class MergedOperation(Operation):
+    '''Many operations merged into a single one.
+
+    .. warning::
+
+      Do not create instances directly, use
+      :func:`sgqlc.operation.merge_operations` instead.
+
+    Each root selection of the N-th operation is aliased as
+    ``opN_key``, where ``key`` is the original alias or field name,
+    and variables already used by previous operations are renamed to
+    ``opN_name``.
+
+    Use :func:`merge_variables` to create the variables to execute
+    the merged operation and :func:`split` to split the results back
+    into each original operation.
+    '''
+
+    def __init__(self, operations, name=None):
+        operations = tuple(operations)
+        if not operations:
+            raise ValueError('no operations to merge')
+
+        typ = operations[0].__type__
+        variable_args = OrderedDict()
+        used = set()
+        self.__renames = []
+        for i, op in enumerate(operations, 1):
+            if op.__type__ is not typ:
+                raise ValueError('cannot merge %s with %s operations' %
+                                 (op.__type__.__name__, typ.__name__))
+
+            renames = {}
+            for k, arg in op.__variables__.items():
+                var = original = Variable(k[1:])
+                while var.graphql_name in used:
+                    var = Variable('op%d_%s' % (i, var.name))
+                if var is not original:
+                    renames[original.graphql_name] = var
+                used.add(var.graphql_name)
+                variable_args[var.name] = Arg(arg.type, default=arg.default)
+            self.__renames.append(renames)
+
+        super(MergedOperation, self).__init__(typ, name, **variable_args)
+
+        self.__operations = operations
+        self.__aliases = {}  # merged alias -> (index, original key)
+        for i, (op, renames) in enumerate(zip(operations, self.__renames)):
+            for s in op:
+                key = s.__alias__ or s.__field__.graphql_name
+                alias = 'op%d_%s' % (i + 1, key)
+                self.__aliases[alias] = (i, key)
+                # copied, so the originals don't keep a reference to it
+                self += s.__clone__(alias, renames, share=False)
+
+    @property
+    def __operations__(self):
+        'The original operations, in the merge order'
+        return self.__operations
+
+    def merge_variables(self, *variables):
+        '''Merge the variables of each operation, renaming as needed.
+
+        :param variables: the variables dict (or ``None``) of each
+          operation, in the merge order, with GraphQL names as keys.
+        :type variables: dict
+
+        :return: variables to execute the merged operation.
+        :rtype: dict
+        '''
+        merged = {}
+        for renames, v in zip(self.__renames, variables):
+            for k, value in (v or {}).items():
+                var = renames.get(k)
+                merged[var.graphql_name if var else k] = value
+        return merged
+
+    def split(self, data):
+        '''Split the JSON result in one result per merged operation.
+
+        Each result is a dict with ``data`` and, if any, ``errors``,
+        usable with ``op + result``. Errors with a ``path`` are given
+        to the operation it refers to (with the path renamed back),
+        others are given to every operation.
+
+        :param data: JSON result of executing this operation.
+        :type data: dict
+
+        :return: list of results, in the merge order.
+        :rtype: list
+        '''
+        merged = data.get('data')
+        results = [{'data': None if merged is None else {}}
+                   for _ in self.__operations]
+        if merged is not None:
+            for alias, value in merged.items():
+                i, key = self.__aliases.get(alias, (None, None))
+                if i is not None:
+                    results[i]['data'][key] = value
+
+        for error in data.get('errors') or ():
+            path = error.get('path') if isinstance(error, dict) else None
+            i, key = self.__aliases.get(path[0], (None, None)) \
+                if path else (None, None)
+            if i is None:
+                for result in results:
+                    result.setdefault('errors', []).append(error)
+            else:
+                error = dict(error, path=[key] + list(path[1:]))
+                results[i].setdefault('errors', []).append(error)
+
+        return results
+
+
+def merge_operations(*operations, name=None):
+    '''Merge many operations on the same root type into a single one.
+
+    This allows to execute independent operations in a single
+    request, even if the server doesn't support batches, see
+    :class:`MergedOperation`.
+
+    :param operations: the operations to merge, all must have the same
+      root type (ie: all queries or all mutations).
+    :type operations: :class:`Operation`
+
+    :param name: the name of the merged operation.
+    :type name: str
+
+    :return: the merged operation.
+    :rtype: :class:`MergedOperation`
+    '''
+    return MergedOperation(operations, name)
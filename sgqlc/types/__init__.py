@@ -503,14 +503,202 @@ TypeUsingPython(a_int=3, a_float=3.3)
 >>> print(bytes(obj).decode('utf-8'))
 {"aFloat":3.3,"aInt":3}
 
+Compact Instances
+~~~~~~~~~~~~~~~~~
+
+Each instance keeps the ``json_data`` as backing store and a
+dictionary of the fields it has, besides its own ``__dict__``. When
+millions of objects are created, declare the types with
+``__compact__ = True`` (or ``sgqlc-codegen --compact``) so instances
+store only the field values, in slots. Subclasses are also compact:
+
+>>> class CompactType(Type):
+...     __compact__ = True
+...     a_int = int
+...     a_float = float
+...     a_string = str
+...
+>>> json_data = {'aInt': 1}
+>>> obj = CompactType(json_data)
+>>> obj
+CompactType(a_int=1)
+>>> isinstance(obj, CompactType)
+True
+>>> hasattr(obj, '__dict__')
+False
+
+Fields may be set, but the ``json_data`` is not updated:
+
+>>> obj.a_float = 2.1
+>>> obj
+CompactType(a_int=1, a_float=2.1)
+>>> json_data
+{'aInt': 1}
+>>> print(bytes(obj).decode('utf-8'))
+{"aFloat":2.1,"aInt":1}
+>>> 'a_string' in obj, len(obj)
+(False, 2)
+
+Instances are of a subclass created on demand by
+:func:`ContainerTypeMeta.__compact_class__`, with slots only for the
+selected fields when interpreting results of
+:class:`sgqlc.operation.Operation`, thus the others can't be set:
+
+>>> from sgqlc.operation import Operation
+>>> class CompactQuery(Type):
+...     compact = CompactType
+...
+>>> op = Operation(CompactQuery)
+>>> op.compact.a_int()
+aInt
+>>> op.compact.__as__(CompactType).a_string()
+aString
+>>> obj = (op + {'data': {'compact': {
+...     '__typename': 'CompactType', 'aInt': 1}}}).compact
+>>> obj
+CompactType(a_int=1, __typename__='CompactType')
+>>> type(obj).__compact_slots__
+('a_int', '__typename__', 'a_string')
+>>> obj.a_float = 2.1
+Traceback (most recent call last):
+  ...
+AttributeError: 'CompactType' object has no attribute 'a_float'
+>>> import copy
+>>> copy.copy(obj)
+CompactType(a_int=1, __typename__='CompactType')
+
+Copies and pickles are instances of the class created for the declared
+type, without the selection list, since the class created for the
+selection list can't be pickled:
+
+>>> type(copy.copy(obj)) is type(obj)
+False
+>>> CompactType(None)
+CompactType()
+
+Lazy Instances
+~~~~~~~~~~~~~~
+
+Fields are converted when the instance is created, recursively
+creating nested objects and parsing scalars such as
+:class:`sgqlc.types.datetime.DateTime`. Types declared with
+``__lazy__ = True`` (or ``sgqlc-codegen --lazy``) keep the
+``json_data`` and convert each field on its first access, making it
+cheap to interpret large results that are only partially inspected.
+Subclasses are also lazy:
+
+>>> class LazyType(Type):
+...     __lazy__ = True
+...     a_int = int
+...     a_float = float
+...     a_string = str
+...
+>>> class LazyQuery(Type):
+...     __lazy__ = True
+...     items = list_of(LazyType)
+...
+>>> json_data = {'items': [{'aInt': 1, 'aFloat': 2.1}, {'aInt': 'x'}]}
+>>> obj = LazyQuery(json_data)
+>>> obj.__dict__['__lazy_fields__']['items'][2]  # (type, selection, value)
+[{'aInt': 1, 'aFloat': 2.1}, {'aInt': 'x'}]
+
+The instance protocol is the same, but doesn't convert just to
+check for the fields:
+
+>>> list(obj), len(obj), 'items' in obj, 'other' in obj
+(['items'], 1, True, False)
+>>> 'items' in obj.__dict__
+False
+>>> item = obj.items[0]
+>>> 'items' in obj.__dict__, obj.__dict__['__lazy_fields__']
+(True, {})
+>>> item
+LazyType(a_int=1, a_float=2.1)
+
+Errors are reported on access, not on creation:
+
+>>> obj.items[1].a_int  # doctest: +ELLIPSIS
+Traceback (most recent call last):
+  ...
+ValueError: LazyType selection 'a_int': 'x' (invalid literal for ...)
+>>> obj.items[1].a_string
+Traceback (most recent call last):
+  ...
+AttributeError: 'LazyType' object has no attribute 'a_string'
+
+Setting a field updates the ``json_data`` and drops the pending
+conversion:
+
+>>> obj.items[1].a_int = 2
+>>> obj.items[1]
+LazyType(a_int=2)
+>>> json_data['items'][1]
+{'aInt': 2}
+>>> print(bytes(obj).decode('utf-8'))
+{"items":[{"aFloat":2.1,"aInt":1},{"aInt":2}]}
+
+Instances without ``json_data`` have nothing pending:
+
+>>> empty = LazyType(None)
+>>> empty.a_int = 1
+>>> empty
+LazyType(a_int=1)
+
+The same applies to results of :class:`sgqlc.operation.Operation`,
+only the selected fields are pending:
+
+>>> op = Operation(LazyQuery)
+>>> op.items.a_int()
+aInt
+>>> obj = (op + {'data': {'items': [{'aInt': 1, 'aFloat': 2.1}]}}).items[0]
+>>> obj.__dict__['__lazy_fields__']
+{'a_int': (scalar Int, aInt, 1)}
+>>> obj
+LazyType(a_int=1)
+
+Compact types are never lazy, they don't keep the ``json_data``.
+
+Field Tables
+~~~~~~~~~~~~
+
+Fields declared as class members have their :class:`Field`,
+:class:`ArgDict` and :class:`Arg` created with the class, which is
+costly for large schemas. Types declared with ``__field_table__``
+(or ``sgqlc-codegen --field-tables``) list their fields as
+``(name, type, graphql_name, args)`` tuples, where ``type`` is the
+GraphQL type reference and ``args`` is ``None`` or a tuple of
+``(name, type, graphql_name, default)``. The fields, including the
+ones inherited from the base classes, are only created on first use:
+
+>>> class TableType(Type):
+...     __field_table__ = (
+...         ('a_int', 'Int!', 'aInt', None),
+...         ('items', '[String]', 'items', (
+...             ('first', 'Int', 'first', 10),
+...         )),
+...     )
+...
+>>> TableType
+type TableType {
+  aInt: Int!
+  items(first: Int = 10): [String]
+}
+>>> TableType({'aInt': 1, 'items': ['a']})
+TableType(a_int=1, items=['a'])
+
+Other members are not fields, they must all be in the table.
+
 :license: ISC
 '''
 
 __docformat__ = 'reStructuredText en'
 
-import json
+import enum
+import sys
 from collections import OrderedDict
 
+from ..codec import get_codec
+
 __all__ = (
     'Schema', 'Scalar', 'Enum', 'Union', 'Variable', 'Arg', 'ArgDict',
     'Field', 'Type', 'Interface', 'Input', 'Int', 'Float', 'String',
@@ -551,12 +739,14 @@ class Schema:
 
     The schema is an iterator that will report all registered types.
     '''
-    __slots__ = ('__all', '__kinds', '__cache__')
+    __slots__ = ('__all', '__kinds', '__cache__', '__auto_selections__')
 
     def __init__(self, base_schema=None):
         self.__all = OrderedDict()
         self.__kinds = {}
         self.__cache__ = {}
+        # (type, depth) => SelectionList, see sgqlc.operation.Selection
+        self.__auto_selections__ = {}
 
         if base_schema is None:
             try:
@@ -735,6 +925,7 @@ class Schema:
             raise ValueError('%s already has %s=%s' %
                              (self.__class__.__name__, name, typ))
         self.__kinds.setdefault(typ.__kind__, ODict()).update({name: typ})
+        self.__auto_selections__.clear()
         return self
 
     def __isub__(self, typ):
@@ -747,6 +938,7 @@ class Schema:
         name = typ.__name__
         del self.__all[name]
         del self.__kinds[typ.__kind__][name]
+        self.__auto_selections__.clear()
         return self
 
     def __str__(self):
@@ -841,6 +1033,7 @@ class BaseType(metaclass=BaseMeta):
     '''Base shared by all GraphQL classes.
 
     '''
+    __slots__ = ()  # allow compact ContainerType subclasses
     __schema__ = global_schema
     __kind__ = None
 
@@ -865,6 +1058,7 @@ class BaseMetaWithTypename(BaseMeta):
 
 class BaseTypeWithTypename(BaseType, metaclass=BaseMetaWithTypename):
     'BaseType with ``__typename`` field (containers and union).'
+    __slots__ = ()
 
 
 def _create_non_null_wrapper(name, t):
@@ -877,18 +1071,34 @@ def _create_non_null_wrapper(name, t):
     def __to_graphql_input__(value, indent=0, indent_string='  '):
         return t.__to_graphql_input__(value, indent, indent_string)
 
-    return type(name, (t,), {
+    namespace = {
         '__new__': __new__,
         '_%s__auto_register' % name: False,
         '__to_graphql_input__': __to_graphql_input__,
-    })
+        '__non_null_of__': t,
+    }
+
+    convert_list = getattr(t, '__convert_list__', None)
+    if convert_list is not None:
+        def __convert_list__(values):
+            if None in values:
+                raise ValueError(name + ' received null value')
+            return convert_list(values)
+
+        namespace['__convert_list__'] = __convert_list__
+
+    return type(name, (t,), namespace)
 
 
 def _create_list_of_wrapper(name, t):
     'creates type wrapper for list of given type'
+    convert_list = getattr(t, '__convert_list__', None)
+
     def __new__(cls, json_data, selection_list=None):
         if json_data is None:
             return None
+        if convert_list is not None:
+            return convert_list(json_data)
         return [t(v, selection_list) for v in json_data]
 
     def __to_graphql_input__(value, indent=0, indent_string='  '):
@@ -907,9 +1117,28 @@ def _create_list_of_wrapper(name, t):
         '_%s__auto_register' % name: False,
         '__to_graphql_input__': __to_graphql_input__,
         '__to_json_value__': __to_json_value__,
+        '__list_of__': t,
+        '__convert_list__': None,  # elements are lists, convert each
     })
 
 
+def _type_from_ref(ref):
+    '''Type given its GraphQL reference, such as ``[Name!]!``.
+
+    The named type is resolved when first used, see :class:`Lazy`:
+
+    >>> _type_from_ref('Int')
+    'Int'
+    >>> _type_from_ref('[Int!]!')
+    <Lazy name='[Int!]' target_name='[Int!]!'>
+    '''
+    if ref[-1] == '!':
+        return non_null(_type_from_ref(ref[:-1]))
+    elif ref[0] == '[':
+        return list_of(_type_from_ref(ref[1:-1]))
+    return ref
+
+
 class Lazy:
     '''Holds a type name until it's created.
 
@@ -1159,6 +1388,7 @@ def list_of(t):
       b(values: [Int]): String
     }
 
+    >>> import json
     >>> print(json.dumps(list_of(int).__to_json_value__([1, 2])))
     [1, 2]
     >>> print(json.dumps(list_of(int).__to_json_value__(None)))
@@ -1202,7 +1432,7 @@ class Scalar(BaseType):
 
     '''
     __kind__ = 'scalar'
-    __json_dump_args__ = {}  # given to json.dumps(obj, **args)
+    __json_dump_args__ = {}  # given to codec.dumps(obj, **args)
 
     def converter(value):
         return value
@@ -1210,12 +1440,41 @@ class Scalar(BaseType):
     def __new__(cls, json_data, selection_list=None):
         return None if json_data is None else cls.converter(json_data)
 
+    @classmethod
+    def __convert_list__(cls, values):
+        '''Convert a list of JSON values at once, used by :func:`list_of`.
+
+        This is the same as ``[cls(v) for v in values]``, without the
+        cost of calling the type for each element:
+
+        >>> Int.__convert_list__(['1', 2, None])
+        [1, 2, None]
+        >>> String.__convert_list__(['a', 'b'])
+        ['a', 'b']
+
+        Subclasses overriding ``__new__()`` are called for each element:
+
+        >>> class UpperString(Scalar):
+        ...     def __new__(cls, json_data, selection_list=None):
+        ...         return json_data.upper()
+        ...
+        >>> list_of(UpperString)(['a', 'b'])
+        ['A', 'B']
+        >>> global_schema -= UpperString
+        '''
+        if cls.__new__ is not Scalar.__new__:
+            return [cls(v) for v in values]
+        converter = cls.converter
+        if None in values:
+            return [None if v is None else converter(v) for v in values]
+        return list(map(converter, values))
+
     @classmethod
     def __to_graphql_input__(cls, value, indent=0, indent_string='  '):
         if hasattr(value, '__to_graphql_input__'):
             return value.__to_graphql_input__(value, indent, indent_string)
-        return json.dumps(cls.__to_json_value__(value),
-                          **cls.__json_dump_args__)
+        return get_codec().dumps(cls.__to_json_value__(value),
+                                 **cls.__json_dump_args__)
 
     @classmethod
     def __to_json_value__(cls, value):
@@ -1234,15 +1493,29 @@ class EnumMeta(BaseMeta):
             raise ValueError(name + ': missing __choices__')
 
         if isinstance(cls.__choices__, str):
-            cls.__choices__ = tuple(cls.__choices__.split())
+            choices = cls.__choices__.split()
         else:
-            cls.__choices__ = tuple(cls.__choices__)
-
-        for v in cls.__choices__:
-            setattr(cls, v, v)
+            choices = cls.__choices__
+        cls.__choices__ = tuple(sys.intern(v) for v in choices)
+
+        cls.__enum__ = None
+        values = cls.__choices__
+        if cls.__python_enum__ and cls.__choices__:
+            cls.__enum__ = enum.Enum(
+                name, [(v, v) for v in cls.__choices__],
+                module=cls.__module__, type=str)
+            values = tuple(cls.__enum__)
+
+        # maps the JSON value to the decoded one, checking membership
+        cls.__values__ = dict(zip(cls.__choices__, values))
+        for k, v in cls.__values__.items():
+            setattr(cls, k, v)
 
     def __contains__(cls, v):
-        return v in cls.__choices__
+        try:
+            return v in cls.__values__
+        except TypeError:  # unhashable
+            return False
 
     def __iter__(cls):
         return iter(cls.__choices__)
@@ -1259,13 +1532,15 @@ class EnumMeta(BaseMeta):
         return '\n'.join(s)
 
     def __to_graphql_input__(cls, value, indent=0, indent_string='  '):
-        return value
+        return cls.__to_json_value__(value)
 
     def __to_json_value__(cls, value):
+        if isinstance(value, enum.Enum):
+            return value.value
         return value
 
     def __to_internal_json_value__(cls, value):
-        return value
+        return cls.__to_json_value__(value)
 
 
 class Enum(BaseType, metaclass=EnumMeta):
@@ -1304,6 +1579,8 @@ class Enum(BaseType, metaclass=EnumMeta):
     ('APPLE', 'ORANGE', 'BANANA')
     >>> len(Fruits)
     3
+    >>> 'APPLE' in Fruits, ['APPLE'] in Fruits
+    (True, False)
 
     Failing to define choices will raise exception:
 
@@ -1320,19 +1597,91 @@ class Enum(BaseType, metaclass=EnumMeta):
 
     And for JSON it's a string as well (so JSON encoder adds quotes):
 
+    >>> import json
     >>> print(json.dumps(Fruits.__to_json_value__(Fruits.APPLE)))
     "APPLE"
 
+    Decoded values are the interned choices, shared by all instances
+    instead of each keeping its copy of the JSON string:
+
+    >>> value = Fruits(''.join(['APP', 'LE']))
+    >>> value is Fruits.APPLE
+    True
+
+    With ``__python_enum__ = True``, values are decoded to members of
+    the :class:`enum.Enum` at ``__enum__``, which may be compared by
+    identity. They are also strings, equal to the choices:
+
+    >>> class Shapes(Enum):
+    ...     __choices__ = ('CIRCLE', 'SQUARE')
+    ...     __python_enum__ = True
+    ...
+    >>> Shapes('CIRCLE')
+    <Shapes.CIRCLE: 'CIRCLE'>
+    >>> Shapes('CIRCLE') is Shapes.CIRCLE is Shapes.__enum__.CIRCLE
+    True
+    >>> Shapes('CIRCLE') == 'CIRCLE', Shapes.SQUARE in Shapes
+    (True, True)
+    >>> Shapes.__convert_list__(['SQUARE', None])
+    [<Shapes.SQUARE: 'SQUARE'>, None]
+    >>> print(Shapes.__to_graphql_input__(Shapes.SQUARE))
+    SQUARE
+    >>> print(json.dumps(Shapes.__to_json_value__(Shapes.SQUARE)))
+    "SQUARE"
+
     '''
     __kind__ = 'enum'
     __choices__ = ()
+    __python_enum__ = False
 
     def __new__(cls, json_data, selection_list=None):
         if json_data is None:
             return None
-        if json_data not in cls:
-            raise ValueError('%s does not accept value %s' % (cls, json_data))
-        return json_data
+        try:
+            return cls.__values__[json_data]
+        except (KeyError, TypeError):
+            raise ValueError('%s does not accept value %s' %
+                             (cls, json_data)) from None
+
+    @classmethod
+    def __convert_list__(cls, values):
+        '''Convert a list of JSON values at once, used by :func:`list_of`.
+
+        >>> class Sizes(Enum):
+        ...     __choices__ = ('S', 'M', 'L')
+        ...
+        >>> Sizes.__convert_list__(['S', 'S', None, 'L'])
+        ['S', 'S', None, 'L']
+        >>> Sizes.__convert_list__(['S', 'XL', 'XXL'])
+        Traceback (most recent call last):
+          ...
+        ValueError: Sizes does not accept value XL
+        >>> Sizes.__convert_list__(['S', ['M']])
+        Traceback (most recent call last):
+          ...
+        ValueError: Sizes does not accept value ['M']
+
+        Subclasses overriding ``__new__()`` are called for each element:
+
+        >>> class LowerSizes(Sizes):
+        ...     def __new__(cls, json_data, selection_list=None):
+        ...         return Sizes(json_data.upper())
+        ...
+        >>> list_of(LowerSizes)(['s', 'm'])
+        ['S', 'M']
+        '''
+        if cls.__new__ is not Enum.__new__:
+            return [cls(v) for v in values]
+        try:
+            result = list(map(cls.__values__.get, values))
+        except TypeError:  # unhashable values
+            return [cls(v) for v in values]
+
+        if None in result:
+            for v, r in zip(values, result):
+                if r is None and v is not None:
+                    raise ValueError('%s does not accept value %s' % (cls, v))
+        return result
 
 
 class UnionMeta(BaseMetaWithTypename):
@@ -1414,9 +1763,57 @@ class Union(BaseTypeWithTypename, metaclass=UnionMeta):
     __types__ = ()
 
 
+def _new_compact_container(cls, json_data=None, selection_list=None):
+    return object.__new__(cls.__compact_class__(selection_list))
+
+
+def _reduce_compact_container(self):
+    # the class created by __compact_class__() can't be pickled by name
+    cls = type(self)
+    public = next(c for c in cls.__mro__
+                  if '__compact_slots__' not in c.__dict__)
+    names = cls.__compact_slots__
+    values = tuple((name, getattr(self, name)) for name in names
+                   if hasattr(self, name))
+    return (public.__restore_compact__, (names, values))
+
+
+def _getattr_lazy_container(self, name):
+    # only called if not in __dict__: convert the pending field once
+    pending = self.__lazy__ and self.__dict__.get('__lazy_fields__')
+    if not pending or name not in pending:
+        raise AttributeError('%r object has no attribute %r' % (
+            self.__class__.__name__, name))
+
+    ftype, sel, value = pending[name]
+    try:
+        value = ftype(value, sel)
+    except Exception as exc:
+        raise ValueError('%s selection %r: %r (%s)' % (
+            self.__class__, name, value, exc)) from exc
+    object.__setattr__(self, name, value)
+    del pending[name]
+    return value
+
+
 class ContainerTypeMeta(BaseMetaWithTypename):
     '''Creates container types, ensures fields are instance of Field.
     '''
+    def __new__(cls, name, bases, namespace):
+        compact = namespace.get('__compact__')
+        if compact is None:
+            compact = any(getattr(b, '__compact__', False) for b in bases)
+        if compact:
+            # instances are created by __compact_class__()
+            namespace['__lazy__'] = False  # no json_data to convert later
+            namespace.setdefault('__slots__', ())
+            namespace.setdefault('__new__', _new_compact_container)
+        elif namespace.get('__lazy__'):
+            # fields are converted on first access
+            namespace.setdefault('__getattr__', _getattr_lazy_container)
+        return super(ContainerTypeMeta, cls).__new__(
+            cls, name, bases, namespace)
+
     def __init__(cls, name, bases, namespace):
         super(ContainerTypeMeta, cls).__init__(name, bases, namespace)
         cls.__fields = OrderedDict()
@@ -1430,6 +1827,10 @@ class ContainerTypeMeta(BaseMetaWithTypename):
             cls.__fix_type_kind(bases)
 
         cls.__populate_interfaces(bases)
+        if '__field_table__' in namespace:
+            cls.__fields = None  # created on first use, see __get_fields()
+            return
+
         cls.__inherit_fields(bases)
         cls.__create_own_fields()
 
@@ -1454,7 +1855,32 @@ class ContainerTypeMeta(BaseMetaWithTypename):
 
     def __inherit_fields(cls, bases):
         for b in bases:
-            cls.__fields.update(b.__fields)
+            cls.__fields.update(b.__get_fields())
+
+    def __get_fields(cls):
+        fields = cls.__fields
+        if fields is None:
+            fields = cls.__create_table_fields()
+        return fields
+
+    def __create_table_fields(cls):
+        fields = OrderedDict()
+        for b in cls.__bases__:
+            fields.update(b.__get_fields())
+
+        schema = cls.__schema__
+        for name, ref, graphql_name, args in cls.__field_table__:
+            if args:
+                args = ArgDict([
+                    (arg_name, Arg(_type_from_ref(arg_ref), arg_graphql_name,
+                                   default))
+                    for arg_name, arg_ref, arg_graphql_name, default in args])
+            field = Field(_type_from_ref(ref), graphql_name, args)
+            field._set_container(schema, cls, name)
+            fields[name] = field
+
+        cls.__fields = fields
+        return fields
 
     def __create_own_fields(cls):
         # call the parent __dir__(), we don't want our overridden version
@@ -1486,26 +1912,87 @@ class ContainerTypeMeta(BaseMetaWithTypename):
                 pass
 
         try:
-            return cls.__fields[key]
+            return cls.__get_fields()[key]
         except KeyError as exc:
             raise KeyError('%s has no field %s' % (cls, key)) from exc
 
     def __getattr__(cls, key):
         try:
-            return cls.__fields[key]
+            return cls.__get_fields()[key]
         except KeyError as exc:
             raise AttributeError('%s has no field %s' % (cls, key)) from exc
 
     def __dir__(cls):
         original_dir = super(ContainerTypeMeta, cls).__dir__()
-        fields = list(cls.__fields.keys())
+        fields = list(cls.__get_fields().keys())
         return sorted(original_dir + fields)
 
     def __iter__(cls):
-        return iter(cls.__fields.values())
+        return iter(cls.__get_fields().values())
 
     def __contains__(cls, field_name):
-        return field_name in cls.__fields
+        return field_name in cls.__get_fields()
+
+    def __compact_class__(cls, selection_list=None):
+        '''Class storing the compact instances in slots.
+
+        The class is created on demand, with slots for the names given
+        by the selection list (including aliases and
+        :func:`sgqlc.operation.Selection.__as__` fields) or all fields,
+        if there is no selection list. It's a subclass of ``cls``
+        that is not added to the schema.
+        '''
+        if cls.__dict__.get('__compact_slots__') is not None:
+            return cls  # already compact, ie: type(obj)(json_data)
+
+        if selection_list is None:
+            impl = cls.__dict__.get('__compact_impl__')
+            if impl is None:
+                impl = cls.__compact_impl__ = cls.__create_compact_class(
+                    tuple(cls.__get_fields().keys()))
+            return impl
+
+        decoder = _SelectionListDecoder.get(selection_list)
+        impl = decoder.compact_classes.get(cls)
+        if impl is None:
+            names = OrderedDict()
+            cls.__get_selected_names(selection_list, names)
+            impl = decoder.compact_classes[cls] = \
+                cls.__create_compact_class(tuple(names))
+        return impl
+
+    @staticmethod
+    def __get_selected_names(sl, names):
+        for sel in sl:
+            names[sel.__alias__ or sel.__field__.name] = None
+        for csl in sl.__casts__.values():
+            ContainerTypeMeta.__get_selected_names(csl, names)
+
+    def __restore_compact__(cls, names, values):
+        '''Restores a compact instance pickled as ``(names, values)``.
+
+        The selection list is not kept, the instance is of the class
+        with all fields, unless some names (ie: aliases) are not fields.
+        '''
+        impl = cls.__compact_class__()
+        if not set(names).issubset(impl.__compact_slots__):
+            impl = cls.__create_compact_class(names)
+        obj = object.__new__(impl)
+        object.__setattr__(obj, '__selection_list__', None)
+        for name, value in values:
+            object.__setattr__(obj, name, value)
+        return obj
+
+    def __create_compact_class(cls, names):
+        return type(cls)(cls.__name__, (cls,), {
+            '__slots__': ('__selection_list__',) + names,
+            '__compact_slots__': names,
+            '__reduce__': _reduce_compact_container,
+            '__module__': cls.__module__,
+            '__qualname__': cls.__qualname__,
+            '__doc__': cls.__doc__,
+            '_%s__auto_register' % (cls.__name__,): False,
+        })
 
     def __to_graphql__(cls, indent=0, indent_string='  '):
         d = BaseMeta.__to_graphql__(cls, indent, indent_string)
@@ -1523,7 +2010,7 @@ class ContainerTypeMeta(BaseMetaWithTypename):
         if value is None:
             return None
         d = {}
-        for name, f in cls.__fields.items():
+        for name, f in cls.__get_fields().items():
             # elements may not exist since not queried and would
             # trigger exception for non-null fields
             if name in value:
@@ -1534,7 +2021,7 @@ class ContainerTypeMeta(BaseMetaWithTypename):
         if value is None:
             return None
         d = {}
-        for name, f in cls.__fields.items():
+        for name, f in cls.__get_fields().items():
             # elements may not exist since not queried and would
             # trigger exception for non-null fields
             if name in value:
@@ -1542,6 +2029,157 @@ class ContainerTypeMeta(BaseMetaWithTypename):
         return d
 
 
+class _SelectionListDecoder:
+    '''Decoding plan for a selection list, used by :class:`ContainerType`.
+
+    Interpreting results with a selection list (ie:
+    ``operation + json_data``) would otherwise walk the selections for
+    every object, creating :class:`Field` for aliases and resolving
+    casts each time. The plan is built once per selection list, which
+    keeps it in its ``__decoder__`` member until it's changed.
+
+    Each entry is a tuple ``(field, selection, casts)``, where
+    ``field`` is already renamed to the alias, if any, and ``casts``
+    is the selection's inline fragments (``__as__()``), only
+    resolved at decode time since they depend on ``__typename``.
+    Container fields selected without sub-fields use the cached
+    auto-selection as ``selection``, the same printed in the query.
+
+    >>> from sgqlc.operation import Operation
+    >>> schema = Schema()
+    >>> class Actor(Interface):
+    ...     __schema__ = schema
+    ...     login = str
+    ...
+    >>> class User(Type):
+    ...     __schema__ = schema
+    ...     __interfaces__ = (Actor,)
+    ...     login = str
+    ...     name = str
+    ...
+    >>> class Repository(Type):
+    ...     __schema__ = schema
+    ...     full_name = str
+    ...     owner = Actor
+    ...     size = int
+    ...
+    >>> class Query(Type):
+    ...     __schema__ = schema
+    ...     repository = Repository
+    ...
+
+    Aliases of fields with casts use the type given by ``__typename``,
+    results may also use the Python name of the fields:
+
+    >>> op = Operation(Query)
+    >>> repository = op.repository()
+    >>> repository.full_name()
+    fullName
+    >>> author = repository.owner(__alias__='author')
+    >>> author.login()
+    login
+    >>> author.__as__(User).name()
+    name
+    >>> (op + {'data': {'repository': {
+    ...     'full_name': 'joe/sgqlc',
+    ...     'author': {'__typename': 'User', 'login': 'joe', 'name': 'Joe'},
+    ... }}}).repository
+    ... # doctest: +NORMALIZE_WHITESPACE
+    Repository(full_name='joe/sgqlc',
+               author=User(login='joe', __typename__='User', name='Joe'))
+
+    Containers without sub-fields are decoded using the auto-selection:
+
+    >>> op = Operation(Query)
+    >>> op.repository()
+    repository {
+      fullName
+      owner {
+        login
+      }
+      size
+    }
+    >>> (op + {'data': {'repository': {'owner': {'login': 'joe'}}}})
+    Query(repository=Repository(owner=Actor(login='joe')))
+    >>> op + {'data': {'repository': {'size': 'x'}}}
+    ... # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+      ...
+    ValueError: Query selection 'repository': ... (invalid literal ...
+
+    Sub-fields selected after the results were interpreted replace the
+    auto-selection:
+
+    >>> op = Operation(Query)
+    >>> repository = op.repository()
+    >>> op + {'data': {'repository': {'size': 1}}}
+    Query(repository=Repository(size=1))
+    >>> repository.full_name(__alias__='name')
+    name: fullName
+    >>> op + {'data': {'repository': {'name': 'joe/sgqlc', 'size': 1}}}
+    Query(repository=Repository(name='joe/sgqlc'))
+    '''
+
+    __slots__ = ('entries', 'names', 'aliases', 'casts', 'cast_fields',
+                 'compact_classes')
+
+    def __init__(self, sl):
+        entries = []
+        aliases = set()
+        for sel in sl:
+            field = sel.__field__
+            if sel.__alias__ is not None:
+                field = self.create_alias_field(field, field.type,
+                                                sel.__alias__)
+                aliases.add(sel.__alias__)
+            if not sel:  # container without sub-fields
+                sel = sel.__auto_select__()
+            entries.append((field, sel, sel.__casts__))
+
+        self.entries = tuple(entries)
+        self.aliases = aliases
+        self.names = {e[0].name: e for e in entries}  # used by views
+        self.casts = sl.__casts__  # same mapping, also updated by __as__()
+        self.cast_fields = {}
+        self.compact_classes = {}  # ContainerType -> __compact_class__()
+
+    @classmethod
+    def get(cls, sl):
+        decoder = sl.__decoder__
+        if decoder is None:
+            decoder = sl.__decoder__ = cls(sl)
+        return decoder
+
+    @staticmethod
+    def create_alias_field(field, ftype, alias):
+        alias_field = Field(ftype, alias, field.args)
+        alias_field._set_container(field.schema, field.container, alias)
+        return alias_field
+
+    def get_field_for_casts(self, entry, json_data):
+        field, sel, casts = entry
+        ftype = field.type
+        value = json_data.get(field.graphql_name)
+        if not isinstance(value, dict):
+            return field, ftype
+
+        sl = casts.get(value.get('__typename'))
+        if sl is None:
+            return field, ftype
+
+        ftype = sl.__type__
+        alias = field.name
+        if alias not in self.aliases:
+            return field, ftype
+
+        key = (alias, ftype)
+        alias_field = self.cast_fields.get(key)
+        if alias_field is None:
+            alias_field = self.cast_fields[key] = self.create_alias_field(
+                field, ftype, alias)
+        return alias_field, ftype
+
+
 class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
     '''Container of :class:`Field`.
 
@@ -1573,8 +2211,12 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
     Members started with underscore (``_``) are not processed.
     '''
 
+    __slots__ = ()
+    __compact__ = False
+    __lazy__ = False
+
     __json_dump_args__ = {
-        # given to json.dumps() in __bytes__()
+        # given to codec.dumpb() in __bytes__()
         'sort_keys': True,
         'separators': (',', ':'),
     }
@@ -1584,7 +2226,10 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
             '%r (%s) is not a JSON Object' % (
                 json_data, type(json_data).__name__)
         object.__setattr__(self, '__selection_list__', selection_list)
-        self.__populate_fields(json_data)
+        if self.__compact__:
+            self.__populate_compact_fields(json_data)
+        else:
+            self.__populate_fields(json_data)
 
     def __populate_fields(self, json_data):
         cache = OrderedDict()
@@ -1594,17 +2239,37 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
             object.__setattr__(self, '__json_data__', {})
             return
 
+        pending = None
+        if self.__lazy__:
+            # name => (type, selection, json value) not yet converted
+            pending = {}
+            object.__setattr__(self, '__lazy_fields__', pending)
+
         if self.__selection_list__ is not None:
             self.__populate_fields_from_selection_list(
-                self.__selection_list__, json_data)
+                self.__selection_list__, json_data, cache, pending)
         else:
             for field in self.__class__:
-                self.__populate_field_data(field, field.type, None, json_data)
+                self.__populate_field_data(
+                    field, field.type, None, json_data, pending)
 
         # backing store, changed by setattr()
         object.__setattr__(self, '__json_data__', json_data)
 
-    def __populate_field_data(self, field, ftype, sel, json_data):
+    def __populate_compact_fields(self, json_data):
+        # no cache or backing store, only the slots
+        if json_data is None:
+            return
+
+        if self.__selection_list__ is not None:
+            self.__populate_fields_from_selection_list(
+                self.__selection_list__, json_data, None, None)
+        else:
+            for field in self.__class__:
+                self.__populate_field_data(
+                    field, field.type, None, json_data, None)
+
+    def __populate_field_data(self, field, ftype, sel, json_data, pending):
         name = field.name
         graphql_name = field.graphql_name
         if graphql_name not in json_data and name not in json_data:
@@ -1614,48 +2279,56 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
         try:
             value = json_data[graphql_name] if graphql_name in json_data \
                 else json_data[name]
+            if pending is not None:
+                pending[name] = (ftype, sel, value)
+                self.__fields_cache__[name] = field
+                return
             value = ftype(value, sel)
-            setattr(self, name, value)
-            self.__fields_cache__[name] = field
+            object.__setattr__(self, name, value)
+            if not self.__compact__:
+                self.__fields_cache__[name] = field
         except Exception as exc:
             raise ValueError('%s selection %r: %r (%s)' % (
                 self.__class__, name, value, exc)) from exc
 
-    def __populate_fields_from_selection_list(self, sl, json_data):
-        for sel in sl:
-            field = sel.__field__
-            ftype = self.__get_type_for_selection(sel, json_data)
-            if sel.__alias__ is not None:
-                alias = sel.__alias__
-                field = Field(ftype, alias, field.args)
-                field._set_container(self.__schema__, self, alias)
-            self.__populate_field_data(field, ftype, sel, json_data)
-
-        casts = sl.__casts__
-        if casts:
-            tname = json_data.get('__typename')
-            csl = casts.get(tname)
-            if csl:
-                self.__populate_fields_from_selection_list(csl, json_data)
-
-    @staticmethod
-    def __get_type_for_selection(sel, json_data):
-        field = sel.__field__
-        ftype = field.type
-        casts = sel.__casts__
-        if not casts:
-            return ftype
-
-        graphql_name = field.graphql_name
-        tname = json_data.get(graphql_name, {}).get('__typename')
-        if not tname:
-            return ftype
+    def __populate_fields_from_selection_list(self, sl, json_data, cache,
+                                              pending):
+        decoder = _SelectionListDecoder.get(sl)
+        for entry in decoder.entries:
+            field, sel, casts = entry
+            ftype = field.type
+            if casts:
+                field, ftype = decoder.get_field_for_casts(
+                    entry, json_data)
+
+            name = field.name
+            graphql_name = field.graphql_name
+            if graphql_name in json_data:
+                value = json_data[graphql_name]
+            elif name in json_data:
+                value = json_data[name]
+            else:
+                continue
 
-        sl = casts.get(tname)
-        if sl is None:
-            return ftype
+            if pending is not None:
+                pending[name] = (ftype, sel, value)
+                cache[name] = field
+                continue
 
-        return sl.__type__
+            try:
+                value = ftype(value, sel)
+            except Exception as exc:
+                raise ValueError('%s selection %r: %r (%s)' % (
+                    self.__class__, name, value, exc)) from exc
+            object.__setattr__(self, name, value)
+            if cache is not None:
+                cache[name] = field
+
+        casts = decoder.casts
+        csl = casts and casts.get(json_data.get('__typename'))
+        if csl:
+            self.__populate_fields_from_selection_list(
+                csl, json_data, cache, pending)
 
     def __setattr__(self, name, value):
         '''Sets the attribute value, if a :class:`Field` updates backing store.
@@ -1690,8 +2363,11 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
 
         '''
         object.__setattr__(self, name, value)
-        if not hasattr(self, '__json_data__'):  # still populating
-            return
+        if self.__compact__ or not hasattr(self, '__json_data__'):
+            return  # compact or still populating
+        pending = self.__lazy__ and self.__dict__.get('__lazy_fields__')
+        if pending:
+            pending.pop(name, None)  # no longer pending
         # apply changes to json backing store, if name is known
         field = self.__fields_cache__.get(name)
         if field is None:
@@ -1769,6 +2445,9 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
         a_string 'hello world'
 
         '''
+        if self.__compact__:
+            return (name for name in self.__compact_slots__
+                    if hasattr(self, name))
         return iter(self.__fields_cache__.keys())
 
     def __contains__(self, name):
@@ -1796,6 +2475,8 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
         >>> 'a_string' in obj  # now in instance
         True
         '''
+        if self.__lazy__ and name in self.__dict__.get('__lazy_fields__', ()):
+            return True  # do not convert just to check
         return hasattr(self, name)
 
     def __len__(self):
@@ -1835,9 +2516,8 @@ class ContainerType(BaseTypeWithTypename, metaclass=ContainerTypeMeta):
                                                             self)
 
     def __bytes__(self):
-        return bytes(json.dumps(
-            self.__to_json_value__(), **self.__json_dump_args__),
-            'utf-8')
+        return get_codec().dumpb(
+            self.__to_json_value__(), **self.__json_dump_args__)
 
 
 class BaseItem:
@@ -2001,7 +2681,8 @@ class Arg(BaseItem):
         '''
         super(Arg, self).__init__(typ, graphql_name)
         self.default = default
-        if default is not None and not isinstance(default, Variable):
+        if default is not None and not isinstance(default, Variable) and \
+                not isinstance(self._type, Lazy):
             typ(default)
 
     def __to_graphql__(self, indent=0, indent_string='  '):
@@ -2269,6 +2950,7 @@ class Type(ContainerType):
     also making their fields automatically available in the final
     class.
     '''
+    __slots__ = ()
     __kind__ = 'type'
 
 
@@ -2281,6 +2963,7 @@ class Interface(ContainerType):
     also making their fields automatically available in the final
     class.
     '''
+    __slots__ = ()
     __kind__ = 'interface'
 
 
@@ -2310,6 +2993,7 @@ class Input(ContainerType):
     {aInt: 1, aFloat: 2.2}
 
     '''
+    __slots__ = ()
     __kind__ = 'input'
 
     @classmethod
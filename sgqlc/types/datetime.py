@@ -14,7 +14,10 @@ Maps:
 You may either explicitly use this module classes or :mod:`datetime`,
 as they will be automatically recognized by the framework.
 
-Conversions assume ISO 8601 encoding.
+Conversions assume ISO 8601 encoding. The extended form
+(``2018-01-02T12:34:56Z``) is parsed with ``fromisoformat()``, the
+compact form with a regular expression. Parsed values and timezones
+are cached, so repeated timestamps are shared instead of parsed again.
 
 Examples
 --------
@@ -92,6 +95,142 @@ import re
 
 from . import Scalar, map_python_to_graphql
 
+_CACHE_SIZE = 1024
+
+_re_timezone = re.compile(r'^[+-]\d{2}:?\d{2}$')
+_timezones = {'': None, 'Z': datetime.timezone.utc}
+
+
+def _get_timezone(s):
+    '''Get the timezone given its ISO 8601 designator, interned.
+
+    >>> _get_timezone('Z')
+    datetime.timezone.utc
+    >>> _get_timezone('-05:30') is _get_timezone('-05:30')
+    True
+    >>> _get_timezone('+0530')
+    datetime.timezone(datetime.timedelta(seconds=19800))
+    >>> _get_timezone('+5:30')
+    Traceback (most recent call last):
+      ...
+    ValueError: not in ISO 8601 timezone format +/-HH:MM: +5:30
+    '''
+    try:
+        return _timezones[s]
+    except KeyError:
+        pass
+
+    if not _re_timezone.match(s):
+        raise ValueError('not in ISO 8601 timezone format +/-HH:MM: %s' % s)
+    hours = int(s[:3])
+    minutes = int(s[-2:])
+    if hours < 0:
+        minutes = -minutes
+    tzinfo = datetime.timezone(
+        datetime.timedelta(hours=hours, minutes=minutes))
+    if len(_timezones) < _CACHE_SIZE:
+        _timezones[s] = tzinfo
+    return tzinfo
+
+
+def _timezone_designator(s, lengths):
+    '''Get the timezone designator of ``s`` in ISO 8601 extended form.
+
+    Returns ``None`` if the length without the designator is not one
+    of ``lengths``, the string is then not in the extended form.
+
+    >>> _timezone_designator('12:34:56Z', (8, 15))
+    'Z'
+    >>> _timezone_designator('12:34:56-05:30', (8, 15))
+    '-05:30'
+    >>> _timezone_designator('12:34:56.123456', (8, 15))
+    ''
+    >>> _timezone_designator('123456-0530', (8, 15))
+    '''
+    n = len(s)
+    if n in lengths:
+        return ''
+    elif n - 1 in lengths and s[-1] == 'Z':
+        return 'Z'
+    elif n - 6 in lengths and s[-3] == ':':
+        return s[-6:]
+    return None
+
+
+def _utc_designator(s, tz):
+    # fromisoformat() only accepts 'Z' since Python 3.11
+    return s[:-1] + '+00:00' if tz == 'Z' else s
+
+
+def _convert_list_cached(cls, values, python_type):
+    '''Convert a list with ``cls._parse()``, parsing each distinct value once.
+
+    >>> _convert_list_cached(Date, ['2018-01-02', None, '2018-01-02'],
+    ...                      datetime.date)
+    [datetime.date(2018, 1, 2), None, datetime.date(2018, 1, 2)]
+
+    The cache is cleared once it reaches its maximum size:
+
+    >>> values = ['%04d-01-01' % (y,) for y in range(1, _CACHE_SIZE + 1)]
+    >>> len(_convert_list_cached(Date, values, datetime.date))
+    1024
+    >>> len(Date._cache)
+    0
+
+    Subclasses overriding ``__new__()`` are called for each element:
+
+    >>> class Year(Date):
+    ...     def __new__(cls, json_data, selection_list=None):
+    ...         return Date(json_data + '-01-01')
+    ...
+    >>> _convert_list_cached(Year, ['2018'], datetime.date)
+    [datetime.date(2018, 1, 1)]
+    '''
+    if cls.__new__ is not Scalar.__new__:
+        return [cls(v) for v in values]
+    cache = cls._cache
+    get = cache.get
+    parse = cls._parse
+    result = []
+    append = result.append
+    for v in values:
+        if v is None or isinstance(v, python_type):
+            append(v)
+            continue
+        value = get(v)
+        if value is None:
+            value = cache[v] = parse(v)
+        append(value)
+
+    if len(cache) >= _CACHE_SIZE:
+        cache.clear()
+    return result
+
+
+def _convert_cached(cls, s):
+    '''Convert ``s`` with ``cls._parse()``, caching the result.
+
+    The cache is cleared once it reaches its maximum size:
+
+    >>> for year in range(2000, 2004):
+    ...     for month in range(1, 13):
+    ...         for day in range(1, 29):
+    ...             _ = Date('%d-%02d-%02d' % (year, month, day))
+    ...
+    >>> 0 < len(Date._cache) < _CACHE_SIZE
+    True
+    '''
+    cache = cls._cache
+    value = cache.get(s)
+    if value is not None:
+        return value
+
+    value = cls._parse(s)
+    if len(cache) >= _CACHE_SIZE:
+        cache.clear()
+    cache[s] = value
+    return value
+
 
 class Time(Scalar):
     '''Time encoded as string using ISO8601 (HH:MM:SS[.mmm][+/-HH:MM])
@@ -104,7 +243,7 @@ class Time(Scalar):
     >>> Time('12:34:56Z') # Z = GMT/UTC
     datetime.time(12, 34, 56, tzinfo=datetime.timezone.utc)
     >>> Time('12:34:56-05:30') # doctest: +ELLIPSIS
-    datetime.time(12, 34, 56, tzinfo=...(days=-1, seconds=70200)))
+    datetime.time(12, 34, 56, tzinfo=...(days=-1, seconds=66600)))
     >>> Time('12:34:56+05:30') # doctest: +ELLIPSIS
     datetime.time(12, 34, 56, tzinfo=...(seconds=19800)))
     >>> Time('123456') # compact form
@@ -112,15 +251,28 @@ class Time(Scalar):
     >>> Time('123456Z') # compact form, GMT/UTC
     datetime.time(12, 34, 56, tzinfo=datetime.timezone.utc)
     >>> Time('123456-0530') # doctest: +ELLIPSIS
-    datetime.time(12, 34, 56, tzinfo=...(days=-1, seconds=70200)))
+    datetime.time(12, 34, 56, tzinfo=...(days=-1, seconds=66600)))
     >>> Time('123456+0530') # doctest: +ELLIPSIS
     datetime.time(12, 34, 56, tzinfo=...(seconds=19800)))
+    >>> Time('12:34:56.123456') # microseconds
+    datetime.time(12, 34, 56, 123456)
+    >>> Time('12:34:56.123') # milliseconds
+    datetime.time(12, 34, 56, 123000)
+    >>> Time('12:34:60')
+    Traceback (most recent call last):
+      ...
+    ValueError: second must be in 0..59
 
     Pre-converted values are allowed:
 
     >>> Time(datetime.time(12, 34, 56))
     datetime.time(12, 34, 56)
 
+    Lists parse each distinct value once:
+
+    >>> Time.__convert_list__(['12:34:56', None, '12:34:56'])
+    [datetime.time(12, 34, 56), None, datetime.time(12, 34, 56)]
+
     It can also serialize to JSON:
 
     >>> Time.__to_json_value__(datetime.time(12, 34, 56))
@@ -138,10 +290,34 @@ class Time(Scalar):
         r'^(?P<H>\d{2}):?(?P<M>\d{2}):?(?P<S>\d{2})(?P<MS>|[.]\d+)'
         r'(?P<TZ>|Z|(?P<TZH>[+-]\d{2}):?(?P<TZM>\d{2}))$')
 
+    _fromisoformat = getattr(datetime.time, 'fromisoformat', None)
+    _cache = {}
+
     @classmethod
     def converter(cls, s):
         if isinstance(s, datetime.time):
             return s
+        return _convert_cached(cls, s)
+
+    @classmethod
+    def __convert_list__(cls, values):
+        return _convert_list_cached(cls, values, datetime.time)
+
+    @classmethod
+    def _parse(cls, s):
+        tz = _timezone_designator(s, (8, 15))
+        if tz is not None and cls._fromisoformat is not None and \
+                s[2] == ':' and s[5] == ':' and \
+                (len(s) - len(tz) == 8 or s[8] == '.'):
+            try:
+                t = cls._fromisoformat(_utc_designator(s, tz))
+                if len(tz) > 1:  # share the interned timezone
+                    t = datetime.time(t.hour, t.minute, t.second,
+                                      t.microsecond, _get_timezone(tz))
+                return t
+            except ValueError:
+                pass
+
         m = cls._re_parse.match(s)
         if not m:
             raise ValueError('not in ISO 8601 format HH:MM:SS: %s' % s)
@@ -149,14 +325,8 @@ class Time(Scalar):
         hour = int(m['H'])
         minute = int(m['M'])
         second = int(m['S'])
-        microsecond = int(m['MS'][1:] or 0)
-        tzinfo = None
-        if m['TZ'] == 'Z':
-            tzinfo = datetime.timezone.utc
-        elif m['TZ']:
-            d = datetime.timedelta(hours=int(m['TZH']), minutes=int(m['TZM']))
-            tzinfo = datetime.timezone(d)
-
+        microsecond = int(m['MS'][1:7].ljust(6, '0'))
+        tzinfo = _get_timezone(m['TZ'])
         return datetime.time(hour, minute, second, microsecond, tzinfo)
 
     @classmethod
@@ -178,12 +348,21 @@ class Date(Scalar):
     datetime.date(2018, 1, 2)
     >>> Date('20180102') # compact form
     datetime.date(2018, 1, 2)
+    >>> Date('2018-13-02')
+    Traceback (most recent call last):
+      ...
+    ValueError: month must be in 1..12
 
     Pre-converted values are allowed:
 
     >>> Date(datetime.date(2018, 1, 2))
     datetime.date(2018, 1, 2)
 
+    Lists parse each distinct value once:
+
+    >>> Date.__convert_list__(['2018-01-02', datetime.date(2018, 1, 3)])
+    [datetime.date(2018, 1, 2), datetime.date(2018, 1, 3)]
+
     It can also serialize to JSON:
 
     >>> Date.__to_json_value__(datetime.date(2018, 1, 2))
@@ -196,10 +375,28 @@ class Date(Scalar):
 
     _re_parse = re.compile(r'^(?P<Y>\d{4})-?(?P<m>\d{2})-?(?P<d>\d{2})$')
 
+    _fromisoformat = getattr(datetime.date, 'fromisoformat', None)
+    _cache = {}
+
     @classmethod
     def converter(cls, s):
         if isinstance(s, datetime.date):
             return s
+        return _convert_cached(cls, s)
+
+    @classmethod
+    def __convert_list__(cls, values):
+        return _convert_list_cached(cls, values, datetime.date)
+
+    @classmethod
+    def _parse(cls, s):
+        if len(s) == 10 and s[4] == '-' and s[7] == '-' and \
+                cls._fromisoformat is not None:
+            try:
+                return cls._fromisoformat(s)
+            except ValueError:
+                pass
+
         m = cls._re_parse.match(s)
         if not m:
             raise ValueError('not in ISO 8601 format YYYY-MM-DD: %s' % s)
@@ -230,7 +427,7 @@ class DateTime(Scalar):
     >>> DateTime('2018-01-02T12:34:56Z') # Z = GMT/UTC
     datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=datetime.timezone.utc)
     >>> DateTime('2018-01-02T12:34:56-05:30') # doctest: +ELLIPSIS
-    datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=..., seconds=70200)))
+    datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=..., seconds=66600)))
     >>> DateTime('2018-01-02T12:34:56+05:30') # doctest: +ELLIPSIS
     datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=...(seconds=19800)))
     >>> DateTime('20180102T123456') # compact form
@@ -238,15 +435,33 @@ class DateTime(Scalar):
     >>> DateTime('20180102T123456Z') # compact form, GMT/UTC
     datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=datetime.timezone.utc)
     >>> DateTime('20180102T123456-0530') # doctest: +ELLIPSIS
-    datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=..., seconds=70200)))
+    datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=..., seconds=66600)))
     >>> DateTime('20180102T123456+0530') # doctest: +ELLIPSIS
     datetime.datetime(2018, 1, 2, 12, 34, 56, tzinfo=...(seconds=19800)))
+    >>> DateTime('2018-01-02T12:34:56.123456Z') # doctest: +ELLIPSIS
+    datetime.datetime(2018, 1, 2, 12, 34, 56, 123456, tzinfo=...utc)
+    >>> DateTime('2018-01-02T12:34:56.5') # fraction of second
+    datetime.datetime(2018, 1, 2, 12, 34, 56, 500000)
+    >>> DateTime('2018-01-02T24:00:00Z')
+    Traceback (most recent call last):
+      ...
+    ValueError: hour must be in 0..23
+
+    Repeated values are parsed once and shared:
+
+    >>> DateTime('2018-01-02T12:34:56Z') is DateTime('2018-01-02T12:34:56Z')
+    True
 
     Pre-converted values are allowed:
 
     >>> DateTime(datetime.datetime(2018, 1, 2, 12, 34, 56))
     datetime.datetime(2018, 1, 2, 12, 34, 56)
 
+    Lists parse each distinct value once:
+
+    >>> DateTime.__convert_list__(['2018-01-02T12:34:56', None])
+    [datetime.datetime(2018, 1, 2, 12, 34, 56), None]
+
     It can also serialize to JSON:
 
     >>> dt = datetime.datetime(2018, 1, 2, 12, 34, 56)
@@ -266,10 +481,34 @@ class DateTime(Scalar):
         r'(?P<H>\d{2}):?(?P<M>\d{2}):?(?P<S>\d{2})(?P<MS>|[.]\d+)'
         r'(?P<TZ>|Z|(?P<TZH>[+-]\d{2}):?(?P<TZM>\d{2}))$')
 
+    _fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+    _cache = {}
+
     @classmethod
     def converter(cls, s):
         if isinstance(s, datetime.datetime):
             return s
+        return _convert_cached(cls, s)
+
+    @classmethod
+    def __convert_list__(cls, values):
+        return _convert_list_cached(cls, values, datetime.datetime)
+
+    @classmethod
+    def _parse(cls, s):
+        tz = _timezone_designator(s, (19, 26))
+        if tz is not None and cls._fromisoformat is not None and \
+                s[4] == '-' and s[7] == '-' and s[10] == 'T' and \
+                s[13] == ':' and s[16] == ':' and \
+                (len(s) - len(tz) == 19 or s[19] == '.'):
+            try:
+                dt = cls._fromisoformat(_utc_designator(s, tz))
+                if len(tz) > 1:  # share the interned timezone
+                    dt = dt.replace(tzinfo=_get_timezone(tz))
+                return dt
+            except ValueError:
+                pass
+
         m = cls._re_parse.match(s)
         if not m:
             raise ValueError('not in ISO 8601 format YYYY-MM-DDTHH:MM:SS: %s'
@@ -281,14 +520,8 @@ class DateTime(Scalar):
         hour = int(m['H'])
         minute = int(m['M'])
         second = int(m['S'])
-        microsecond = int(m['MS'][1:] or 0)
-        tzinfo = None
-        if m['TZ'] == 'Z':
-            tzinfo = datetime.timezone.utc
-        elif m['TZ']:
-            d = datetime.timedelta(hours=int(m['TZH']), minutes=int(m['TZM']))
-            tzinfo = datetime.timezone(d)
-
+        microsecond = int(m['MS'][1:7].ljust(6, '0'))
+        tzinfo = _get_timezone(m['TZ'])
         return datetime.datetime(year, month, day,
                                  hour, minute, second, microsecond, tzinfo)
 
@@ -305,9 +305,16 @@ MyEdge(node=NodeBasedType(id='4444', a_int=4), cursor='cursor-4')
 
 __docformat__ = 'reStructuredText en'
 
-__all__ = ('Node', 'PageInfo', 'Connection', 'connection_args')
+__all__ = (
+    'Node', 'PageInfo', 'Connection', 'connection_args', 'iter_connection',
+    'paginate_connections', 'PaginationError',
+)
 
-from . import Type, Interface, non_null, ArgDict, String, Int
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from . import Type, Interface, ContainerType, non_null, Arg, ArgDict, \
+    String, Int, Variable
+from ..operation import Operation
 
 
 class Node(Interface):
@@ -347,39 +354,107 @@ class Connection(Type):
       ``obj.connection.page_info.has_next_page``,
       ``obj.connection.page_info.end_cursor`` and
       the JSON backing store, if any.
+
+      If all the elements are not needed at once, use
+      :func:`iter_connection` to fetch the pages and process them as
+      they arrive. To fetch all the pages of every connection selected
+      by an operation, use :func:`paginate_connections`.
     '''
+    __slots__ = ()  # allow compact subclasses
     __auto_register = False  # do not expose this in Schema, just subclasses
     page_info = non_null(PageInfo)
 
     def __iadd__(self, other):
-        # NOTE: assign to list, not '+=', so ContainerType.__setattr__()
-        # is called to apply to backing store
-        has_self_nodes = hasattr(self, 'nodes') and self.nodes is not None
-        has_other_nodes = hasattr(other, 'nodes') and other.nodes is not None
-        if has_self_nodes and has_other_nodes:
-            self.nodes = self.nodes + other.nodes
-        elif has_other_nodes:
-            self.nodes = other.nodes
-
-        has_self_edges = hasattr(self, 'edges') and self.edges is not None
-        has_other_edges = hasattr(other, 'edges') and other.edges is not None
-        if has_self_edges and has_other_edges:
-            self.edges = self.edges + other.edges
-        elif has_other_edges:
-            self.edges = other.edges
-
-        has_self_page_info = hasattr(self, 'page_info') and \
-            self.page_info is not None
-        has_other_page_info = hasattr(other, 'page_info') and \
-            other.page_info is not None
-        if has_self_page_info and has_other_page_info:
-            self.page_info.end_cursor = other.page_info.end_cursor
-            self.page_info.has_next_page = other.page_info.has_next_page
-        elif has_other_page_info:
-            self.page_info = other.page_info
+        return self.extend_many((other,))
+
+    def extend_many(self, pages):
+        '''Append the ``nodes`` and ``edges`` of all connections in
+        ``pages``, in order, using the ``page_info`` of the last one.
+
+        This is the same as ``+=`` with each page, but the lists and
+        the JSON backing store are extended in place, thus the cost is
+        proportional to the size of the pages, not of this connection.
+
+        >>> from sgqlc.types import list_of
+        >>> class ExtendConn(Connection):
+        ...     nodes = list_of(int)
+        ...
+        >>> def page(nodes, end_cursor):
+        ...     return ExtendConn({'nodes': nodes, 'pageInfo': {
+        ...         'endCursor': end_cursor,
+        ...         'hasNextPage': end_cursor != 'c5',
+        ...         'hasPreviousPage': False}})
+        ...
+        >>> conn = page([1, 2], 'c2')
+        >>> nodes = conn.nodes
+        >>> pages = [page([3], 'c3'), page([4, 5], 'c5')]
+        >>> conn.extend_many(pages)  # doctest: +ELLIPSIS
+        ExtendConn(page_info=PageInfo(...), nodes=[1, 2, 3, 4, 5])
+        >>> nodes is conn.nodes
+        True
+        >>> conn.page_info.end_cursor, conn.page_info.has_next_page
+        ('c5', False)
+        >>> conn.__json_data__['nodes']
+        [1, 2, 3, 4, 5]
+        >>> conn.extend_many([])  # doctest: +ELLIPSIS
+        ExtendConn(page_info=PageInfo(...), nodes=[1, 2, 3, 4, 5])
+
+        Compact connections have no backing store to update:
+
+        >>> class CompactExtendConn(Connection):
+        ...     __compact__ = True
+        ...     nodes = list_of(int)
+        ...
+        >>> conn = CompactExtendConn({'nodes': [1]})
+        >>> conn += CompactExtendConn({'nodes': [2]})
+        >>> conn
+        CompactExtendConn(nodes=[1, 2])
+        '''
+        pages = tuple(pages)
+        # NOTE: hasattr() as fields may not have been queried
+        for name in ('nodes', 'edges'):
+            lists = [getattr(p, name) for p in pages
+                     if hasattr(p, name) and getattr(p, name) is not None]
+            if lists:
+                self.__extend_list(name, lists)
+
+        page_infos = [p.page_info for p in pages
+                      if hasattr(p, 'page_info') and p.page_info is not None]
+        if not page_infos:
+            return self
+
+        other_page_info = page_infos[-1]
+        if hasattr(self, 'page_info') and self.page_info is not None:
+            self.page_info.end_cursor = other_page_info.end_cursor
+            self.page_info.has_next_page = other_page_info.has_next_page
+        else:
+            self.page_info = other_page_info
 
         return self
 
+    def __extend_list(self, name, lists):
+        current = getattr(self, name, None)
+        if current is None:
+            # assign, so ContainerType.__setattr__() creates the backing store
+            setattr(self, name, list(lists[0]))
+            current = getattr(self, name)
+            lists = lists[1:]
+
+        for lst in lists:
+            current.extend(lst)
+
+        json_data = getattr(self, '__json_data__', None)
+        if json_data is None:
+            return  # compact instances
+
+        field = self.__fields_cache__.get(name) or self.__class__[name]
+        json_list = json_data.get(field.graphql_name)
+        if isinstance(json_list, list):
+            for lst in lists:
+                json_list.extend(field.type.__to_json_value__(lst))
+        else:  # pragma: no cover (not in the backing store, recreate)
+            setattr(self, name, current)
+
 
 def connection_args(*lst, **mapping):
     '''Returns the default parameters for connection.
@@ -400,3 +475,478 @@ def connection_args(*lst, **mapping):
     pd.setdefault('first', Int)
     pd.setdefault('last', Int)
     return pd
+
+
+class PaginationError(Exception):
+    '''The GraphQL endpoint returned errors for a connection page.
+
+    The ``errors`` and ``data`` members are the ones of the result, the
+    ``variables`` are the ones used to query the page.
+    '''
+
+    def __init__(self, errors, data, variables):
+        super(PaginationError, self).__init__(errors)
+        self.errors = errors
+        self.data = data
+        self.variables = variables
+
+
+def iter_connection(endpoint, operation, path, variables=None,
+                    cursor_variable='after', prefetch=False, items='nodes'):
+    '''Iterate over all the elements of a connection, page by page.
+
+    The ``operation`` is executed with ``endpoint``, the
+    :class:`Connection` at ``path`` is interpreted and its elements are
+    yielded. While ``page_info.has_next_page``, the operation is
+    executed again with the ``page_info.end_cursor`` as the
+    ``cursor_variable``, which should be given to the connection as
+    ``after``.
+
+    Only the current page is kept, unlike merging connections with
+    ``+=``. If ``prefetch=True``, the next page is fetched in a
+    background thread while the elements of the current one are
+    consumed.
+
+    :param endpoint: the :class:`sgqlc.endpoint.base.BaseEndpoint`, or
+      any callable with the same signature.
+    :param operation: the :class:`sgqlc.operation.Operation` selecting
+      the connection, its ``page_info`` with ``has_next_page`` and
+      ``end_cursor``, as well as the ``items``.
+    :param path: names (or aliases) to reach the connection from the
+      operation results, such as ``('repository', 'issues')`` or
+      the string ``'repository.issues'``.
+    :param variables: other variables of the ``operation``.
+    :param cursor_variable: GraphQL name of the operation variable
+      used as the connection's ``after``.
+    :param prefetch: whether to fetch the next page while the current
+      one is consumed.
+    :param items: the connection field to iterate, ``nodes`` or ``edges``.
+
+    :raise PaginationError: if the endpoint returns errors for a page.
+
+    Given the following types and operation:
+
+    >>> from sgqlc.types import Schema, Type, Field, Variable, list_of
+    >>> from sgqlc.operation import Operation
+    >>> schema = Schema()
+    >>> class Item(Type):
+    ...     __schema__ = schema
+    ...     name = str
+    ...
+    >>> class ItemConnection(Connection):
+    ...     __schema__ = schema
+    ...     nodes = list_of(Item)
+    ...
+    >>> class PagedQuery(Type):
+    ...     __schema__ = schema
+    ...     items = Field(ItemConnection, args=connection_args())
+    ...
+    >>> op = Operation(PagedQuery, after=str)
+    >>> items = op.items(first=2, after=Variable('after'))
+    >>> items.nodes.name()
+    name
+    >>> items.page_info.__fields__('has_next_page', 'end_cursor')
+
+    Every page is fetched as its elements are consumed:
+
+    >>> def page(names, end_cursor):
+    ...     return {'data': {'items': {
+    ...         'nodes': [{'name': name} for name in names],
+    ...         'pageInfo': {'hasNextPage': end_cursor is not None,
+    ...                      'endCursor': end_cursor}}}}
+    ...
+    >>> pages = {None: page(['a', 'b'], 'c2'), 'c2': page(['c'], None)}
+    >>> def endpoint(query, variables):
+    ...     print('fetch', variables)
+    ...     return pages[variables['after']]
+    ...
+    >>> for item in iter_connection(endpoint, op, 'items'):
+    ...     print(item.name)
+    fetch {'after': None}
+    a
+    b
+    fetch {'after': 'c2'}
+    c
+
+    With ``prefetch=True`` the next page is requested before the
+    current elements are yielded:
+
+    >>> def endpoint(query, variables):
+    ...     return pages[variables['after']]
+    ...
+    >>> [item.name for item in iter_connection(
+    ...     endpoint, op, ['items'], prefetch=True)]
+    ['a', 'b', 'c']
+
+    Errors are raised. A ``null`` object in the path, or a connection
+    without ``page_info``, ends the iteration:
+
+    >>> def endpoint(query, variables):
+    ...     return {'errors': [{'message': 'failed'}]}
+    ...
+    >>> list(iter_connection(endpoint, op, 'items', {'after': 'c2'}))
+    Traceback (most recent call last):
+      ...
+    sgqlc.types.relay.PaginationError: [{'message': 'failed'}]
+    >>> def endpoint(query, variables):
+    ...     return {'data': {'items': None}}
+    ...
+    >>> list(iter_connection(endpoint, op, 'items'))
+    []
+    >>> list(iter_connection(endpoint, op, 'items.nodes.name'))
+    []
+    '''
+    if isinstance(path, str):
+        path = path.split('.')
+    variables = dict(variables or {})
+    variables.setdefault(cursor_variable, None)
+
+    def fetch(cursor):
+        page_variables = dict(variables)
+        page_variables[cursor_variable] = cursor
+        return page_variables, endpoint(operation, page_variables)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = fetch(variables[cursor_variable])
+        while page is not None:
+            conn = _get_connection_page(operation, path, *page)
+            if conn is None:
+                return
+
+            page = None
+            page_info = conn.page_info
+            if page_info.has_next_page:
+                if executor is not None:
+                    page = executor.submit(fetch, page_info.end_cursor)
+                else:
+                    page = page_info.end_cursor
+
+            yield from getattr(conn, items, None) or ()
+
+            if executor is not None and page is not None:
+                page = page.result()
+            elif page is not None:
+                page = fetch(page)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _get_connection_page(operation, path, variables, data):
+    errors = data.get('errors')
+    if errors:
+        raise PaginationError(errors, data.get('data'), variables)
+
+    obj = operation + data
+    for name in path:
+        obj = getattr(obj, name, None)
+        if obj is None:
+            return None
+    # null objects are interpreted as empty instances
+    return obj if 'page_info' in obj else None
+
+
+def paginate_connections(endpoint, operation, variables=None,
+                         max_workers=None):
+    '''Execute the operation and fetch all pages of its connections.
+
+    Every :class:`Connection` selected by the ``operation`` with an
+    ``after`` argument (see :func:`connection_args`) and its
+    ``page_info`` is paginated: while ``page_info.has_next_page``, a
+    follow-up operation selecting only that connection with
+    ``after: page_info.end_cursor`` is executed and its page is merged
+    into the original results with ``+=``.
+
+    The follow-up operations of different connections are independent
+    and executed concurrently, at most ``max_workers`` at once, while
+    the pages of the same connection are fetched in order.
+
+    Only connections reached through single objects are paginated,
+    connections inside lists, such as the nodes of another connection,
+    are not.
+
+    :param endpoint: the :class:`sgqlc.endpoint.base.BaseEndpoint`, or
+      any callable with the same signature, it must be thread-safe if
+      ``max_workers`` is not 1.
+    :param operation: the :class:`sgqlc.operation.Operation` to execute.
+    :param variables: variables of the ``operation``.
+    :param max_workers: the maximum number of concurrent requests, see
+      :class:`concurrent.futures.ThreadPoolExecutor`.
+
+    :return: the results of the ``operation`` (ie: ``operation + data``)
+      with the pages of all connections merged. The JSON backing store
+      is updated as well.
+
+    :raise PaginationError: if the endpoint returns errors.
+
+    Given the following types and operation:
+
+    >>> from sgqlc.types import Schema, Type, Field, list_of
+    >>> from sgqlc.operation import Operation
+    >>> schema = Schema()
+    >>> class Tag(Type):
+    ...     __schema__ = schema
+    ...     name = str
+    ...
+    >>> class TagConnection(Connection):
+    ...     __schema__ = schema
+    ...     nodes = list_of(Tag)
+    ...
+    >>> class Project(Type):
+    ...     __schema__ = schema
+    ...     name = str
+    ...     tags = Field(TagConnection, args=connection_args())
+    ...     labels = Field(TagConnection, args=connection_args())
+    ...
+    >>> class Query(Type):
+    ...     __schema__ = schema
+    ...     project = Field(Project, args={'name': str})
+    ...
+    >>> op = Operation(Query, project_name=str)
+    >>> project = op.project(name=Variable('project_name'))
+    >>> project.name()
+    name
+    >>> for conn in (project.tags(first=2), project.labels(first=2)):
+    ...     conn.nodes.name()
+    ...     conn.page_info.__fields__('has_next_page', 'end_cursor')
+    name
+    name
+
+    The follow-up operations select just the connection to paginate:
+
+    >>> def page(names, end_cursor):
+    ...     return {
+    ...         'nodes': [{'name': name} for name in names],
+    ...         'pageInfo': {'hasNextPage': end_cursor is not None,
+    ...                      'endCursor': end_cursor}}
+    ...
+    >>> pages = {
+    ...     'tags': [page(['t1', 't2'], 't2'), page(['t3', 't4'], 't4'),
+    ...              page(['t5'], None)],
+    ...     'labels': [page(['l1', 'l2'], 'l2'), page(['l3'], None)],
+    ... }
+    >>> def endpoint(query, variables):
+    ...     print(query)
+    ...     print(variables)
+    ...     project = {'name': 'sgqlc'}
+    ...     for conn in next(iter(query)):
+    ...         name = conn.__field__.name
+    ...         if name in pages:
+    ...             after = conn.__args__.get('after')
+    ...             i = int(after[1:]) // 2 if after else 0
+    ...             project[name] = pages[name][i]
+    ...     return {'data': {'project': project}}
+    ...
+    >>> result = paginate_connections(
+    ...     endpoint, op, {'projectName': 'sgqlc'}, max_workers=1)
+    ... # doctest: +NORMALIZE_WHITESPACE
+    query Query($projectName: String) {
+      project(name: $projectName) {
+        name
+        tags(first: 2) {
+          nodes {
+            name
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+        labels(first: 2) {
+          nodes {
+            name
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+      }
+    }
+    {'projectName': 'sgqlc'}
+    query Query($projectName: String) {
+      project(name: $projectName) {
+        tags(first: 2, after: "t2") {
+          nodes {
+            name
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+      }
+    }
+    {'projectName': 'sgqlc'}
+    query Query($projectName: String) {
+      project(name: $projectName) {
+        labels(first: 2, after: "l2") {
+          nodes {
+            name
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+      }
+    }
+    {'projectName': 'sgqlc'}
+    query Query($projectName: String) {
+      project(name: $projectName) {
+        tags(first: 2, after: "t4") {
+          nodes {
+            name
+          }
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+        }
+      }
+    }
+    {'projectName': 'sgqlc'}
+    >>> [tag.name for tag in result.project.tags.nodes]
+    ['t1', 't2', 't3', 't4', 't5']
+    >>> [label.name for label in result.project.labels.nodes]
+    ['l1', 'l2', 'l3']
+    >>> result.project.tags.page_info.has_next_page
+    False
+    >>> len(result.__json_data__['project']['tags']['nodes'])
+    5
+
+    Errors are raised, null objects are not paginated:
+
+    >>> def endpoint(query, variables):
+    ...     return {'errors': [{'message': 'failed'}]}
+    ...
+    >>> paginate_connections(endpoint, op, {'projectName': 'x'})
+    Traceback (most recent call last):
+      ...
+    sgqlc.types.relay.PaginationError: [{'message': 'failed'}]
+    >>> def endpoint(query, variables):
+    ...     return {'data': {'project': None}}
+    ...
+    >>> paginate_connections(endpoint, op, {'projectName': 'x'})
+    Query(project=Project())
+
+    The same applies to the follow-up operations:
+
+    >>> def endpoint(query, variables):
+    ...     if 'after' in str(query):
+    ...         return {'data': {'project': None}}
+    ...     return {'data': {'project': {'tags': page(['t1'], 't1')}}}
+    ...
+    >>> paginate_connections(endpoint, op).project.tags.page_info
+    PageInfo(has_next_page=True, end_cursor='t1')
+    >>> def endpoint(query, variables):
+    ...     if 'after' in str(query):
+    ...         return {'errors': [{'message': 'page failed'}]}
+    ...     return {'data': {'project': {'tags': page(['t1'], 't1')}}}
+    ...
+    >>> paginate_connections(endpoint, op)
+    Traceback (most recent call last):
+      ...
+    sgqlc.types.relay.PaginationError: [{'message': 'page failed'}]
+    '''
+    variables = dict(variables or {})
+    result = _execute_page(endpoint, operation, variables)
+    pending = [(path, conn) for path, conn in (
+        (path, _get_path(result, path))
+        for path in _find_connections(operation, ())) if conn is not None]
+    if not pending:
+        return result
+
+    def fetch(path, cursor):
+        page_op, page_variables = _connection_page_operation(
+            operation, variables, path, cursor)
+        return _get_path(
+            _execute_page(endpoint, page_op, page_variables), path)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        _merge_pages(executor, fetch, pending)
+
+    return result
+
+
+def _execute_page(endpoint, operation, variables):
+    data = endpoint(operation, variables)
+    errors = data.get('errors')
+    if errors:
+        raise PaginationError(errors, data.get('data'), variables)
+    return operation + data
+
+
+def _merge_pages(executor, fetch, pending):
+    futures = {}
+
+    def submit(path, conn):
+        page_info = conn.page_info
+        if page_info.has_next_page and page_info.end_cursor is not None:
+            future = executor.submit(fetch, path, page_info.end_cursor)
+            futures[future] = (path, conn)
+
+    for path, conn in pending:
+        submit(path, conn)
+
+    try:
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, conn = futures.pop(future)
+                page = future.result()
+                if page is not None:
+                    conn += page
+                    submit(path, conn)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _find_connections(selections, path):
+    for s in selections:
+        t = s.__field__.type
+        if getattr(t, '__list_of__', None) is not None or \
+                not issubclass(t, ContainerType):
+            continue
+        elif issubclass(t, Connection):
+            if 'after' in s.__field__.args and _selects_page_info(s):
+                yield path + (s,)
+        else:
+            yield from _find_connections(s, path + (s,))
+
+
+def _selects_page_info(selection):
+    return any(s.__field__.name == 'page_info' for s in selection)
+
+
+def _get_path(obj, path):
+    for s in path:
+        obj = getattr(obj, s.__alias__ or s.__field__.name, None)
+        if obj is None:
+            return None
+    # null objects are interpreted as empty instances
+    return obj if 'page_info' in obj else None
+
+
+def _connection_page_operation(operation, variables, path, cursor):
+    *parents, conn = path
+    # copy the child selections, the operation is discarded after the page
+    s = conn.__clone__(conn.__alias__, {},
+                       args=dict(conn.__args__, after=cursor), share=False)
+    for parent in reversed(parents):
+        s = parent.__clone__(parent.__alias__, {}, selections=[s])
+
+    used = set()
+    s.__collect_variables__(used)
+    variable_args = {}
+    for k, arg in operation.__variables__.items():
+        var = Variable(k[1:])
+        if var.graphql_name in used:
+            variable_args[var.name] = Arg(arg.type, default=arg.default)
+
+    page_op = Operation(operation.__type__, **variable_args)
+    page_op += s
+    page_variables = {k: v for k, v in variables.items() if k in used}
+    return page_op, page_variables
@@ -0,0 +1,345 @@
+'''
+sgqlc - Simple GraphQL Client
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Read-only Views of JSON Results
+===============================
+
+Interpreting results with ``operation + json_data`` creates a
+:class:`sgqlc.types.ContainerType` instance for every object, converting
+all of its fields. Applications that only read the results may use
+views instead: they resolve each access directly on the JSON objects
+and lists, using the selections (aliases and ``__as__()`` casts) to
+map the names and types, without copying the data or creating
+instances. Lists are sequences that only create views of the accessed
+elements. Nothing is cached, scalars such as
+:class:`sgqlc.types.datetime.DateTime` are converted on every access.
+
+Views are usually created with
+:func:`sgqlc.operation.Operation.__view__`, but may be created for
+any :class:`sgqlc.types.ContainerType`, optionally with a selection
+list.
+
+Examples
+--------
+
+>>> from sgqlc.types import Schema, Type, Interface, Field
+>>> from sgqlc.types import list_of, non_null
+>>> from sgqlc.types.datetime import DateTime
+>>> from sgqlc.operation import Operation
+>>> schema = Schema()
+>>> class Person(Interface):
+...     __schema__ = schema
+...     login = non_null(str)
+...
+>>> class Member(Type, Person):
+...     __schema__ = schema
+...     name = str
+...
+>>> class Ticket(Type):
+...     __schema__ = schema
+...     number = non_null(int)
+...     title = str
+...     created_at = DateTime
+...     author = Person
+...     labels = list_of(non_null(str))
+...
+>>> class TicketQuery(Type):
+...     __schema__ = schema
+...     issues = Field(list_of(Ticket), args={'first': int})
+...
+>>> op = Operation(TicketQuery)
+>>> issues = op.issues(first=2)
+>>> issues.__fields__('number', 'created_at', 'labels')
+>>> issues.title(__alias__='summary')
+summary: title
+>>> issues.author.login()
+login
+>>> issues.author.__as__(Member).name()
+name
+>>> json_data = {'data': {'issues': [{
+...     'number': 1, 'createdAt': '2019-06-01T12:00:00Z',
+...     'summary': 'First', 'labels': ['bug'],
+...     'author': {'__typename': 'Member', 'login': 'joe', 'name': 'Joe'},
+... }, {
+...     'number': 2, 'createdAt': '2019-06-02T12:00:00Z',
+...     'summary': 'Second', 'labels': [], 'author': None,
+... }]}}
+>>> view = op.__view__(json_data)
+>>> view.issues  # doctest: +ELLIPSIS
+[Ticket(number=1, ...), Ticket(number=2, ...)]
+>>> issue = view.issues[0]
+>>> issue.summary, issue.created_at
+('First', datetime.datetime(2019, 6, 1, 12, 0, tzinfo=datetime.timezone.utc))
+>>> issue.author
+Member(login='joe', __typename__='Member', name='Joe')
+>>> issue.author.name
+'Joe'
+>>> view.issues[1].author is None
+True
+
+The views refer to the JSON data, which is not copied:
+
+>>> issue.__json_data__ is json_data['data']['issues'][0]
+True
+>>> tail = view.issues[1:]
+>>> tail.__json_data__ is json_data['data']['issues'], tail.__indices__
+(True, range(1, 2))
+>>> [i.number for i in view.issues[::-1]], [i.number for i in tail[::-1]]
+([2, 1], [2])
+>>> len(view.issues), list(issue), 'summary' in issue, 'title' in issue
+(2, ['number', 'created_at', 'labels', 'summary', 'author'], True, False)
+>>> issue['labels'][0]
+'bug'
+
+Fields that were not in the results (or not selected) and changes
+behave as for :class:`sgqlc.types.ContainerType` with
+``__compact__ = True``:
+
+>>> issue.title
+Traceback (most recent call last):
+  ...
+AttributeError: 'Ticket' view has no field 'title'
+>>> issue['title']
+Traceback (most recent call last):
+  ...
+KeyError: "'Ticket' view has no field 'title'"
+>>> issue.summary = 'Changed'
+Traceback (most recent call last):
+  ...
+AttributeError: 'Ticket' view is read-only
+
+Invalid values are only reported when accessed:
+
+>>> json_data['data']['issues'][1]['number'] = None
+>>> view.issues[1].number
+Traceback (most recent call last):
+  ...
+ValueError: Ticket selection 'number': None (Int! received null value)
+
+Without a selection list all fields of the type are used:
+
+>>> issue = ContainerView(Ticket, {'number': 3, 'labels': ['a', 'b']})
+>>> issue
+Ticket(number=3, labels=['a', 'b'])
+>>> issue.labels[-1], issue.labels.index('b')
+('b', 1)
+>>> issue = ContainerView(Ticket, {'labels': None, 'created_at': None})
+>>> issue.labels is None, issue.created_at is None
+(True, True)
+>>> 'number' in issue, 'other' in issue
+(False, False)
+>>> issue.number
+Traceback (most recent call last):
+  ...
+AttributeError: 'Ticket' view has no field 'number'
+>>> hasattr(ContainerView.__new__(ContainerView), 'number')  # no __init__
+False
+
+:license: ISC
+'''
+
+__docformat__ = 'reStructuredText en'
+
+__all__ = ('ContainerView', 'ListView', 'view_value')
+
+from collections.abc import Sequence
+
+from . import ContainerType, _SelectionListDecoder
+
+
+def view_value(typ, json_value, selection_list=None):
+    '''Convert the JSON value of the given type.
+
+    Objects result in :class:`ContainerView`, lists in :class:`ListView`
+    and others are converted using the type, such as scalars and
+    enumerations. Null objects and lists are ``None``.
+
+    :raise ValueError: if the value is invalid for the type.
+    '''
+    list_of = typ.__dict__.get('__list_of__')
+    if list_of is not None:
+        if json_value is None:
+            return None
+        return ListView(list_of, json_value, selection_list)
+
+    non_null_of = typ.__dict__.get('__non_null_of__')
+    if non_null_of is not None:
+        if json_value is None:
+            raise ValueError(typ.__name__ + ' received null value')
+        return view_value(non_null_of, json_value, selection_list)
+
+    if issubclass(typ, ContainerType):
+        if json_value is None:
+            return None  # not an empty instance, as in operation + data
+        return ContainerView(typ, json_value, selection_list)
+    return typ(json_value, selection_list)
+
+
+class ContainerView:
+    '''Read-only view of a JSON object of a container type.
+
+    Fields are accessed as attributes or items, as in
+    :class:`sgqlc.types.ContainerType`.
+    '''
+
+    __slots__ = ('__type__', '__json_data__', '__selection_list__')
+
+    def __init__(self, typ, json_data, selection_list=None):
+        assert isinstance(json_data, dict), \
+            '%r (%s) is not a JSON Object' % (
+                json_data, type(json_data).__name__)
+        object.__setattr__(self, '__type__', typ)
+        object.__setattr__(self, '__json_data__', json_data)
+        object.__setattr__(self, '__selection_list__', selection_list)
+
+    def __decoders(self):
+        # selections, then the casts matching the object's __typename
+        sl = self.__selection_list__
+        while sl is not None:
+            decoder = _SelectionListDecoder.get(sl)
+            yield decoder
+            casts = decoder.casts
+            sl = casts.get(self.__json_data__.get('__typename')) \
+                if casts else None
+
+    def __entries(self):
+        if self.__selection_list__ is None:
+            for field in self.__type__:
+                yield None, (field, None, None)
+            return
+
+        for decoder in self.__decoders():
+            for entry in decoder.entries:
+                yield decoder, entry
+
+    def __find(self, name):
+        if self.__selection_list__ is None:
+            if name not in self.__type__:
+                return None
+            return None, (self.__type__[name], None, None)
+
+        found = None
+        sl = self.__selection_list__
+        while sl is not None:
+            decoder = _SelectionListDecoder.get(sl)
+            entry = decoder.names.get(name)
+            if entry is not None:
+                found = decoder, entry  # casts override the selections
+            casts = decoder.casts
+            sl = casts.get(self.__json_data__.get('__typename')) \
+                if casts else None
+        return found
+
+    def __has_value(self, field):
+        json_data = self.__json_data__
+        return field.graphql_name in json_data or field.name in json_data
+
+    def __error(self, name, msg):
+        return "%r view %s %r" % (self.__type__.__name__, msg, name)
+
+    def __getattr__(self, name):
+        if name in ContainerView.__slots__:
+            raise AttributeError(name)  # not initialized, ie: copy()
+
+        found = self.__find(name)
+        if found is None:
+            raise AttributeError(self.__error(name, 'has no field'))
+
+        decoder, entry = found
+        field, sel, casts = entry
+        ftype = field.type
+        json_data = self.__json_data__
+        if casts:
+            field, ftype = decoder.get_field_for_casts(entry, json_data)
+
+        if field.graphql_name in json_data:
+            value = json_data[field.graphql_name]
+        elif field.name in json_data:
+            value = json_data[field.name]
+        else:
+            raise AttributeError(self.__error(name, 'has no field'))
+
+        try:
+            return view_value(ftype, value, sel)
+        except Exception as exc:
+            raise ValueError('%s selection %r: %r (%s)' % (
+                self.__type__, name, value, exc)) from exc
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%r view is read-only" % (
+            self.__type__.__name__,))
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError as exc:
+            raise KeyError(self.__error(name, 'has no field')) from exc
+
+    def __iter__(self):
+        '''Iterate over the names of fields in the JSON object.'''
+        seen = set()
+        for decoder, (field, sel, casts) in self.__entries():
+            name = field.name
+            if name not in seen and self.__has_value(field):
+                seen.add(name)
+                yield name
+
+    def __contains__(self, name):
+        found = self.__find(name)
+        return found is not None and self.__has_value(found[1][0])
+
+    def __len__(self):
+        i = 0
+        for name in self:
+            i += 1
+        return i
+
+    def __repr__(self):
+        r = []
+        for k in self:
+            r.append('%s=%r' % (k, self[k]))
+        return '%s(%s)' % (self.__type__.__name__, ', '.join(r))
+
+
+class ListView(Sequence):
+    '''Read-only sequence of views or values of a JSON list.
+
+    Elements are converted when accessed, see :func:`view_value`.
+    Slices are also views, of the same JSON list using a ``range`` of
+    its indices as ``__indices__``.
+    '''
+
+    __slots__ = ('__type__', '__json_data__', '__selection_list__',
+                 '__indices__')
+
+    def __init__(self, typ, json_data, selection_list=None, indices=None):
+        self.__type__ = typ
+        self.__json_data__ = json_data
+        self.__selection_list__ = selection_list
+        if indices is None:
+            indices = range(len(json_data))
+        self.__indices__ = indices
+
+    def __len__(self):
+        return len(self.__indices__)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ListView(self.__type__, self.__json_data__,
+                            self.__selection_list__, self.__indices__[index])
+        return view_value(self.__type__,
+                          self.__json_data__[self.__indices__[index]],
+                          self.__selection_list__)
+
+    def __iter__(self):
+        typ = self.__type__
+        sl = self.__selection_list__
+        json_data = self.__json_data__
+        if self.__indices__ != range(len(json_data)):  # slice
+            json_data = map(json_data.__getitem__, self.__indices__)
+        for v in json_data:
+            yield view_value(typ, v, sl)
+
+    def __repr__(self):
+        return repr(list(self))
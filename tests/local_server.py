@@ -0,0 +1,169 @@
+'''Local GraphQL HTTP server used by the endpoint tests.
+
+Only tests of the connection handling itself, such as the connection
+pools and content encoding, should use it; others mock
+:func:`urllib.request.urlopen`.
+
+The server records every request and replies ``server.body``, unless
+responses were queued in ``server.responses`` as ``(status, body)``,
+``(status, body, mode)`` or ``(status, body, mode, headers)``. The
+mode changes how the response is written:
+
+ - ``'chunked'``: ``Transfer-Encoding: chunked``;
+ - ``'close'``: ``Connection: close``;
+ - ``'eof'``: no ``Content-Length``, the connection is closed;
+ - ``'drop'``: the connection is closed without telling the client;
+ - ``'hangup'``: the connection is closed without a response;
+ - ``'slow'``: waits half a second before replying.
+
+Requests with ``{"delay": seconds}`` variables are replied after the
+delay, with the variables as data.
+'''
+
+import gzip
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+
+graphql_response_ok = b'{"data": {"repository": {"name": "sgqlc"}}}'
+
+graphql_response_persisted_query_not_found = \
+    b'{"errors": [{"message": "PersistedQueryNotFound"}]}'
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):  # noqa: N802
+        query = urllib.parse.urlsplit(self.path).query
+        self.reply(dict(urllib.parse.parse_qsl(query)))
+
+    def do_POST(self):  # noqa: N802
+        size = int(self.headers['Content-Length'])
+        body = self.rfile.read(size)
+        self.server.request_sizes.append(size)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        self.reply(json.loads(body))
+
+    def check_persisted_query(self, request):
+        extensions = request.get('extensions')
+        if not extensions:
+            return True
+        query_hash = extensions['persistedQuery']['sha256Hash']
+        if 'query' in request:
+            self.server.persisted_queries.add(query_hash)
+        return query_hash in self.server.persisted_queries
+
+    def get_response(self, request):
+        server = self.server
+        status, body, mode, headers = 200, server.body, server.mode, {}
+        if server.responses:
+            entry = server.responses.pop(0)
+            status, body = entry[:2]
+            if len(entry) > 2:
+                mode = entry[2]
+            if len(entry) > 3:
+                headers = entry[3]
+
+        if isinstance(request, dict):
+            if not self.check_persisted_query(request):
+                body = graphql_response_persisted_query_not_found
+            variables = request.get('variables') or {}
+            if isinstance(variables, dict) and 'delay' in variables:
+                time.sleep(variables['delay'])
+                body = json.dumps({'data': variables}).encode('utf-8')
+        if mode == 'slow':
+            time.sleep(0.5)
+        return status, body, mode, headers
+
+    def get_encoding(self):
+        encoding = self.server.encoding
+        if encoding == 'accept':
+            accepted = self.headers.get('Accept-Encoding') or ''
+            encoding = accepted.split(',')[0].strip()
+        return encoding
+
+    def reply(self, request):
+        server = self.server
+        server.requests.append(request)
+        server.headers.append(self.headers)
+        server.peers.add(self.client_address)
+
+        status, body, mode, headers = self.get_response(request)
+        if mode == 'hangup':
+            self.close_connection = True
+            return
+
+        encoding = self.get_encoding()
+        if encoding == 'gzip':
+            body = gzip.compress(body)
+        elif encoding == 'deflate':
+            body = zlib.compress(body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.write_body(body, mode)
+
+    def write_body(self, body, mode):
+        if mode == 'chunked':
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(body), 10):
+                chunk = body[i:i + 10]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        if mode == 'close':
+            self.send_header('Connection', 'close')
+        elif mode == 'eof':
+            self.close_connection = True
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if mode == 'drop':
+            self.close_connection = True
+
+
+def start_server(body=graphql_response_ok, mode=None, encoding=None):
+    '''Start the server in a thread, its URL is ``server.url``.
+
+    :param body: replied if no ``server.responses`` are queued.
+    :param mode: default mode of the responses.
+    :param encoding: ``Content-Encoding`` of the responses, ``'accept'``
+      uses the first one given in ``Accept-Encoding``.
+    '''
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.body = body
+    server.mode = mode
+    server.encoding = encoding
+    server.requests = []
+    server.request_sizes = []
+    server.headers = []
+    server.responses = []
+    server.peers = set()
+    server.persisted_queries = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = 'http://127.0.0.1:%d/graphql' % server.server_address[1]
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
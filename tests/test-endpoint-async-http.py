@@ -0,0 +1,419 @@
+import asyncio
+import json
+import urllib.error
+import urllib.request
+
+from local_server import graphql_response_ok, start_server, stop_server
+from nose.tools import eq_
+from sgqlc.endpoint.async_http import AsyncHTTPEndpoint, \
+    AsyncHTTPConnectionPool
+from sgqlc.endpoint.http import HTTPEndpoint
+
+graphql_query = '{ repository { name } }'
+
+graphql_mutation = 'mutation { renameRepository { name } }'
+
+graphql_response_error = b'{"errors": [{"message": "Server Reported Error"}]}'
+
+graphql_response_json_error = b'{"data": {'
+
+# -- Test Helpers --
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b''
+        self.fail = False
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        if self.fail:
+            raise ConnectionResetError('connection reset by peer')
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(AsyncHTTPConnectionPool):
+    '''Connections reply the queued raw ``responses``, one each.'''
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.writers = []
+
+    async def _open_connection(self, key):
+        reader = asyncio.StreamReader()
+        reader.feed_data(self.responses.pop(0))
+        writer = FakeWriter()
+        self.writers.append(writer)
+        return reader, writer
+
+
+# -- Actual Tests --
+
+
+def test_basic():
+    'Test if basic usage with only essential parameters works'
+
+    server = start_server()
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+
+        async def fetch():
+            try:
+                return await endpoint(graphql_query, {'a': 1}, 'Op')
+            finally:
+                endpoint.pool.close()
+
+        data = run(fetch())
+        eq_(data, json.loads(graphql_response_ok))
+        eq_(server.requests, [{
+            'query': graphql_query,
+            'variables': {'a': 1},
+            'operationName': 'Op',
+        }])
+        eq_(str(endpoint),
+            'AsyncHTTPEndpoint('
+            + 'url={}, '.format(server.url)
+            + 'base_headers={}, timeout=None, method=POST)')
+    finally:
+        stop_server(server)
+
+
+def test_get():
+    'Test if HTTP method GET request works'
+
+    server = start_server()
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url, method='GET')
+        data = run(endpoint(graphql_query, {'a': 1}))
+        eq_(data, json.loads(graphql_response_ok))
+        eq_(server.requests, [{
+            'query': graphql_query,
+            'variables': '{"a": 1}',
+        }])
+    finally:
+        stop_server(server)
+
+
+def test_concurrent_queries():
+    'Test if concurrent queries share a bounded number of connections'
+
+    server = start_server()
+    try:
+        pool = AsyncHTTPConnectionPool(maxsize=3)
+        eq_(str(pool), 'AsyncHTTPConnectionPool(maxsize=3, idle_timeout=60)')
+        endpoint = AsyncHTTPEndpoint(server.url, pool=pool)
+
+        async def fetch_all():
+            return await asyncio.gather(
+                *(endpoint(graphql_query, {'i': i}) for i in range(30)))
+
+        results = run(fetch_all())
+        eq_(results, [json.loads(graphql_response_ok)] * 30)
+        eq_(sorted(r['variables']['i'] for r in server.requests),
+            list(range(30)))
+        assert len(server.peers) <= 3, server.peers
+    finally:
+        stop_server(server)
+
+
+def test_sequential_queries_reuse_connection():
+    'Test if sequential queries reuse the connection'
+
+    server = start_server()
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+
+        async def fetch_all():
+            return [await endpoint(graphql_query) for i in range(5)]
+
+        eq_(len(run(fetch_all())), 5)
+        eq_(len(server.peers), 1)
+    finally:
+        stop_server(server)
+
+
+def test_idle_timeout():
+    'Test if idle connections are not reused'
+
+    server = start_server()
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url, pool=AsyncHTTPConnectionPool(
+            idle_timeout=0))
+
+        async def fetch_all():
+            return [await endpoint(graphql_query) for i in range(3)]
+
+        eq_(len(run(fetch_all())), 3)
+        eq_(len(server.peers), 3)
+    finally:
+        stop_server(server)
+
+
+def test_connection_handling():
+    'Test chunked, connection close and server dropped connections'
+
+    server = start_server()
+    server.responses.extend([
+        (200, graphql_response_ok, 'chunked'),
+        (200, graphql_response_ok, 'close'),
+        (200, graphql_response_ok, 'eof'),
+        (200, graphql_response_ok, 'drop'),
+        (200, graphql_response_ok, None),
+    ])
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+
+        async def fetch_all():
+            return [await endpoint(graphql_query) for i in range(5)]
+
+        eq_(run(fetch_all()), [json.loads(graphql_response_ok)] * 5)
+        eq_(len(server.requests), 5)
+    finally:
+        stop_server(server)
+
+
+def test_server_hangup():
+    'Test if only queries are sent again if the response was lost'
+
+    server = start_server()
+    server.responses.extend([
+        (200, graphql_response_ok),
+        (200, b'', 'hangup'),
+        (200, graphql_response_ok),
+        (200, b'', 'hangup'),
+    ])
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+
+        async def fetch_all():
+            await endpoint(graphql_query)
+            eq_(await endpoint(graphql_query),
+                json.loads(graphql_response_ok))
+            eq_(len(server.requests), 3)
+
+            try:
+                await endpoint(graphql_mutation)
+                assert False, 'should have raised'
+            except EOFError:
+                pass
+            eq_(len(server.requests), 4)  # server may have processed it
+
+        run(fetch_all())
+    finally:
+        stop_server(server)
+
+
+def test_idle_connection_reset():
+    'Test if requests are sent on a new connection if the idle one fails'
+
+    pool = FakePool([
+        b'HTTP/1.1 204 No Content\r\n\r\n',
+        b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}',
+    ])
+    req = urllib.request.Request('http://example.com/graphql', b'{}')
+
+    async def fetch_all():
+        status, reason, headers, body = await pool.request(req)
+        eq_((status, reason, body), (204, 'No Content', b''))
+        pool.writers[0].fail = True
+
+        status, reason, headers, body = await pool.request(req)
+        eq_((status, body), (200, b'{}'))
+
+    run(fetch_all())
+    eq_([w.closed for w in pool.writers], [True, False])
+    assert pool.writers[1].data.startswith(b'POST /graphql HTTP/1.1\r\n')
+    pool.close()
+    eq_(pool.writers[1].closed, True)
+
+
+def test_not_modified():
+    'Test if 304 Not Modified returns None and the response headers'
+
+    pool = FakePool([b'HTTP/1.1 304 Not Modified\r\nETag: "v1"\r\n\r\n'])
+    endpoint = AsyncHTTPEndpoint('http://example.com/graphql', pool=pool)
+    response = {}
+    eq_(run(endpoint(graphql_query, extra_headers={'If-None-Match': '"v1"'},
+                     response=response)), None)
+    eq_(response['status'], 304)
+    eq_(response['headers']['ETag'], '"v1"')
+    assert b'If-none-match: "v1"' in pool.writers[0].data
+
+
+def test_sync_unsupported():
+    'Test if synchronous calls report the endpoint must be awaited'
+
+    endpoint = AsyncHTTPEndpoint('http://127.0.0.1:1/graphql')
+    assert isinstance(endpoint.pool, AsyncHTTPConnectionPool)
+    for call in (lambda: HTTPEndpoint.__call__(endpoint, graphql_query),
+                 lambda: endpoint.urlopen(None)):
+        try:
+            call()
+            assert False, 'should have raised'
+        except TypeError as exc:
+            eq_(str(exc), 'AsyncHTTPEndpoint must be called with await')
+
+
+def test_server_reported_error():
+    'Test if GraphQL errors reported with HTTP 200 is handled properly'
+
+    server = start_server()
+    server.responses.append((200, graphql_response_error, None))
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+        data = run(endpoint(graphql_query))
+        eq_(data, json.loads(graphql_response_error))
+    finally:
+        stop_server(server)
+
+
+def test_json_error():
+    'Test if broken server responses (invalid JSON) is handled'
+
+    server = start_server()
+    server.responses.append((200, graphql_response_json_error, None))
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+        data = run(endpoint(graphql_query))
+        exc = data['errors'][0].pop('exception')
+        assert isinstance(exc, json.JSONDecodeError), exc
+        eq_(data, {
+            'errors': [{
+                'message': str(exc),
+                'body': graphql_response_json_error.decode('utf-8'),
+            }],
+            'data': None,
+        })
+    finally:
+        stop_server(server)
+
+
+def test_server_http_graphql_error():
+    'Test if HTTP error that IS conforming to GraphQL payload is handled'
+
+    server = start_server()
+    server.responses.append((400, graphql_response_error, None))
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+        data = run(endpoint(graphql_query))
+        exc = data.pop('exception')
+        assert isinstance(exc, urllib.error.HTTPError), exc
+        eq_(data.pop('status'), 400)
+        eq_(data.pop('headers')['Content-Type'], 'application/json')
+        eq_(data, json.loads(graphql_response_error))
+    finally:
+        stop_server(server)
+
+
+def test_timeout():
+    'Test if timeout is raised'
+
+    server = start_server()
+    server.responses.append((200, graphql_response_ok, 'slow'))
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url, timeout=0.1)
+        try:
+            run(endpoint(graphql_query))
+            assert False, 'should have raised'
+        except asyncio.TimeoutError:
+            pass
+    finally:
+        stop_server(server)
+
+
+def test_execute_many():
+    'Test if execute_many() yields results in order, bounded concurrency'
+
+    server = start_server()
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url)
+        delays = [0.05, 0.01, 0.03, 0, 0.02, 0.01, 0, 0.04]
+        consumed = []
+
+        def operations():
+            for i, delay in enumerate(delays):
+                assert i - len(consumed) <= 3, (i, consumed)
+                yield (graphql_query, {'i': i, 'delay': delay})
+
+        async def fetch_all():
+            async for data in endpoint.execute_many(operations(),
+                                                    max_concurrency=3):
+                consumed.append(data['data']['i'])
+
+            return [d async for d in endpoint.execute_many([graphql_query])]
+
+        eq_(run(fetch_all()), [json.loads(graphql_response_ok)])
+        eq_(consumed, list(range(len(delays))))
+        assert len(server.peers) <= 3, server.peers
+    finally:
+        stop_server(server)
+
+
+def test_execute_many_close():
+    'Test if pending operations are cancelled once execute_many() is closed'
+
+    pool = FakePool([
+        b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}',
+        b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}',
+    ])
+    endpoint = AsyncHTTPEndpoint('http://example.com/graphql', pool=pool)
+
+    async def fetch_first():
+        results = endpoint.execute_many([graphql_query] * 10,
+                                        max_concurrency=2)
+        data = await results.__anext__()
+        await results.aclose()
+        return data
+
+    eq_(run(fetch_first()), {})
+    assert len(pool.writers) <= 2, pool.writers
+
+
+def test_persisted_queries():
+    'Test if persisted queries are sent once, then only the hash'
+
+    server = start_server()
+    try:
+        endpoint = AsyncHTTPEndpoint(server.url, persisted_queries=True)
+
+        async def fetch_all():
+            return [await endpoint(graphql_query) for i in range(2)]
+
+        eq_(run(fetch_all()), [json.loads(graphql_response_ok)] * 2)
+        eq_(['query' in r for r in server.requests], [False, True, False])
+        eq_(len(server.persisted_queries), 1)
+    finally:
+        stop_server(server)
+
+
+def test_https_connection():
+    'Test if HTTPS connections use SSL'
+
+    pool = AsyncHTTPConnectionPool()
+    calls = []
+
+    async def open_connection(host, port, ssl=None):
+        calls.append((host, port, ssl is not None))
+        return None, None
+
+    original = asyncio.open_connection
+    asyncio.open_connection = open_connection
+    try:
+        run(pool._open_connection(('https', 'example.com', None)))
+    finally:
+        asyncio.open_connection = original
+    eq_(calls, [('example.com', 443, True)])
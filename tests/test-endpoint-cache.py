@@ -0,0 +1,541 @@
+import gc
+import http.client
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import zlib
+
+import sgqlc
+from nose.tools import eq_
+from sgqlc.endpoint.base import BaseEndpoint
+from sgqlc.endpoint.cache import CachedEndpoint, CacheEntry, ResponseCache, \
+    SQLiteResponseCache, TieredCache, fingerprint
+from sgqlc.endpoint.http import HTTPEndpoint
+from sgqlc.types import Schema, Type
+from sgqlc.operation import Operation
+from local_server import start_server, stop_server
+
+test_url = 'http://some-server.com/graphql'
+
+graphql_query = '{ repository { name } }'
+
+graphql_mutation = 'mutation { addStar { starrable { id } } }'
+
+graphql_response_ok = b'{"data": {"repository": {"name": "sgqlc"}}}'
+
+graphql_response_error = b'{"errors": [{"message": "Server Reported Error"}]}'
+
+# -- Test Helpers --
+
+
+class MockResponse(io.BytesIO):
+    def __init__(self, body, headers):
+        super().__init__(body)
+        self.status = 200
+        self.headers = headers
+
+
+class MockServer:
+    '''Reply ``body`` as ``urlopen()``, with ``cache_control`` and ``etag``.
+
+    Requests with ``{"delay": seconds}`` variables are replied after the
+    delay.
+    '''
+
+    def __init__(self, cache_control=None, etag=None,
+                 body=graphql_response_ok):
+        self.cache_control = cache_control
+        self.etag = etag
+        self.body = body
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_headers(self):
+        headers = http.client.HTTPMessage()
+        headers['Content-Type'] = 'application/json'
+        if self.etag:
+            headers['ETag'] = self.etag
+        if self.cache_control:
+            headers['Cache-Control'] = self.cache_control
+        return headers
+
+    def urlopen(self, req, timeout=None):
+        request = json.loads(req.data)
+        if_none_match = req.get_header('If-none-match')
+        with self.lock:
+            self.requests.append((request, if_none_match))
+
+        variables = request.get('variables') or {}
+        if 'delay' in variables:
+            time.sleep(variables['delay'])
+
+        if self.etag and if_none_match == self.etag:
+            raise urllib.error.HTTPError(req.full_url, 304, 'Not Modified',
+                                         self.get_headers(), io.BytesIO())
+        return MockResponse(self.body, self.get_headers())
+
+
+class CountingEndpoint(BaseEndpoint):
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, query, variables=None, operation_name=None,
+                 **kwargs):
+        self.calls.append((query, variables, operation_name, kwargs))
+        return json.loads(self.result)
+
+
+# -- Actual Tests --
+
+
+def test_cache_hit():
+    'Test if identical queries are only sent once'
+
+    server = MockServer()
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen),
+                              ttl=60)
+    for i in range(3):
+        data = endpoint(graphql_query, {'a': 1, 'b': 2})
+        eq_(data, json.loads(graphql_response_ok))
+    data = endpoint(graphql_query, {'b': 2, 'a': 1})
+    data = endpoint(graphql_query.encode('utf-8'), {'a': 1, 'b': 2})
+    eq_(len(server.requests), 1)
+    eq_((endpoint.hits, endpoint.misses), (4, 1))
+
+    endpoint(graphql_query, {'a': 2})  # different variables
+    endpoint(graphql_query, {'a': 1, 'b': 2}, 'Other')
+    eq_(len(server.requests), 3)
+
+
+def test_cache_namespace():
+    'Test if endpoints with different URL or headers do not share results'
+
+    server = MockServer()
+    cache = ResponseCache()
+
+    def create(url=test_url, headers=None, **kwargs):
+        return CachedEndpoint(
+            HTTPEndpoint(url, headers, urlopen=server.urlopen), cache,
+            **kwargs)
+
+    create()(graphql_query)
+    create()(graphql_query)
+    eq_(len(server.requests), 1)
+
+    create('http://other-server.com/graphql')(graphql_query)
+    create(headers={'Authorization': 'bearer a'})(graphql_query)
+    create(headers={'Authorization': 'bearer b'})(graphql_query)
+    create(headers={'Authorization': 'bearer b'})(graphql_query)
+    eq_(len(server.requests), 4)
+
+    endpoint = create()
+    endpoint(graphql_query, extra_headers={'Authorization': 'bearer a'})
+    endpoint(graphql_query, extra_headers={'Authorization': 'bearer a'})
+    eq_(len(server.requests), 5)
+
+    create(namespace='a')(graphql_query)
+    create('http://other-server.com/graphql', namespace='a')(graphql_query)
+    eq_(len(server.requests), 6)
+
+
+def test_cache_returns_copies():
+    'Test if changing a result does not change the cache'
+
+    endpoint = CachedEndpoint(CountingEndpoint(graphql_response_ok))
+    data = endpoint(graphql_query)
+    data['data']['repository']['name'] = 'changed'
+    data = endpoint(graphql_query)
+    eq_(data, json.loads(graphql_response_ok))
+    eq_(len(endpoint.endpoint.calls), 1)
+
+
+def test_cache_ttl():
+    'Test if expired results are fetched again'
+
+    wrapped = CountingEndpoint(graphql_response_ok)
+    endpoint = CachedEndpoint(wrapped, ttl=0.05)
+    endpoint(graphql_query)
+    endpoint(graphql_query)
+    eq_(len(wrapped.calls), 1)
+    time.sleep(0.1)
+    endpoint(graphql_query)
+    eq_(len(wrapped.calls), 2)
+
+
+def test_cache_expired_error():
+    'Test if expired results are removed if the new one has errors'
+
+    wrapped = CountingEndpoint(graphql_response_ok)
+    endpoint = CachedEndpoint(wrapped, ttl=0.05)
+    endpoint(graphql_query)
+    eq_(len(endpoint.cache), 1)
+    time.sleep(0.1)
+    wrapped.result = graphql_response_error
+    endpoint(graphql_query)
+    eq_(len(endpoint.cache), 0)
+
+
+def test_cache_errors_and_mutations():
+    'Test if errors and mutations are not cached'
+
+    wrapped = CountingEndpoint(graphql_response_error)
+    endpoint = CachedEndpoint(wrapped)
+    endpoint(graphql_query)
+    endpoint(graphql_query)
+    eq_(len(wrapped.calls), 2)
+
+    wrapped = CountingEndpoint(graphql_response_ok)
+    endpoint = CachedEndpoint(wrapped)
+    endpoint(graphql_mutation)
+    endpoint(graphql_mutation)
+    eq_(len(wrapped.calls), 2)
+    eq_(len(endpoint.cache), 0)
+
+
+def test_cache_operation():
+    'Test if sgqlc.operation.Operation is cached using its hash'
+
+    schema = Schema()
+
+    # types may be declared if doctests were processed by nose
+    for name in ('Repository', 'Query', 'Mutation'):
+        if name in schema:
+            schema -= schema[name]
+
+    class Repository(Type):
+        __schema__ = schema
+        name = str
+
+    class Query(Type):
+        __schema__ = schema
+        repository = Repository
+
+    class Mutation(Type):
+        __schema__ = schema
+        rename_repository = Repository
+
+    op = Operation(Query)
+    op.repository.name()
+    wrapped = CountingEndpoint(graphql_response_ok)
+    endpoint = CachedEndpoint(wrapped)
+    endpoint(op)
+    endpoint(op)
+    eq_(len(wrapped.calls), 1)
+    eq_(endpoint.cache.keys(), [fingerprint(bytes(op).decode('utf-8'))])
+
+    op = Operation(Query)
+    op.repository.name()
+    data = op + endpoint(op, timeout=1)  # new, equal
+    eq_(data.repository.name, 'sgqlc')
+    eq_(len(wrapped.calls), 1)
+
+    mutation = Operation(Mutation)
+    mutation.rename_repository.name()
+    endpoint(mutation)
+    eq_(len(wrapped.calls), 2)
+
+
+def test_cache_no_store():
+    'Test if Cache-Control: no-store results are not cached'
+
+    server = MockServer('no-store')
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen))
+    endpoint(graphql_query)
+    endpoint(graphql_query)
+    eq_(len(server.requests), 2)
+    eq_(len(endpoint.cache), 0)
+
+
+def test_cache_max_age():
+    'Test if Cache-Control: max-age overrides the ttl'
+
+    server = MockServer('max-age=0')
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen),
+                              ttl=60)
+    endpoint(graphql_query)
+    endpoint(graphql_query)
+    eq_(len(server.requests), 2)
+
+    server = MockServer('public, max-age=60')
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen),
+                              ttl=0)
+    endpoint(graphql_query)
+    endpoint(graphql_query)
+    eq_(len(server.requests), 1)
+
+    server = MockServer('max-age=invalid')  # uses the ttl
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen),
+                              ttl=60)
+    endpoint(graphql_query)
+    endpoint(graphql_query)
+    eq_(len(server.requests), 1)
+
+
+def test_cache_etag():
+    'Test if expired results are validated with If-None-Match'
+
+    server = MockServer('no-cache', '"v1"')
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen))
+    for i in range(3):
+        data = endpoint(graphql_query)
+        eq_(data, json.loads(graphql_response_ok))
+
+    eq_([r[1] for r in server.requests], [None, '"v1"', '"v1"'])
+    eq_(endpoint.revalidations, 2)
+
+    server.etag = '"v2"'
+    server.body = b'{"data": {"repository": {"name": "new"}}}'
+    data = endpoint(graphql_query)
+    eq_(data['data']['repository']['name'], 'new')
+    data = endpoint(graphql_query)
+    eq_(data['data']['repository']['name'], 'new')
+    eq_(server.requests[-1][1], '"v2"')
+
+
+def test_cache_etag_pool():
+    'Test if 304 Not Modified is handled by HTTPConnectionPool'
+
+    server = start_server()
+    server.responses.append((200, graphql_response_ok, None, {
+        'Cache-Control': 'no-cache', 'ETag': '"v1"'}))
+    server.responses.append((304, b'', None, {'ETag': '"v1"'}))
+    try:
+        endpoint = CachedEndpoint(HTTPEndpoint(server.url, pool=True))
+        response = {}
+        data = endpoint(graphql_query, response=response)
+        eq_(response['status'], 200)
+        eq_(response['headers']['ETag'], '"v1"')
+        data = endpoint(graphql_query, response=response)
+        eq_(data, json.loads(graphql_response_ok))
+        eq_(response['status'], 304)
+        eq_(server.headers[-1]['If-None-Match'], '"v1"')
+        eq_(endpoint.revalidations, 1)
+    finally:
+        stop_server(server)
+
+
+def test_cache_concurrent():
+    'Test if concurrent calls for the same key are sent once'
+
+    server = MockServer()
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen))
+    results = list(endpoint.execute_many(
+        [(graphql_query, {'delay': 0.1})] * 4, max_concurrency=4))
+    eq_(results, [json.loads(graphql_response_ok)] * 4)
+    eq_(len(server.requests), 1)
+
+    # not cacheable: the others are sent once the first is done
+    server = MockServer('no-store')
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen))
+    results = list(endpoint.execute_many(
+        [(graphql_query, {'delay': 0.1})] * 4, max_concurrency=4))
+    eq_(results, [json.loads(graphql_response_ok)] * 4)
+    eq_(len(server.requests), 4)
+
+
+def test_cache_concurrent_exception():
+    'Test if concurrent calls for the same key get the exception'
+
+    calls = []
+
+    def urlopen(req, timeout=None):
+        calls.append(req)
+        time.sleep(0.1)
+        raise urllib.error.URLError('failed')
+
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=urlopen))
+    errors = []
+
+    def run():
+        try:
+            endpoint(graphql_query)
+        except urllib.error.URLError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    eq_(len(calls), 1)
+    eq_(len(errors), 4)
+    eq_(len(set(errors)), 1)
+
+
+def test_cache_shared():
+    'Test if the cache may be shared amongst endpoints'
+
+    cache = ResponseCache(maxsize=1)
+    wrapped = CountingEndpoint(graphql_response_ok)
+    a = CachedEndpoint(wrapped, cache)
+    b = CachedEndpoint(wrapped, cache)
+    a(graphql_query)
+    b(graphql_query)
+    eq_(len(wrapped.calls), 1)
+    b(graphql_query, {'other': 1})  # evicts the first
+    a(graphql_query)
+    eq_(len(wrapped.calls), 3)
+    eq_(str(a), 'CachedEndpoint(endpoint=%s, cache=%s, ttl=60)' % (
+        wrapped, cache))
+
+
+def test_cache_sqlite():
+    'Test if results stored on disk are used by new endpoints'
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'cache.db')
+        wrapped = CountingEndpoint(graphql_response_ok)
+        cache = SQLiteResponseCache(path)
+        endpoint = CachedEndpoint(wrapped, cache)
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+        cache.close()
+
+        cache = TieredCache(ResponseCache(), SQLiteResponseCache(path))
+        endpoint = CachedEndpoint(wrapped, cache)
+        for i in range(3):
+            eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+        eq_(len(wrapped.calls), 1)
+        eq_(len(cache.caches[0]), 1)
+        eq_(str(cache), 'TieredCache(%s, %s)' % (
+            cache.caches[0], cache.caches[1]))
+        cache.caches[1].close()
+
+
+def test_cache_sqlite_eviction():
+    'Test if least recently used entries are removed from disk'
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'cache.db')
+        body = json.dumps({'data': {'v': list(range(100))}}).encode('utf-8')
+        compressed_size = len(zlib.compress(body))
+        assert compressed_size < len(body)
+        cache = SQLiteResponseCache(path, max_bytes=3 * compressed_size)
+        for i in range(10):
+            cache.set(str(i), CacheEntry(body, i))
+            cache.get('0')
+        eq_(cache.size, 3 * compressed_size)
+        eq_(sorted(cache.keys()), ['0', '8', '9'])
+        eq_(cache.get('9').body, body)
+
+        cache.set('big', CacheEntry(os.urandom(1000), 0))
+        assert 'big' not in cache.keys()
+        eq_(str(cache), 'SQLiteResponseCache(%r, maxsize=100000, '
+            'max_bytes=%d)' % (path, 3 * compressed_size))
+        cache.close()
+
+
+def test_cache_sqlite_threads():
+    'Test if connections are closed once their thread exits'
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = SQLiteResponseCache(os.path.join(tmpdir, 'cache.db'))
+        connections = []
+
+        def run():
+            cache.set('a', CacheEntry(b'{}', 0))
+            connections.append(cache._connection())
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        del thread
+        gc.collect()
+        try:
+            connections[0].execute('SELECT 1')
+            raise AssertionError('connection should be closed')
+        except sqlite3.ProgrammingError:
+            pass
+
+        eq_(cache.get('a').body, b'{}')
+        conn = cache._connection()
+        holder = cache._SQLiteResponseCache__local.holder
+        holder.pid = -1  # as if forked, the parent keeps it open
+        assert cache._connection() is not conn
+        del holder
+        gc.collect()
+        conn.execute('SELECT 1')
+        conn.close()
+
+        conn = cache._connection()
+        cache.close()
+        try:
+            conn.execute('SELECT 1')
+            raise AssertionError('connection should be closed')
+        except sqlite3.ProgrammingError:
+            pass
+
+
+def test_cache_sqlite_access_batch():
+    'Test if access times are written in batches and failures rolled back'
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = SQLiteResponseCache(os.path.join(tmpdir, 'cache.db'),
+                                    access_batch=2)
+        cache.set('a', CacheEntry(b'{}', 0))
+        cache.set('b', CacheEntry(b'{}', 0))
+
+        def accessed():
+            return dict(cache._connection().execute(
+                'SELECT key, accessed FROM responses'))
+
+        before = accessed()
+        cache.get('a')
+        eq_(accessed(), before)
+        cache.get('b')  # batch is full
+        after = accessed()
+        assert after['a'] > before['a'], (before, after)
+        assert after['b'] > before['b'], (before, after)
+
+        cache.get('a')
+        try:
+            cache.set('c', CacheEntry(b'{}', object()))
+            raise AssertionError('should have failed')
+        except sqlite3.Error:
+            pass
+        eq_(accessed(), after)
+        eq_(sorted(cache.keys()), ['a', 'b'])
+        cache.close()
+
+
+def test_cache_sqlite_processes():
+    'Test if many processes can use the same file'
+
+    script = '''
+import sys
+from sgqlc.endpoint.cache import SQLiteResponseCache, CacheEntry
+cache = SQLiteResponseCache(sys.argv[1])
+for i in range(50):
+    cache.set('%s-%d' % (sys.argv[2], i), CacheEntry(b'{}', i))
+    cache.get('%s-%d' % (sys.argv[2], i // 2))
+'''
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(
+        os.path.dirname(os.path.abspath(sgqlc.__file__))))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'cache.db')
+        cache = SQLiteResponseCache(path)
+        procs = [subprocess.Popen([sys.executable, '-c', script, path,
+                                   str(n)], env=env)
+                 for n in range(4)]
+        eq_([p.wait() for p in procs], [0] * 4)
+        eq_(len(cache), 200)
+        cache.close()
+
+
+def test_cache_replay():
+    'Test if replay uses expired results and ignores Cache-Control'
+
+    server = MockServer('no-store')
+    endpoint = CachedEndpoint(HTTPEndpoint(test_url, urlopen=server.urlopen),
+                              ttl=0, replay=True)
+    for i in range(3):
+        data = endpoint(graphql_query)
+        eq_(data, json.loads(graphql_response_ok))
+    eq_(len(server.requests), 1)
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import json
+import sys
+import types
+import zlib
+from unittest.mock import patch
+
+from nose.tools import eq_
+from sgqlc.endpoint.async_http import AsyncHTTPEndpoint
+from sgqlc.endpoint.compression import BrotliDecoder, DecodingReader, \
+    DeflateDecoder, ZstdDecoder, decoders, get_accept_encoding, \
+    get_content_encodings
+from sgqlc.endpoint.http import HTTPEndpoint
+from local_server import start_server, stop_server
+
+graphql_query = '{ repository { issues { nodes { number title } } } }'
+
+graphql_response_ok = json.dumps({'data': {'repository': {'issues': {
+    'nodes': [{'number': i, 'title': 'Issue %d' % (i,)}
+              for i in range(1000)],
+}}}}).encode('utf-8')
+
+graphql_response_error = b'{"errors": [{"message": "Server Reported Error"}]}'
+
+# -- Test Helpers --
+
+
+def fake_zstandard():
+    'Module with the zstandard API, decompressing zlib instead'
+    decompressor = types.SimpleNamespace(decompressobj=zlib.decompressobj)
+    return types.SimpleNamespace(ZstdDecompressor=lambda: decompressor)
+
+
+class FakeBrotliDecompressor:
+    'Decompressor with the brotlicffi API, decompressing zlib instead'
+
+    def __init__(self):
+        self.decompress = zlib.decompressobj().decompress
+
+
+# -- Actual Tests --
+
+
+def test_accept_encoding():
+    'Test if compressed responses are requested and decompressed'
+
+    server = start_server(graphql_response_ok, encoding='accept')
+    try:
+        for pool in (None, True):
+            endpoint = HTTPEndpoint(server.url, pool=pool)
+            data = endpoint(graphql_query)
+            eq_(data, json.loads(graphql_response_ok))
+            eq_(server.headers[-1]['Accept-Encoding'],
+                get_accept_encoding())
+    finally:
+        stop_server(server)
+
+
+def test_accept_encoding_disabled():
+    'Test if Accept-Encoding may be given or disabled'
+
+    server = start_server(graphql_response_ok, encoding='accept')
+    try:
+        endpoint = HTTPEndpoint(server.url, accept_encoding=False)
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+        # http.client sends identity if not given
+        eq_(server.headers[-1]['Accept-Encoding'], 'identity')
+
+        endpoint = HTTPEndpoint(server.url, accept_encoding='deflate')
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+        eq_(server.headers[-1]['Accept-Encoding'], 'deflate')
+
+        endpoint = HTTPEndpoint(server.url)
+        eq_(endpoint(graphql_query, extra_headers={
+            'Accept-Encoding': 'identity',
+        }), json.loads(graphql_response_ok))
+        eq_(server.headers[-1]['Accept-Encoding'], 'identity')
+    finally:
+        stop_server(server)
+
+
+def test_deflate():
+    'Test if deflate responses are decompressed'
+
+    server = start_server(graphql_response_ok, encoding='deflate')
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+    finally:
+        stop_server(server)
+
+
+def test_streaming():
+    'Test if compressed responses are parsed while decompressed'
+
+    server = start_server(graphql_response_ok, encoding='gzip')
+    try:
+        nodes = []
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        data = endpoint(graphql_query, callbacks={
+            'data.repository.issues.nodes': nodes.append,
+        })
+        eq_(nodes, json.loads(graphql_response_ok)['data']['repository'][
+            'issues']['nodes'])
+        eq_(data, {'data': {'repository': {'issues': {'nodes': []}}}})
+
+        endpoint = HTTPEndpoint(server.url, streaming=True)
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+    finally:
+        stop_server(server)
+
+
+def test_error():
+    'Test if compressed HTTP error bodies are decompressed'
+
+    server = start_server(encoding='gzip')
+    server.responses.append((400, graphql_response_error))
+    try:
+        endpoint = HTTPEndpoint(server.url)
+        data = endpoint(graphql_query)
+        eq_(data['errors'][0]['message'], 'Server Reported Error')
+        eq_(data['status'], 400)
+    finally:
+        stop_server(server)
+
+
+def test_batch():
+    'Test if compressed batch responses are decompressed'
+
+    body = b'[' + graphql_response_ok + b',' + graphql_response_ok + b']'
+    server = start_server(body, encoding='gzip')
+    try:
+        endpoint = HTTPEndpoint(server.url)
+        eq_(endpoint.execute_batch([graphql_query, graphql_query]),
+            [json.loads(graphql_response_ok)] * 2)
+    finally:
+        stop_server(server)
+
+
+def test_compress_requests():
+    'Test if POST bodies larger than the threshold are compressed'
+
+    server = start_server(graphql_response_ok, encoding='accept')
+    try:
+        variables = {'titles': ['Issue %d' % (i,) for i in range(1000)]}
+        endpoint = HTTPEndpoint(server.url, compress_requests=1024)
+        endpoint(graphql_query, variables)
+        eq_(server.requests[-1]['variables'], variables)
+        eq_(server.headers[-1]['Content-Encoding'], 'gzip')
+        assert server.request_sizes[-1] < len(json.dumps(variables)) / 5
+
+        endpoint(graphql_query)  # small: not compressed
+        assert 'Content-Encoding' not in server.headers[-1]
+
+        endpoint.execute_batch([(graphql_query, variables)] * 2)
+        eq_(server.headers[-1]['Content-Encoding'], 'gzip')
+        eq_(server.requests[-1][1]['variables'], variables)
+    finally:
+        stop_server(server)
+
+
+def test_async():
+    'Test if AsyncHTTPEndpoint decompresses the responses'
+
+    server = start_server(graphql_response_ok, encoding='gzip')
+    try:
+        async def run():
+            endpoint = AsyncHTTPEndpoint(server.url, compress_requests=0)
+            try:
+                return await endpoint(graphql_query, {'a': 1})
+            finally:
+                endpoint.pool.close()
+
+        eq_(asyncio.run(run()), json.loads(graphql_response_ok))
+        eq_(server.requests[-1]['variables'], {'a': 1})
+        eq_(server.headers[-1]['Content-Encoding'], 'gzip')
+    finally:
+        stop_server(server)
+
+
+def test_content_encodings():
+    'Test if unknown encodings leave the body as is'
+
+    eq_(get_content_encodings({'Content-Encoding': 'GZIP, identity'}),
+        ['gzip'])
+    eq_(get_content_encodings({}), [])
+    eq_(get_content_encodings('gzip, unknown'), [])
+    eq_(get_content_encodings(', '), [])
+
+
+def test_deflate_empty():
+    'Test if empty deflate responses are accepted'
+
+    f = DecodingReader(io.BytesIO(b''), ['deflate'])
+    eq_(f.read(10), b'')
+    eq_(f.read(), b'')
+
+    decoder = DeflateDecoder()
+    eq_(decoder.decompress(b''), b'')
+    eq_(decoder.flush(), b'')
+
+
+def test_optional_decoders():
+    'Test if zstd and br are decoded with their optional modules'
+
+    body = b'{"data": {"name": "sgqlc"}}'
+    with patch.dict(sys.modules, {'zstandard': fake_zstandard()}):
+        decoder = ZstdDecoder()
+        eq_(decoder.decompress(zlib.compress(body)), body)
+        eq_(decoder.decompress(b''), b'')
+
+    brotlicffi = types.SimpleNamespace(Decompressor=FakeBrotliDecompressor)
+    with patch.dict(sys.modules, {'brotli': None, 'brotlicffi': brotlicffi}):
+        decoder = BrotliDecoder()
+        eq_(decoder.process(zlib.compress(body)), body)
+
+    with patch.dict(sys.modules, {'zstandard': fake_zstandard()}), \
+            patch.dict(decoders, {'zstd': ZstdDecoder}):
+        f = DecodingReader(io.BytesIO(zlib.compress(body)), ['zstd'])
+        eq_(f.read(), body)
@@ -0,0 +1,222 @@
+import asyncio
+import http.client
+import io
+import json
+import threading
+import urllib.error
+
+from nose.tools import eq_
+from sgqlc.endpoint.http import HTTPEndpoint
+from sgqlc.endpoint.async_http import AsyncHTTPEndpoint
+
+test_url = 'http://some-server.com/graphql'
+
+graphql_query = 'query Op($i: Int) { echo(i: $i) }'
+
+graphql_response_error = b'{"errors": [{"message": "Server Reported Error"}]}'
+
+# -- Test Helpers --
+
+
+class MockServer:
+    '''Reply like a server echoing ``$i``, as ``urlopen()`` or a pool.
+
+    Replies ``responses``, as ``(status, body)``, if any were queued.
+    '''
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.error = None
+
+    def reply(self, req):
+        request = json.loads(req.data)
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        if self.responses:
+            return self.responses.pop(0)
+        if isinstance(request, list):
+            return 200, json.dumps(
+                [self.echo(r) for r in request]).encode('utf-8')
+        return 200, json.dumps(self.echo(request)).encode('utf-8')
+
+    @staticmethod
+    def echo(request):
+        variables = request['variables'] or {}
+        if variables.get('fail'):
+            return {'data': None, 'errors': [{'message': 'failed'}]}
+        return {'data': {'echo': variables.get('i')}}
+
+    @staticmethod
+    def get_headers():
+        headers = http.client.HTTPMessage()
+        headers['Content-Type'] = 'application/json'
+        return headers
+
+    def urlopen(self, req, timeout=None):
+        status, body = self.reply(req)
+        if status >= 400:
+            raise urllib.error.HTTPError(req.full_url, status, 'Error',
+                                         self.get_headers(), io.BytesIO(body))
+        return io.BytesIO(body)
+
+    async def request(self, req):
+        status, body = self.reply(req)
+        return status, 'OK', self.get_headers(), body
+
+
+# -- Actual Tests --
+
+
+def test_execute_batch():
+    'Test if execute_batch() sends a single request and splits results'
+
+    server = MockServer()
+    endpoint = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    results = endpoint.execute_batch([
+        graphql_query,
+        (graphql_query.encode('utf-8'), {'i': 1}),
+        (graphql_query, {'i': 2, 'fail': True}, 'Op'),
+    ], extra_headers={'X-Test': '1'})
+    eq_(results, [
+        {'data': {'echo': None}},
+        {'data': {'echo': 1}},
+        {'data': None, 'errors': [{'message': 'failed'}]},
+    ])
+    eq_(server.requests, [[
+        {'query': graphql_query, 'variables': None,
+         'operationName': None},
+        {'query': graphql_query, 'variables': {'i': 1},
+         'operationName': None},
+        {'query': graphql_query, 'variables': {'i': 2, 'fail': True},
+         'operationName': 'Op'},
+    ]])
+
+
+def test_execute_batch_not_supported():
+    'Test if servers rejecting the batch report error to every operation'
+
+    server = MockServer()
+    server.responses.append((400, graphql_response_error))
+    server.responses.append((200, graphql_response_error))
+    endpoint = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    results = endpoint.execute_batch([graphql_query, graphql_query])
+    eq_(len(results), 2)
+    for data in results:
+        assert isinstance(data.pop('exception'), urllib.error.HTTPError)
+        eq_(data.pop('status'), 400)
+        eq_(data.pop('headers')['Content-Type'], 'application/json')
+        eq_(data, json.loads(graphql_response_error))
+
+    results = endpoint.execute_batch([graphql_query, graphql_query])
+    eq_(results, [json.loads(graphql_response_error)] * 2)
+
+
+def test_execute_batch_invalid_response():
+    'Test if batch responses that are not a list of results are handled'
+
+    server = MockServer()
+    server.responses.append((200, b'[{"data": {}}]'))
+    server.responses.append((200, b'[{'))
+    endpoint = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    results = endpoint.execute_batch([graphql_query, graphql_query])
+    eq_(results, [{'data': None, 'errors': [{
+        'message': 'expected a list of 2 results',
+        'body': '[{"data": {}}]',
+    }]}] * 2)
+
+    results = endpoint.execute_batch([graphql_query, graphql_query])
+    for data in results:
+        exc = data['errors'][0].pop('exception')
+        assert isinstance(exc, json.JSONDecodeError), exc
+        eq_(data, {'data': None, 'errors': [{
+            'message': str(exc),
+            'body': '[{',
+        }]})
+
+
+def test_batch_size():
+    'Test if concurrent calls are coalesced in batches'
+
+    server = MockServer()
+    endpoint = HTTPEndpoint(test_url, urlopen=server.urlopen,
+                            batch_size=4, batch_window=0.2)
+    eq_(str(endpoint.batcher), 'QueryBatcher(size=4, window=0.2)')
+    ops = [(graphql_query, {'i': i}) for i in range(10)]
+    results = list(endpoint.execute_many(ops, max_concurrency=10))
+    eq_(results, [{'data': {'echo': i}} for i in range(10)])
+
+    sizes = [len(r) if isinstance(r, list) else 1
+             for r in server.requests]
+    eq_(sum(sizes), 10)
+    assert max(sizes) <= 4, sizes
+    assert len(sizes) < 10, sizes
+
+
+def test_batch_size_single_call():
+    'Test if calls that were not coalesced are sent as regular requests'
+
+    server = MockServer()
+    endpoint = HTTPEndpoint(test_url, urlopen=server.urlopen,
+                            batch_size=4, batch_window=0)
+    eq_(endpoint(graphql_query, {'i': 1}), {'data': {'echo': 1}})
+    eq_(endpoint(graphql_query, {'i': 2}, extra_headers={'X-Test': '1'}),
+        {'data': {'echo': 2}})
+    eq_(server.requests, [
+        {'query': graphql_query, 'variables': {'i': 1},
+         'operationName': None},
+        {'query': graphql_query, 'variables': {'i': 2},
+         'operationName': None},
+    ])
+
+    endpoint = HTTPEndpoint(test_url, batch_size=4, method='GET')
+    eq_(endpoint.batcher, None)
+
+
+def test_batch_size_connection_error():
+    'Test if connection errors are raised to all coalesced calls'
+
+    server = MockServer()
+    server.error = ConnectionRefusedError()
+    endpoint = HTTPEndpoint(test_url, urlopen=server.urlopen, batch_size=4,
+                            batch_window=0.2)
+    errors = []
+
+    def run(i):
+        try:
+            endpoint(graphql_query, {'i': i})
+        except OSError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    eq_(len(errors), 4)
+
+
+def test_async_execute_batch():
+    'Test if AsyncHTTPEndpoint.execute_batch() works'
+
+    server = MockServer()
+    server.responses.append((400, graphql_response_error))
+    endpoint = AsyncHTTPEndpoint(test_url, pool=server)
+
+    async def fetch():
+        failed = await endpoint.execute_batch([graphql_query])
+        ok = await endpoint.execute_batch(
+            [(graphql_query, {'i': i}) for i in range(3)])
+        return failed, ok
+
+    loop = asyncio.new_event_loop()
+    try:
+        failed, ok = loop.run_until_complete(fetch())
+    finally:
+        loop.close()
+
+    eq_(failed[0]['status'], 400)
+    eq_(failed[0]['errors'], [{'message': 'Server Reported Error'}])
+    eq_(ok, [{'data': {'echo': i}} for i in range(3)])
@@ -0,0 +1,270 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from local_server import graphql_response_ok, start_server, stop_server
+from nose.tools import eq_
+from sgqlc.endpoint.http import HTTPEndpoint, HTTPConnectionPool
+
+graphql_query = '{ repository { name } }'
+
+graphql_mutation = 'mutation { renameRepository { name } }'
+
+graphql_response_error = b'{"errors": [{"message": "Server Reported Error"}]}'
+
+# -- Actual Tests --
+
+
+def test_pool_reuses_connection():
+    'Test if sequential requests share a single connection'
+
+    server = start_server()
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        assert isinstance(endpoint.pool, HTTPConnectionPool)
+        for i in range(5):
+            data = endpoint(graphql_query, {'i': i})
+            eq_(data, json.loads(graphql_response_ok))
+
+        eq_(len(server.peers), 1)
+        eq_([r['variables'] for r in server.requests],
+            [{'i': i} for i in range(5)])
+        eq_(server.requests[0]['query'], graphql_query)
+        endpoint.pool.close()
+    finally:
+        stop_server(server)
+
+
+def test_pool_shared():
+    'Test if a pool instance can be shared amongst endpoints'
+
+    server = start_server()
+    try:
+        pool = HTTPConnectionPool(maxsize=1)
+        eq_(str(pool), 'HTTPConnectionPool(maxsize=1, idle_timeout=60)')
+        e1 = HTTPEndpoint(server.url, pool=pool)
+        e2 = HTTPEndpoint(server.url + '?other=1', pool=pool)
+        eq_(e1(graphql_query), e2(graphql_query))
+        eq_(len(server.peers), 1)
+        pool.close()
+    finally:
+        stop_server(server)
+
+
+def test_pool_idle_timeout():
+    'Test if idle connections are evicted'
+
+    server = start_server()
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=HTTPConnectionPool(
+            idle_timeout=0))
+        for i in range(3):
+            endpoint(graphql_query)
+
+        eq_(len(server.peers), 3)
+    finally:
+        stop_server(server)
+
+
+def test_pool_server_closed_connection():
+    'Test if requests are retried if server closed the connection'
+
+    server = start_server(mode='drop')
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        for i in range(3):
+            data = endpoint(graphql_query)
+            eq_(data, json.loads(graphql_response_ok))
+
+        eq_(len(server.requests), 3)
+        eq_(len(server.peers), 3)
+    finally:
+        stop_server(server)
+
+
+def test_pool_server_hangup():
+    'Test if only queries are sent again if the response was lost'
+
+    server = start_server()
+    server.responses.extend([
+        (200, graphql_response_ok),
+        (200, b'', 'hangup'),
+        (200, graphql_response_ok),
+        (200, b'', 'hangup'),
+    ])
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        endpoint(graphql_query)
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+        eq_(len(server.requests), 3)
+
+        try:
+            endpoint(graphql_mutation)
+            assert False, 'should have raised'
+        except ConnectionError:
+            pass
+        eq_(len(server.requests), 4)  # server may have processed it
+    finally:
+        stop_server(server)
+
+
+def test_pool_server_hangup_request():
+    'Test if plain requests are sent again only if GET or HEAD'
+
+    server = start_server()
+    server.responses.extend([
+        (200, graphql_response_ok),
+        (200, b'', 'hangup'),
+        (200, graphql_response_ok),
+        (200, b'', 'hangup'),
+    ])
+    try:
+        pool = HTTPConnectionPool()
+        req = urllib.request.Request(server.url + '?query=x')
+        for i in range(2):
+            with pool(req) as f:
+                eq_(f.read(), graphql_response_ok)
+        eq_(len(server.requests), 3)
+
+        try:
+            pool(urllib.request.Request(server.url, b'{}'))
+            assert False, 'should have raised'
+        except ConnectionError:
+            pass
+        eq_(len(server.requests), 4)
+        pool.close()
+    finally:
+        stop_server(server)
+
+
+def test_pool_maxsize():
+    'Test if concurrent requests wait for a free connection'
+
+    server = start_server()
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=HTTPConnectionPool(
+            maxsize=2))
+        results = []
+
+        def run():
+            for i in range(5):
+                results.append(endpoint(graphql_query))
+
+        threads = [threading.Thread(target=run) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        eq_(len(results), 20)
+        eq_(len(server.requests), 20)
+        assert len(server.peers) <= 2, server.peers
+    finally:
+        stop_server(server)
+
+
+def test_pool_http_error():
+    'Test if HTTP errors are handled as with urlopen()'
+
+    server = start_server()
+    server.responses.append((400, graphql_response_error))
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        data = endpoint(graphql_query)
+        exc = data.pop('exception')
+        assert isinstance(exc, urllib.error.HTTPError), exc
+        eq_(data.pop('status'), 400)
+        eq_(data.pop('headers')['Content-Type'], 'application/json')
+        eq_(data, json.loads(graphql_response_error))
+
+        # connection was given back and is still usable
+        eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+        eq_(len(server.peers), 1)
+    finally:
+        stop_server(server)
+
+
+def test_pool_partial_read():
+    'Test if responses not fully read do not return connection to the pool'
+
+    server = start_server()
+    try:
+        pool = HTTPConnectionPool()
+        req = urllib.request.Request(
+            server.url, data=b'{}', method='POST',
+            headers={'Content-Type': 'application/json'})
+        with pool(req, timeout=5) as f:
+            eq_(f.getcode(), 200)
+            eq_(f.geturl(), server.url)
+            eq_(f.getheader('Content-Type'), 'application/json')
+            eq_(f.info()['Content-Type'], 'application/json')
+            eq_(f.read(1), b'{')
+
+        f.close()  # closing twice is harmless
+        with pool(req) as f:
+            eq_(f.read(), graphql_response_ok)
+
+        eq_(len(server.peers), 2)
+    finally:
+        stop_server(server)
+
+
+def test_pool_connection_error():
+    'Test if connection errors are raised and connection is given back'
+
+    server = start_server()
+    url = server.url
+    stop_server(server)
+
+    pool = HTTPConnectionPool(maxsize=1)
+    req = urllib.request.Request(url, data=b'{}', method='POST')
+    for i in range(2):
+        try:
+            pool(req)
+            assert False, 'should have raised'
+        except OSError:
+            pass
+
+
+def test_pool_https_connection():
+    'Test if HTTPS connections are created for https URLs'
+
+    pool = HTTPConnectionPool()
+    conn = pool._create_connection(('https', 'example.com', None))
+    eq_(conn.__class__.__name__, 'HTTPSConnection')
+    eq_(conn.port, 443)
+
+
+def test_execute_many():
+    'Test if execute_many() returns results in order, bounded concurrency'
+
+    server = start_server()
+    try:
+        endpoint = HTTPEndpoint(server.url, pool=True)
+        delays = [0.05, 0.01, 0.03, 0, 0.02, 0.01, 0, 0.04]
+        consumed = []
+
+        def operations():
+            for i, delay in enumerate(delays):
+                # backpressure: not too far ahead of the consumer
+                assert i - len(consumed) <= 3, (i, consumed)
+                if i % 2:
+                    yield (graphql_query, {'i': i, 'delay': delay})
+                else:
+                    yield (graphql_query, {'i': i, 'delay': delay}, 'Op')
+
+        for data in endpoint.execute_many(operations(), max_concurrency=3):
+            consumed.append(data['data']['i'])
+
+        eq_(consumed, list(range(len(delays))))
+        eq_(sorted((r['variables']['i'], r.get('operationName'))
+                   for r in server.requests)[:2],
+            [(0, 'Op'), (1, None)])
+        assert len(server.peers) <= 3, server.peers
+
+        eq_(list(endpoint.execute_many([graphql_query] * 2)),
+            [json.loads(graphql_response_ok)] * 2)
+        eq_(list(endpoint.execute_many([])), [])
+    finally:
+        stop_server(server)
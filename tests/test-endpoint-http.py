@@ -1,10 +1,16 @@
+import hashlib
 import io
 import json
+import os
+import subprocess
+import sys
 import urllib.error
 import urllib.request
 
+import sgqlc
 from nose.tools import eq_
 from unittest.mock import patch
+from sgqlc.codec import JSONCodec
 from sgqlc.endpoint.http import HTTPEndpoint, add_query_to_url
 from sgqlc.types import Schema, Type, Field, String, ArgDict, Arg, Input, Enum
 from sgqlc.operation import Operation
@@ -631,10 +637,287 @@ def test_server_http_error_list_message(mock_urlopen):
     check_mock_urlopen(mock_urlopen)
 
 
+graphql_response_persisted_query_not_found = b'''
+{
+  "errors": [{
+    "message": "PersistedQueryNotFound",
+    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}
+  }]
+}'''
+
+graphql_response_persisted_query_not_supported = b'''
+{
+  "errors": [{"message": "PersistedQueryNotSupported"}]
+}'''
+
+
+def get_request_payload(req):
+    if req.method == 'POST':
+        return json.loads(req.data)
+    payload = get_request_url_query(req)
+    payload['extensions'] = json.loads(payload['extensions'])
+    return payload
+
+
+def check_persisted_query(req, query, query_sent):
+    payload = get_request_payload(req)
+    eq_(payload['extensions'], {'persistedQuery': {
+        'version': 1,
+        'sha256Hash': hashlib.sha256(query.encode('utf-8')).hexdigest(),
+    }})
+    if query_sent:
+        eq_(payload['query'], query)
+    else:
+        assert 'query' not in payload, payload
+
+
+@patch('urllib.request.urlopen')
+def test_persisted_query_found(mock_urlopen):
+    'Test if persisted queries known by the server only send the hash'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_ok)
+
+    endpoint = HTTPEndpoint(test_url, persisted_queries=True)
+    data = endpoint(graphql_query, {'repoOwner': 'owner'})
+    eq_(data, json.loads(graphql_response_ok))
+    eq_(mock_urlopen.call_count, 1)
+    req = mock_urlopen.call_args[0][0]
+    check_persisted_query(req, graphql_query, False)
+    check_request_variables(req, {'repoOwner': 'owner'})
+
+
+@patch('urllib.request.urlopen')
+def test_persisted_query_not_found(mock_urlopen):
+    'Test if persisted queries fallback to send the query'
+
+    for method in ('POST', 'GET'):
+        mock_urlopen.reset_mock()
+        mock_urlopen.side_effect = [
+            io.BytesIO(graphql_response_persisted_query_not_found),
+            io.BytesIO(graphql_response_ok),
+        ]
+
+        endpoint = HTTPEndpoint(test_url, method=method,
+                                persisted_queries=True)
+        data = endpoint(graphql_query, operation_name='GitHubRepoIssues')
+        eq_(data, json.loads(graphql_response_ok))
+        eq_(mock_urlopen.call_count, 2)
+        first, second = (c[0][0] for c in mock_urlopen.call_args_list)
+        eq_(first.method, method)
+        check_persisted_query(first, graphql_query, False)
+        check_persisted_query(second, graphql_query, True)
+        check_request_operation_name(second, 'GitHubRepoIssues')
+
+
+@patch('urllib.request.urlopen')
+def test_persisted_query_not_supported(mock_urlopen):
+    'Test if persisted queries are disabled if not supported by server'
+
+    mock_urlopen.side_effect = [
+        io.BytesIO(graphql_response_persisted_query_not_supported),
+        io.BytesIO(graphql_response_ok),
+        io.BytesIO(graphql_response_ok),
+    ]
+
+    endpoint = HTTPEndpoint(test_url, persisted_queries=True)
+    eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+    eq_(endpoint.persisted_queries, False)
+    eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+    eq_(mock_urlopen.call_count, 3)
+    check_mock_urlopen(mock_urlopen)
+
+
+@patch('urllib.request.urlopen')
+def test_persisted_query_operation(mock_urlopen):
+    'Test if persisted queries use the operation hash'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_ok)
+
+    schema = Schema()
+
+    # Query may be declared if doctests were processed by nose
+    if 'Query' in schema:
+        schema -= schema.Query
+
+    class Query(Type):
+        __schema__ = schema
+        a = String
+
+    op = Operation(Query)
+    op.a()
+    query = bytes(op).decode('utf-8')
+    eq_(op.__sha256__, hashlib.sha256(bytes(op)).hexdigest())
+    assert op.__sha256__ is op.__sha256__
+
+    endpoint = HTTPEndpoint(test_url, persisted_queries=True)
+    endpoint(op)
+    check_persisted_query(mock_urlopen.call_args[0][0], query, False)
+
+
+@patch('urllib.request.urlopen')
+def test_persisted_query_error(mock_urlopen):
+    'Test if other errors are returned without sending the query'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_error)
+
+    endpoint = HTTPEndpoint(test_url, persisted_queries=True)
+    data = endpoint(graphql_query)
+    eq_(data, json.loads(graphql_response_error))
+    eq_(mock_urlopen.call_count, 1)
+
+
+@patch('urllib.request.urlopen')
+def test_streaming(mock_urlopen):
+    'Test if incremental parsing returns the same data'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_ok)
+
+    endpoint = HTTPEndpoint(test_url, streaming=True)
+    data = endpoint(graphql_query)
+    eq_(data, json.loads(graphql_response_ok))
+    check_mock_urlopen(mock_urlopen)
+
+
+@patch('urllib.request.urlopen')
+def test_streaming_callbacks(mock_urlopen):
+    'Test if callbacks are given the sub-trees instead of the result'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_ok)
+
+    nodes = []
+    endpoint = HTTPEndpoint(test_url, batch_size=2)
+    data = endpoint(graphql_query, callbacks={
+        'data.repository.issues.nodes': nodes.append,
+    })
+    eq_(data, {'data': {'repository': {'issues': {'nodes': []}}}})
+    eq_(nodes, json.loads(graphql_response_ok)[
+        'data']['repository']['issues']['nodes'])
+    check_mock_urlopen(mock_urlopen)
+
+
+@patch('urllib.request.urlopen')
+def test_streaming_json_error(mock_urlopen):
+    'Test if incremental parsing handles invalid JSON'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_json_error)
+
+    endpoint = HTTPEndpoint(test_url, streaming=True)
+    data = endpoint(graphql_query)
+    exc = data['errors'][0]['exception']
+    assert isinstance(exc, json.JSONDecodeError), exc
+    eq_(data['data'], None)
+    eq_(data['errors'][0]['message'], str(exc))
+
+
+@patch('urllib.request.urlopen')
+def test_streaming_server_reported_error(mock_urlopen):
+    'Test if incremental parsing handles GraphQL errors'
+
+    configure_mock_urlopen(mock_urlopen, graphql_response_error)
+
+    endpoint = HTTPEndpoint(test_url, streaming=True)
+    data = endpoint(graphql_query)
+    eq_(data, json.loads(graphql_response_error))
+
+
+@patch('urllib.request.urlopen')
+def test_codec(mock_urlopen):
+    'Test if the given JSON codec encodes requests and decodes responses'
+
+    class Codec(JSONCodec):
+        calls = []
+
+        def loads(self, data):
+            self.calls.append(('loads', type(data)))
+            return super(Codec, self).loads(data)
+
+        def dumps(self, obj, **kwargs):
+            self.calls.append(('dumps', type(obj)))
+            return super(Codec, self).dumps(obj, **kwargs)
+
+        def dumpb(self, obj, **kwargs):
+            self.calls.append(('dumpb', type(obj)))
+            return super(Codec, self).dumpb(obj, **kwargs)
+
+    variables = {'repoOwner': 'owner', 'repoName': 'name'}
+    for method in ('POST', 'GET'):
+        configure_mock_urlopen(mock_urlopen, graphql_response_ok)
+        endpoint = HTTPEndpoint(test_url, method=method, codec=Codec())
+        data = endpoint(graphql_query, variables)
+        eq_(data, json.loads(graphql_response_ok))
+        check_mock_urlopen(mock_urlopen, method=method, variables=variables)
+
+    eq_(Codec.calls, [('dumpb', dict), ('loads', bytes),
+                      ('dumps', dict), ('loads', bytes)])
+
+
+@patch('urllib.request.urlopen')
+def test_codec_json_error(mock_urlopen):
+    'Test if invalid JSON is handled by every codec'
+
+    for codec in (None, 'json', 'orjson'):
+        try:
+            endpoint = HTTPEndpoint(test_url, codec=codec)
+        except ImportError:  # optional dependency
+            continue
+        configure_mock_urlopen(mock_urlopen, graphql_response_json_error)
+        data = endpoint(graphql_query)
+        exc = data['errors'][0].pop('exception')
+        assert isinstance(exc, json.JSONDecodeError), exc
+        eq_(data, {
+            'errors': [{
+                'message': str(exc),
+                'body': graphql_response_json_error.decode('utf-8'),
+            }],
+            'data': None,
+        })
+
+    body = graphql_response_json_error.decode('utf-8')
+    data = endpoint._decode_http_response(graphql_query, body)
+    eq_(data['errors'][0]['body'], body)
+
+
+@patch('urllib.request.urlopen')
+def test_codec_default(mock_urlopen):
+    'Test if the standard json module is the default, orjson is opt-in'
+
+    body = b'{"data": {"big": 1180591620717411303424}}'
+    configure_mock_urlopen(mock_urlopen, body)
+    data = HTTPEndpoint(test_url)(graphql_query)
+    eq_(data['data']['big'], 2**70)
+
+    try:
+        import orjson  # noqa: F401
+        opt_in = 'orjson'
+    except ImportError:  # optional dependency
+        opt_in = 'json'
+
+    script = 'from sgqlc.codec import get_codec; print(get_codec().name)'
+    path = os.path.dirname(os.path.dirname(os.path.abspath(sgqlc.__file__)))
+    for value, expected in (('', 'json'), ('orjson', opt_in)):
+        env = dict(os.environ, SGQLC_JSON_CODEC=value, PYTHONPATH=path)
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         env=env)
+        eq_(output.decode('utf-8').strip(), expected)
+
+
 # add_query_to_url():
 # test paths not already tested, here just the repeated query
 
 
+@patch('urllib.request.urlopen')
+def test_execute_many_close(mock_urlopen):
+    'Test if pending operations are cancelled once execute_many() is closed'
+
+    mock_urlopen.side_effect = lambda *a, **kw: io.BytesIO(graphql_response_ok)
+
+    endpoint = HTTPEndpoint(test_url)
+    results = endpoint.execute_many([graphql_query] * 10, max_concurrency=2)
+    eq_(next(results), json.loads(graphql_response_ok))
+    results.close()
+    assert mock_urlopen.call_count <= 3, mock_urlopen.call_count
+
+
 def test_add_query_to_url_dict_of_list():
     'Test if add_query_to_url() with extra_query as a dict-of-list works'
 
@@ -0,0 +1,245 @@
+import http.client
+import io
+import json
+import threading
+import time
+import urllib.error
+
+from nose.tools import eq_
+from sgqlc.endpoint.base import BaseEndpoint
+from sgqlc.endpoint.http import HTTPEndpoint
+from sgqlc.endpoint.ratelimit import RateLimitedEndpoint
+
+test_url = 'http://some-server.com/graphql'
+
+graphql_query = '{ viewer { login } }'
+
+graphql_response_ok = b'{"data": {"viewer": {"login": "sgqlc"}}}'
+
+graphql_response_limited = b'''{"errors": [{
+  "message": "You have exceeded a secondary rate limit."
+}]}'''
+
+# -- Test Helpers --
+
+
+class MockResponse(io.BytesIO):
+    def __init__(self, body, headers):
+        super().__init__(body)
+        self.status = 200
+        self.headers = headers
+
+
+class MockServer:
+    '''Reply the queued ``(status, headers, body)`` as ``urlopen()``.
+
+    Once ``responses`` are exhausted, replies ``graphql_response_ok``
+    with ``headers``. The time of each request is kept in ``requests``.
+    '''
+
+    def __init__(self, responses=(), headers=None):
+        self.responses = list(responses)
+        self.headers = headers or {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def urlopen(self, req, timeout=None):
+        with self.lock:
+            self.requests.append(time.time())
+            if self.responses:
+                status, headers, body = self.responses.pop(0)
+            else:
+                status, headers, body = 200, self.headers, graphql_response_ok
+
+        message = http.client.HTTPMessage()
+        message['Content-Type'] = 'application/json'
+        for k, v in headers.items():
+            message[k] = v
+        if status >= 400:
+            raise urllib.error.HTTPError(req.full_url, status, 'Error',
+                                         message, io.BytesIO(body))
+        return MockResponse(body, message)
+
+
+def rate_limit_headers(remaining, reset, limit=5000):
+    return {
+        'X-RateLimit-Limit': str(limit),
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Used': str(limit - remaining),
+        'X-RateLimit-Reset': str(int(reset)),
+        'X-RateLimit-Resource': 'graphql',
+    }
+
+
+class FakeEndpoint(BaseEndpoint):
+    def __init__(self, results=(), duration=0):
+        self.results = list(results)
+        self.duration = duration
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query, variables=None, operation_name=None):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.duration)
+        with self.lock:
+            self.running -= 1
+            if self.results:
+                return self.results.pop(0)
+        return json.loads(graphql_response_ok)
+
+
+# -- Actual Tests --
+
+
+def test_budget_headers():
+    'Test if X-RateLimit-* headers are exposed and pace the calls'
+
+    reset = time.time() + 100
+    server = MockServer(headers=rate_limit_headers(200, reset))
+    wrapped = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    endpoint = RateLimitedEndpoint(wrapped, rate=100)
+    eq_(endpoint.budget.remaining, None)
+    eq_(endpoint.budget.rate, 100)
+
+    response = {}
+    data = endpoint(graphql_query, response=response)
+    eq_(data, json.loads(graphql_response_ok))
+    eq_(response['status'], 200)
+
+    budget = endpoint.budget
+    eq_(budget.limit, 5000)
+    eq_(budget.remaining, 200)
+    eq_(budget.used, 4800)
+    eq_(budget.reset, float(int(reset)))
+    eq_(budget.resource, 'graphql')
+    eq_(budget.in_flight, 0)
+    eq_(budget.paused_until, None)
+    assert 1.9 < budget.rate < 2.1, budget  # 200 calls in 100s
+    eq_(endpoint.bucket.rate, budget.rate)
+    assert 'remaining=200' in repr(budget)
+
+    endpoint.reserve = 100  # keep half to others
+    endpoint(graphql_query)
+    assert 0.9 < endpoint.budget.rate < 1.1, endpoint.budget
+
+
+def test_budget_exhausted():
+    'Test if calls are paused until the budget is reset'
+
+    reset = int(time.time()) + 1
+    server = MockServer([(200, rate_limit_headers(0, reset), b'{}')])
+    wrapped = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    endpoint = RateLimitedEndpoint(wrapped)
+    endpoint(graphql_query)
+    eq_(endpoint.budget.paused_until, reset)
+
+    endpoint(graphql_query)
+    assert server.requests[-1] >= reset, (server.requests, reset)
+    assert endpoint.waited > 0
+    eq_(endpoint.retries, 0)
+
+
+def test_budget_exhausted_error():
+    'Test if rate limited calls without Retry-After wait for the reset'
+
+    reset = int(time.time()) + 1
+    server = MockServer([
+        (403, rate_limit_headers(0, reset), graphql_response_limited),
+    ])
+    wrapped = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    endpoint = RateLimitedEndpoint(wrapped)
+    eq_(endpoint(graphql_query), json.loads(graphql_response_ok))
+    eq_(endpoint.retries, 1)
+    assert server.requests[-1] >= reset, (server.requests, reset)
+
+
+def test_retry_after():
+    'Test if 429 Too Many Requests is retried after Retry-After'
+
+    server = MockServer([
+        (429, {'Retry-After': '1'}, graphql_response_limited),
+    ])
+    wrapped = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    endpoint = RateLimitedEndpoint(wrapped)
+    data = endpoint(graphql_query)
+    eq_(data, json.loads(graphql_response_ok))
+    eq_(endpoint.retries, 1)
+    eq_(len(server.requests), 2)
+    assert server.requests[1] - server.requests[0] >= 0.9
+
+
+def test_secondary_limit():
+    'Test if 403 secondary limits back off and give up after max_retries'
+
+    server = MockServer([
+        (403, {'Retry-After': '0'}, graphql_response_limited),
+        (403, rate_limit_headers(0, 0), graphql_response_limited),
+        (403, {}, graphql_response_limited),  # not rate limited
+        (403, {'Retry-After': '0'}, graphql_response_limited),
+        (403, {'Retry-After': '0'}, graphql_response_limited),
+    ])
+    wrapped = HTTPEndpoint(test_url, urlopen=server.urlopen)
+    endpoint = RateLimitedEndpoint(wrapped, max_retries=1, backoff=0.1)
+    data = endpoint(graphql_query)  # retried once, then gives up
+    eq_(data['errors'][0]['message'],
+        'You have exceeded a secondary rate limit.')
+    eq_(endpoint.retries, 1)
+
+    data = endpoint(graphql_query)
+    eq_(endpoint.retries, 1)
+    eq_(len(server.requests), 3)
+
+    data = endpoint(graphql_query)  # gives up after max_retries
+    eq_(endpoint.retries, 2)
+    eq_(len(server.requests), 5)
+    assert data['errors']
+
+
+def test_rate_limit_field():
+    'Test if the GraphQL rateLimit field and RATE_LIMITED errors are used'
+
+    limited = {'data': None, 'errors': [{
+        'type': 'RATE_LIMITED', 'message': 'API rate limit exceeded',
+    }]}
+    ok = {'data': {'rateLimit': {
+        'cost': 10, 'limit': 5000, 'remaining': 4000,
+        'resetAt': '2100-01-01T00:00:00Z',
+    }}}
+    fake = FakeEndpoint([limited, ok])
+    endpoint = RateLimitedEndpoint(fake, backoff=0.1)
+    eq_(endpoint(graphql_query), ok)
+    eq_(fake.calls, 2)
+    eq_(endpoint.retries, 1)
+
+    budget = endpoint.budget
+    eq_(budget.cost, 10)
+    eq_(budget.remaining, 4000)
+    eq_(budget.reset, 4102444800.0)
+    expected = 400 / (budget.reset - time.time())
+    assert abs(budget.rate - expected) < 1e-6, (budget.rate, expected)
+
+    fake.results.append({'data': {'rateLimit': None}})
+    endpoint(graphql_query)
+    eq_(endpoint.budget.cost, 10)
+
+
+def test_pacing():
+    'Test if concurrent calls are paced by the rate and max_concurrency'
+
+    fake = FakeEndpoint(duration=0.05)
+    endpoint = RateLimitedEndpoint(fake, rate=50, burst=2,
+                                   max_concurrency=2)
+    start = time.monotonic()
+    results = list(endpoint.execute_many([graphql_query] * 12,
+                                         max_concurrency=6))
+    elapsed = time.monotonic() - start
+    eq_(len(results), 12)
+    eq_(fake.max_running, 2)
+    assert elapsed >= 10 / 50, elapsed
+    eq_(endpoint.budget.in_flight, 0)
+    assert 'rate=50' in str(endpoint)
@@ -0,0 +1,71 @@
+import gc
+
+from nose.tools import eq_
+from sgqlc.operation import Operation, merge_operations
+from sgqlc.types import Schema, Type, Field, ID, list_of
+
+schema = Schema()
+
+
+class Issue(Type):
+    __schema__ = schema
+    number = int
+
+
+class Repository(Type):
+    __schema__ = schema
+    name = str
+    issues = list_of(Issue)
+
+
+class Query(Type):
+    __schema__ = schema
+    repository = Field(Repository, args={'id': ID})
+
+
+def get_parents(selection_list):
+    return selection_list._SelectionList__parents
+
+
+def test_merge_parents():
+    'Test if merged operations are not kept by the original selections'
+
+    op = Operation(Query)
+    op.repository(id='repo1').issues.number()
+    repository = op['repository'].__selection__()
+    issues = repository['issues'].__selection__()
+    lists = (repository._Selection__selection_list,
+             issues._Selection__selection_list)
+    parents = [len(get_parents(sl)) for sl in lists]
+
+    for i in range(100):
+        merged = merge_operations(op)
+    eq_([len(get_parents(sl)) for sl in lists], parents)
+
+    eq_(bytes(merged), b'query {\nop1_repository: repository(id: "repo1")'
+        b' {\nissues {\nnumber\n}\n}\n}')
+    data, = merged.split({'data': {
+        'op1_repository': {'issues': [{'number': 1}]},
+    }})
+    eq_((op + data).repository.issues[0].number, 1)
+
+
+def test_shared_parents():
+    'Test if shared selections do not keep their operations alive'
+
+    op = Operation(Query)
+    op.repository(id='repo1').issues.number()
+    repository = op['repository'].__selection__()
+    repository_list = repository._Selection__selection_list
+
+    for i in range(100):
+        other = Operation(Query)
+        other += repository.__clone__('r%d' % (i,), {})
+        eq_(bytes(other).count(b'number'), 1)
+    del other
+    gc.collect()
+    eq_(len(get_parents(repository_list)), 1)
+
+    assert b'__typename' not in bytes(op)
+    repository['issues'].__selection__().__as__(Issue)  # still changes op
+    assert b'__typename' in bytes(op)
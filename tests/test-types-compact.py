@@ -0,0 +1,59 @@
+import copy
+import pickle
+
+from nose.tools import eq_
+from sgqlc.operation import Operation
+from sgqlc.types import Schema, Type, list_of
+
+schema = Schema()
+
+
+class Item(Type):
+    __schema__ = schema
+    __compact__ = True
+    number = int
+    name = str
+
+
+class Query(Type):
+    __schema__ = schema
+    items = list_of(Item)
+
+
+def test_pickle():
+    'Test if compact instances are pickled as the declared type'
+
+    obj = Item({'number': 1, 'name': 'first'})
+    assert type(obj) is not Item
+    other = pickle.loads(pickle.dumps(obj))
+    eq_(repr(other), "Item(number=1, name='first')")
+    assert type(other) is type(obj)
+    assert isinstance(other, Item)
+
+    other = type(obj)({'number': 2})
+    assert type(other) is type(obj)
+
+
+def test_pickle_selection():
+    'Test if compact instances of an operation result are pickled'
+
+    op = Operation(Query)
+    op.items.number()
+    op.items.name(__alias__='title')
+    items = (op + {'data': {'items': [
+        {'number': 1, 'title': 'first'},
+        {'number': 2},
+    ]}}).items
+
+    others = pickle.loads(pickle.dumps(items))
+    eq_(len(others), 2)
+    eq_(others[0].number, 1)
+    eq_(others[0].title, 'first')
+    eq_(others[1].number, 2)
+    assert not hasattr(others[1], 'title')
+    eq_(others[0].__selection_list__, None)
+    eq_(type(others[0]).__compact_slots__, type(items[0]).__compact_slots__)
+
+    obj = copy.copy(Item({'number': 3}))
+    eq_(repr(obj), 'Item(number=3)')
+    assert type(obj) is Item.__compact_class__()
@@ -0,0 +1,93 @@
+import time
+
+from nose.tools import eq_, raises
+from sgqlc.operation import Operation
+from sgqlc.types import Schema, Type, Field, list_of
+from sgqlc.types.relay import Connection, PaginationError, \
+    connection_args, paginate_connections
+
+schema = Schema()
+
+
+class Tag(Type):
+    __schema__ = schema
+    name = str
+
+
+class TagConnection(Connection):
+    __schema__ = schema
+    nodes = list_of(Tag)
+
+
+class Project(Type):
+    __schema__ = schema
+    tags = Field(TagConnection, args=connection_args())
+    labels = Field(TagConnection, args=connection_args())
+
+
+class Query(Type):
+    __schema__ = schema
+    project = Field(Project)
+
+
+def get_parents(selection_list):
+    return selection_list._SelectionList__parents
+
+
+def test_paginate_many_pages():
+    'Test if follow-up operations are not kept by the original selections'
+
+    op = Operation(Query)
+    tags = op.project.tags(first=1)
+    tags.nodes.name()
+    tags.page_info.__fields__('has_next_page', 'end_cursor')
+
+    project = op['project'].__selection__()
+    tags = project['tags'].__selection__()
+    tags_list = tags._Selection__selection_list
+    nodes_list = tags['nodes'].__selection__()._Selection__selection_list
+    parents = (len(get_parents(tags_list)), len(get_parents(nodes_list)))
+
+    count = 300
+
+    def endpoint(query, variables):
+        after = next(iter(next(iter(query)))).__args__.get('after')
+        i = int(after) + 1 if after else 0
+        return {'data': {'project': {'tags': {
+            'nodes': [{'name': 'tag%d' % (i,)}],
+            'pageInfo': {'hasNextPage': i < count - 1,
+                         'endCursor': str(i)},
+        }}}}
+
+    result = paginate_connections(endpoint, op, max_workers=1)
+    eq_(len(result.project.tags.nodes), count)
+    eq_(result.project.tags.nodes[-1].name, 'tag%d' % (count - 1,))
+    eq_((len(get_parents(tags_list)), len(get_parents(nodes_list))),
+        parents)
+
+
+@raises(PaginationError)
+def test_paginate_error_cancels():
+    'Test if pending pages are cancelled when a page fails'
+
+    op = Operation(Query)
+    for conn in (op.project.tags(first=1), op.project.labels(first=1)):
+        conn.nodes.name()
+        conn.page_info.__fields__('has_next_page', 'end_cursor')
+
+    def page(i):
+        return {
+            'nodes': [{'name': 'tag%d' % (i,)}],
+            'pageInfo': {'hasNextPage': True, 'endCursor': str(i)},
+        }
+
+    def endpoint(query, variables):
+        conns = list(next(iter(query)))
+        if len(conns) == 2:
+            return {'data': {'project': {'tags': page(0), 'labels': page(0)}}}
+        if conns[0].__field__.name == 'tags':
+            return {'errors': [{'message': 'page failed'}]}
+        time.sleep(0.1)
+        return {'data': {'project': {'labels': page(1)}}}
+
+    paginate_connections(endpoint, op, max_workers=1)